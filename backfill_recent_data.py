@@ -15,7 +15,6 @@ Usage:
 import sys
 import time
 from datetime import datetime, timedelta
-import requests
 import json
 import tempfile
 
@@ -23,16 +22,16 @@ import tempfile
 sys.path.insert(0, './src')
 
 import src.config as config
-from src.modules.extract.manager import ExtractionManager
-from src.modules.transform.manager import TransformManager
+from src import services
 
 class BackfillManager:
     """Manages backfilling of recent data with rate limiting."""
     
     def __init__(self):
         self.api_url = "https://api.binance.com/api/v3"
-        self.extract_mgr = ExtractionManager()
-        self.transform_mgr = TransformManager()
+        self.extract_mgr = services.get_extraction_manager()
+        self.transform_mgr = services.get_transform_manager()
+        self.session = services.get_http_session()
         
         # Rate limiting configuration
         self.delay_between_requests = 0.5  # 500ms delay between requests
@@ -63,7 +62,7 @@ class BackfillManager:
         
         for attempt in range(self.max_retries):
             try:
-                response = requests.get(endpoint, params=params, timeout=10)
+                response = self.session.get(endpoint, params=params, timeout=10)
                 
                 if response.status_code == 200:
                     return response.json()
@@ -160,7 +159,14 @@ class BackfillManager:
             for symbol in config.SYMBOLS:
                 self.transform_mgr.warehouse_agg.aggregate_hourly(symbol)
                 self.transform_mgr.warehouse_agg.aggregate_daily(symbol)
+                self.transform_mgr.warehouse_agg.aggregate_volume_profiles(symbol)
+                self.transform_mgr.warehouse_agg.aggregate_distribution_sketches(symbol)
+                self.transform_mgr.warehouse_agg.aggregate_indicators(symbol)
             print("✅ Aggregations complete")
+
+            # Tell the API workers the warehouse changed: their hot stores
+            # re-warm and cached results go stale
+            services.get_watermarks().bump_all(config.SYMBOLS)
             
         except Exception as e:
             print(f"❌ Processing failed: {e}")
@@ -100,6 +100,59 @@ def drop_and_create_database():
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """)
         
+        print("Creating table 'hourly_volume_profiles'...")
+        cursor.execute("""
+        CREATE TABLE hourly_volume_profiles (
+            symbol VARCHAR(20),
+            hour_start DATETIME,
+            tick_bps DECIMAL(8, 4),
+            base_level INT,
+            level_count INT,
+            volumes MEDIUMBLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (symbol, hour_start),
+            INDEX idx_hour (hour_start)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        
+        print("Creating table 'hourly_distribution_sketches'...")
+        cursor.execute("""
+        CREATE TABLE hourly_distribution_sketches (
+            symbol VARCHAR(20),
+            hour_start DATETIME,
+            metric VARCHAR(10),
+            alpha DECIMAL(6, 4),
+            count INT,
+            mean DOUBLE,
+            m2 DOUBLE,
+            m3 DOUBLE,
+            m4 DOUBLE,
+            min_value DOUBLE,
+            max_value DOUBLE,
+            sketch MEDIUMBLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (symbol, metric, hour_start),
+            INDEX idx_hour (hour_start)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        
+        print("Creating table 'fact_indicators'...")
+        cursor.execute("""
+        CREATE TABLE fact_indicators (
+            symbol VARCHAR(20),
+            interval_code VARCHAR(5),
+            indicator VARCHAR(16),
+            params VARCHAR(32),
+            open_time DATETIME,
+            value1 DOUBLE,
+            value2 DOUBLE,
+            value3 DOUBLE,
+            value4 DOUBLE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (symbol, interval_code, indicator, params, open_time)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        
         # Metadata tables
         print("Creating table 'extraction_metadata'...")
         cursor.execute("""
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar response format against the per-row format.
+
+Feeds the same synthetic candles to each time-series provider's compute()
+(the step after the bar fetch, so no database or indicator state is
+involved), builds both response formats, serializes them with json.dumps
+(as Flask's jsonify does) and prints build time, serialization time and
+payload size.
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.modules.analytics.data_providers.registry import DataProviderRegistry
+
+PROVIDERS = ['candlestick', 'volume', 'rsi', 'macd', 'bollinger', 'atr']
+
+
+def synthetic_frame(n, seed=42):
+    """n one-minute candles in the frame layout returned by DataProvider._load_bars."""
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    return pd.DataFrame({
+        'open_time': pd.date_range('2026-01-01', periods=n, freq='min'),
+        'open_price': open_,
+        'high_price': np.maximum(open_, close) + spread,
+        'low_price': np.minimum(open_, close) - spread,
+        'close_price': close,
+        'volume': rng.uniform(1, 100, n)
+    })
+
+
+def measure(func, repeat):
+    """Best-of-`repeat` wall time of func() in seconds, and its last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark columnar vs row responses')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[200, 5_000, 50_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'provider':>12} {'format':>9} {'build (ms)':>11} {'json (ms)':>10} {'bytes':>11}")
+
+    for n in args.sizes:
+        frame = synthetic_frame(n + 100)
+        for name in PROVIDERS:
+            provider = DataProviderRegistry.get(name)
+
+            rows_total = None
+            for fmt in ('rows', 'columnar'):
+                params = {'limit': n, 'format': fmt}
+                bars = frame.tail(provider.bars_needed(**params)).reset_index(drop=True)
+                data, build = measure(lambda: provider.compute('BTCUSDT', bars, **params), args.repeat)
+                payload, dump = measure(lambda: json.dumps(data), args.repeat)
+                total = build + dump
+                speedup = f" {rows_total / total:5.1f}x" if rows_total else ''
+                rows_total = rows_total or total
+                print(f"{n:>8,} {name:>12} {fmt:>9} {build * 1000:>11.2f} {dump * 1000:>10.2f} "
+                      f"{len(payload):>11,}{speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized RSI/ATR/MACD kernels against the original loop versions.
+
+Runs both implementations on a random walk at several lengths, checks that
+the series agree within float tolerance and prints the timings.
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.modules.stats import indicators
+
+
+def loop_rsi(close, period):
+    """RSI as previously computed by RSIProvider."""
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+    avg_gain = np.mean(gains[:period])
+    avg_loss = np.mean(losses[:period])
+    avg_gains = [avg_gain]
+    avg_losses = [avg_loss]
+    for i in range(period, len(gains)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        avg_gains.append(avg_gain)
+        avg_losses.append(avg_loss)
+    return np.array([
+        100 if l == 0 else 100 - (100 / (1 + g / l))
+        for g, l in zip(avg_gains, avg_losses)
+    ])
+
+
+def loop_atr(high, low, close, period):
+    """ATR as previously computed by ATRProvider."""
+    prev_close = np.roll(close, 1)
+    prev_close[0] = close[0]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = np.mean(true_range[1:period + 1])
+    atr_values = [atr]
+    for i in range(period, len(true_range)):
+        atr = ((period - 1) * atr + true_range[i]) / period
+        atr_values.append(atr)
+    return np.array(atr_values)
+
+
+def loop_macd(close, fast=12, slow=26, signal=9):
+    """MACD histogram as previously computed by MACDProvider._calculate_ema."""
+    def loop_ema(data, period):
+        ema = np.zeros(len(data))
+        multiplier = 2 / (period + 1)
+        ema[0] = data[0]
+        for i in range(1, len(data)):
+            ema[i] = (data[i] - ema[i - 1]) * multiplier + ema[i - 1]
+        return ema
+
+    macd_line = loop_ema(close, fast) - loop_ema(close, slow)
+    return macd_line - loop_ema(macd_line, signal)
+
+
+def vector_macd(close):
+    return indicators.macd(close)[2]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RSI/ATR/MACD kernels')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--period', type=int, default=14)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'points':>10} {'indicator':>9} {'loop (ms)':>12} {'vector (ms)':>12} {'speedup':>8} {'max diff':>10}")
+
+    for n in args.sizes:
+        close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+        spread = np.abs(rng.normal(0, 0.3, n))
+        high = close + spread
+        low = close - spread
+
+        cases = [
+            ('RSI', loop_rsi, indicators.rsi, (close, args.period)),
+            ('ATR', loop_atr, indicators.atr, (high, low, close, args.period)),
+            ('MACD', loop_macd, vector_macd, (close,)),
+        ]
+        for name, loop_func, vector_func, func_args in cases:
+            expected, loop_time = timed(loop_func, *func_args)
+            actual, vector_time = timed(vector_func, *func_args)
+            max_diff = float(np.max(np.abs(expected - actual)))
+            if not np.allclose(expected, actual, rtol=1e-9, atol=1e-9):
+                print(f"❌ {name} mismatch at {n} points (max diff {max_diff:.2e})")
+                sys.exit(1)
+            print(f"{n:>10,} {name:>9} {loop_time * 1000:>12.2f} {vector_time * 1000:>12.2f} "
+                  f"{loop_time / vector_time:>7.1f}x {max_diff:>10.1e}")
+
+
+if __name__ == '__main__':
+    main()
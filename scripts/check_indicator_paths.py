@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Check that indicator state and fact_indicators return what compute() returns.
+
+Replays synthetic 1m candles the way the pipeline sees them: the
+incremental states are built from a hot-store sized window and advanced
+one candle at a time, and fact_indicators rows are upserted from the bar
+containing the latest stored row on, as aggregate_indicators() does on
+every check. At regular points every default indicator series from either
+path is compared with compute() on the bars the provider would load itself
+(the latest bars_needed() bars, resampled from 1m candles). All go through
+the provider's response formatting and must have the same times and values
+equal to the response precision: one unit in the last decimal, plus float
+rounding relative to the value, as noise can round either way. Requests a
+path cannot answer are counted as skipped.
+"""
+
+import sys
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import src.config as config
+from src.modules.analytics.data_providers.registry import DataProviderRegistry
+from src.modules.marketdata.hot_store import COLUMNS, from_epoch_minutes
+from src.modules.marketdata.resample import bucket_starts, parse_interval, resample_ohlcv
+from src.modules.stats.incremental import DEFAULT_PARAMS, _BarGroup, indicator_series, warmup_bars
+
+# Request parameters of each indicator's default parameter set
+REQUEST_PARAMS = {
+    'rsi': {'period': 14},
+    'atr': {'period': 14},
+    'macd': {'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
+    'bollinger': {'period': 20, 'std_dev': 2},
+}
+
+# Decimals the providers round each indicator's values to
+DECIMALS = {'rsi': 2, 'atr': 4, 'macd': 8, 'bollinger': 8}
+
+
+def synthetic_candles(n, seed=42):
+    """n one-minute candles as (epoch minutes, (5, n) OHLCV array)."""
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    times = np.arange(n, dtype=np.int64) + int(np.datetime64('2026-01-01', 'm').astype(np.int64))
+    values = np.vstack([
+        open_,
+        np.maximum(open_, close) + spread,
+        np.minimum(open_, close) - spread,
+        close,
+        rng.uniform(1, 100, n)
+    ])
+    return times, values
+
+
+def provider_bars(times, values, minutes, count):
+    """The latest `count` bars as DataProvider._load_bars builds them from memory."""
+    times, values = times[-count * minutes:], values[:, -count * minutes:]
+    if minutes > 1:
+        times, values = resample_ohlcv(times, values, minutes)
+    data = {'open_time': from_epoch_minutes(times[-count:])}
+    for i, column in enumerate(COLUMNS):
+        data[column] = values[i, -count:]
+    return pd.DataFrame(data)
+
+
+def table_update(table, kind, key, times, values, minutes):
+    """Upsert rows into `table` (open_time -> row) like aggregate_indicators()."""
+    first_bar = int(bucket_starts(max(table), minutes)) if table else 0
+    start = max(first_bar - warmup_bars(kind, key) * minutes, 0)
+    times, values = times[times >= start], values[:, times >= start]
+    if minutes > 1:
+        times, values = resample_ohlcv(times, values, minutes)
+    series = indicator_series(kind, key, times, values, first_bar)
+    if series is not None:
+        for t, row in zip(series[0].tolist(), series[1].T):
+            table[t] = row
+
+
+def table_series(table, limit, latest_bar):
+    """Latest `limit` rows as DataProvider._indicator_table serves them, or None."""
+    if len(table) < limit:
+        return None
+    times = sorted(table)[-limit:]
+    if times[-1] < latest_bar:
+        return None
+    return np.array(times, dtype=np.int64), np.array([table[t] for t in times]).T
+
+
+def max_excess(first, second, decimals):
+    """
+    Largest difference between two columnar responses beyond the tolerance
+    (inf if their times differ), or 0 when they agree.
+    """
+    if first['time'] != second['time']:
+        return float('inf')
+    excess = 0.0
+    for field in second:
+        if field == 'time':
+            continue
+        expected = np.asarray(second[field], dtype=np.float64)
+        tolerance = 1.01 * 10 ** -decimals + 1e-12 * np.abs(expected)
+        excess = max(excess, float(np.max(np.abs(np.subtract(first[field], expected)) - tolerance, initial=0.0)))
+    return excess
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare indicator state and fact_indicators with compute()')
+    parser.add_argument('--intervals', nargs='*', default=['1m', '5m', '1h'])
+    parser.add_argument('--limits', type=int, nargs='*', default=[1, 50, 200])
+    parser.add_argument('--hot-days', type=int, default=config.HOT_STORE_DAYS)
+    parser.add_argument('--history', type=int, default=config.INDICATOR_STATE_BARS)
+    parser.add_argument('--steps', type=int, default=2000, help='candles fed after the build')
+    parser.add_argument('--check-every', type=int, default=97)
+    args = parser.parse_args()
+
+    hot = args.hot_days * 1440
+    times, values = synthetic_candles(hot + args.steps)
+    failures = 0
+
+    print(f"{'interval':>8} {'indicator':>10} {'path':>6} {'compared':>9} {'skipped':>8} {'mismatched':>11}")
+    for interval in args.intervals:
+        minutes = parse_interval(interval)
+        group = _BarGroup(minutes)
+        group.build(times[:hot], values[:, :hot], list(DEFAULT_PARAMS.items()), args.history)
+        tables = {kind: {} for kind in DEFAULT_PARAMS}
+
+        counts = {(kind, path): [0, 0, 0] for kind in DEFAULT_PARAMS for path in ('state', 'table')}
+        for end in range(hot, hot + args.steps + 1):
+            if end > hot:
+                group.add(int(times[end - 1]), tuple(values[:, end - 1].tolist()))
+            if (end - hot) % args.check_every:
+                continue
+            latest_bar = int(bucket_starts(int(times[end - 1]), minutes))
+
+            for kind, key in DEFAULT_PARAMS.items():
+                provider = DataProviderRegistry.get(kind)
+                table_update(tables[kind], kind, key, times[:end], values[:, :end], minutes)
+                for limit in args.limits:
+                    params = {**REQUEST_PARAMS[kind], 'interval': interval, 'limit': limit, 'format': 'columnar'}
+                    bars = provider_bars(times[:end], values[:, :end], minutes, provider.bars_needed(**params))
+                    computed = provider.compute('BTCUSDT', bars, **params)
+
+                    for path, series in (('state', group.series((kind, key), limit)),
+                                         ('table', table_series(tables[kind], limit, latest_bar))):
+                        count = counts[(kind, path)]
+                        if series is None:
+                            count[1] += 1
+                            continue
+                        count[0] += 1
+
+                        series_times, series_values = series
+                        served = provider._respond(from_epoch_minutes(series_times), *series_values, params)
+                        excess = max_excess(served, computed, DECIMALS[kind])
+                        if excess > 0:
+                            count[2] += 1
+                            if count[2] == 1:
+                                print(f"❌ {kind} {interval} {path} limit={limit} at candle {end}: "
+                                      f"off by {excess:.3g} beyond the precision")
+
+        for (kind, path), (compared, skipped, mismatched) in counts.items():
+            failures += mismatched
+            print(f"{interval:>8} {kind:>10} {path:>6} {compared:>9} {skipped:>8} {mismatched:>11}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
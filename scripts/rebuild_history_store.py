@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Rebuild the memory-mapped kline history files from the warehouse.
+
+Run once after enabling the history store (or after restoring the database)
+so providers can read long ranges from disk instead of MySQL. The transform
+stage keeps the files up to date afterwards.
+"""
+
+import sys
+import os
+import argparse
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services import get_history_store
+import src.config as config
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild memory-mapped kline history from fact_klines'
+    )
+    parser.add_argument(
+        'symbols',
+        nargs='*',
+        help='Symbols to rebuild (default: all configured symbols)'
+    )
+    
+    args = parser.parse_args()
+    symbols = args.symbols or config.SYMBOLS
+    
+    history_store = get_history_store()
+    print(f"Rebuilding history for: {', '.join(symbols)}")
+    history_store.rebuild_from_warehouse(symbols)
+    
+    for symbol, info in history_store.get_statistics()['symbols'].items():
+        print(f"  {symbol}: {info['candles']:,} candles")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_USER = os.getenv('DB_USER', 'root')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '300450')
 DB_NAME = os.getenv('DB_NAME', 'crypto_pipeline')
+# Zone of the naive DATETIME values stored in MySQL (converted to UTC for the API)
+DB_TIMEZONE = os.getenv('DB_TIMEZONE', 'Asia/Ho_Chi_Minh')
 
 # Tracked Symbols
 SYMBOLS_STR = os.getenv('SYMBOLS', 'BTCUSDT,ETHUSDT,BNBUSDT')
@@ -38,3 +40,48 @@ RETENTION_MAX_SIZE_GB = int(os.getenv('RETENTION_MAX_SIZE_GB', '50'))
 RETENTION_MAX_AGE_DAYS = int(os.getenv('RETENTION_MAX_AGE_DAYS', '30'))
 RETENTION_CHECK_ENABLED = os.getenv('RETENTION_CHECK_ENABLED', 'True').lower() == 'true'
 RETENTION_CLEANUP_HOUR = int(os.getenv('RETENTION_CLEANUP_HOUR', '3'))  # 3 AM
+
+# In-memory hot store for recent candles (per process)
+HOT_STORE_DAYS = int(os.getenv('HOT_STORE_DAYS', '3'))
+# Seconds before a symbol is re-warmed even if no watermark moved (0 = never);
+# covers writers the watermarks cannot reach, e.g. SHARED_CACHE_BACKEND=none
+HOT_STORE_TTL = float(os.getenv('HOT_STORE_TTL', '3600'))
+
+# Memory-mapped columnar kline history (one directory per symbol)
+HISTORY_STORE_DIR = os.getenv('HISTORY_STORE_DIR', './data/history')
+
+# Incremental RSI/MACD/ATR/Bollinger state: outputs kept per indicator (0 disables)
+INDICATOR_STATE_BARS = int(os.getenv('INDICATOR_STATE_BARS', '1000'))
+
+# Precomputed fact_indicators: chart intervals. Warm-up: least bars before the
+# first output that RSI/MACD/ATR are seeded from on every path (compute(), state,
+# table); longer periods get more, until Wilder averages and EMAs have converged
+INDICATOR_INTERVALS = [s.strip() for s in os.getenv('INDICATOR_INTERVALS', '1m,5m,1h,1d').split(',') if s.strip()]
+INDICATOR_WARMUP_BARS = int(os.getenv('INDICATOR_WARMUP_BARS', '300'))
+
+# Analytics result cache: entry and size bounds, and a TTL (seconds, 0 = none)
+# for candles loaded by another process
+RESULT_CACHE_ENTRIES = int(os.getenv('RESULT_CACHE_ENTRIES', '512'))
+RESULT_CACHE_MB = float(os.getenv('RESULT_CACHE_MB', '64'))
+RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '60'))
+
+# Result cache shared by worker processes: 'file' (SHARED_CACHE_DIR), 'redis'
+# (SHARED_CACHE_URL, any Redis-protocol server) or 'none'
+SHARED_CACHE_BACKEND = os.getenv('SHARED_CACHE_BACKEND', 'file')
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR', './data/cache')
+SHARED_CACHE_MB = float(os.getenv('SHARED_CACHE_MB', '256'))
+SHARED_CACHE_URL = os.getenv('SHARED_CACHE_URL', 'redis://localhost:6379/0')
+
+# Seconds an identical concurrent request waits for the in-flight one before computing itself
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_TIMEOUT', '30'))
+
+# Server-Sent Events push (/api/stream/<symbol>): indicator tails sent with new
+# candles, per-client queue length, keep-alive seconds, bars per event, client cap
+PUSH_INDICATORS = [s.strip() for s in os.getenv('PUSH_INDICATORS', 'rsi,macd,bollinger,atr').split(',') if s.strip()]
+PUSH_QUEUE_SIZE = int(os.getenv('PUSH_QUEUE_SIZE', '100'))
+PUSH_HEARTBEAT = float(os.getenv('PUSH_HEARTBEAT', '15'))
+PUSH_MAX_BARS = int(os.getenv('PUSH_MAX_BARS', '500'))
+PUSH_MAX_SUBSCRIBERS = int(os.getenv('PUSH_MAX_SUBSCRIBERS', '1000'))
+
+# Hourly volume profiles: width of one log-price level in basis points
+VOLUME_PROFILE_TICK_BPS = float(os.getenv('VOLUME_PROFILE_TICK_BPS', '2'))
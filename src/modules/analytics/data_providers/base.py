@@ -8,17 +8,34 @@ the get_data() and get_metadata() methods.
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 import mysql.connector
+import numpy as np
+import pandas as pd
 import sys
 import os
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
 import src.config as config
+from src.services import get_hot_store, get_history_store, get_indicator_engine
+from src.modules.marketdata.hot_store import COLUMNS, to_epoch_minutes, from_epoch_minutes
+from src.modules.marketdata.panel import align_series
+from src.modules.marketdata import timestamps
+from src.modules.stats import sketch, incremental
+from src.modules.stats.incremental import params_key
+from src.modules.marketdata.resample import bucket_offset, bucket_starts, parse_interval, resample_cached
 
 
 class DataProvider(ABC):
     """Base class for analytics data providers."""
     
+    # Zone the response times are converted from (None: config.DB_TIMEZONE)
+    RESPONSE_TZ = None
+    
+    # True when compute() values depend on how much history precedes the
+    # first point (recursively smoothed indicators), so a `since` request
+    # cannot be computed from the tail bars alone
+    WARMUP_DEPENDENT = False
+    
     def __init__(self):
         self.db_config = {
             'host': config.DB_HOST,
@@ -31,36 +48,527 @@ class DataProvider(ABC):
         """Get database connection."""
         return mysql.connector.connect(**self.db_config)
     
+    @staticmethod
+    def _interval_minutes(interval):
+        """Convert an interval string ('1m', '5m', '1h', '1d', '1w') to minutes."""
+        return parse_interval(interval)
+    
+    def _memory_window(self, symbol, limit):
+        """Latest `limit` 1m candles from the hot store or history files, or None."""
+        return self._versioned_window(symbol, limit)[0]
+    
+    def _versioned_window(self, symbol, limit):
+        """
+        Like _memory_window, but also return the source's version token.
+        
+        The token is read before the window so a concurrent append can only
+        make the data newer than the token says, never older.
+        """
+        hot_store = get_hot_store()
+        version = hot_store.version(symbol)
+        window = hot_store.window(symbol, limit)
+        if window is None:
+            history_store = get_history_store()
+            version = history_store.version(symbol)
+            window = history_store.tail(symbol, limit)
+        return window, version
+    
+    @staticmethod
+    def _frame_from_window(window):
+        times, values = window
+        data = {'open_time': pd.to_datetime(times * 60, unit='s')}
+        for i, column in enumerate(COLUMNS):
+            data[column] = values[i]
+        return pd.DataFrame(data)
+    
+    @staticmethod
+    def _finish_frame(df):
+        """Chronological order, datetime open_time and float OHLCV columns."""
+        df = df.iloc[::-1].reset_index(drop=True)
+        df['open_time'] = pd.to_datetime(df['open_time'])
+        for column in COLUMNS:
+            df[column] = df[column].astype(float)
+        return df
+    
+    def _load_klines(self, symbol, limit):
+        """
+        Load the latest 1m candles for a symbol in chronological order.
+        
+        Served from the in-memory hot store when it covers the window, then
+        from the memory-mapped history files, otherwise read from fact_klines.
+        
+        Args:
+            symbol: Trading pair symbol
+            limit: Number of 1m candles
+            
+        Returns:
+            DataFrame with open_time and float open/high/low/close price and volume columns
+        """
+        window = self._memory_window(symbol, limit)
+        if window is not None:
+            return self._frame_from_window(window)
+        
+        conn = self._get_connection()
+        try:
+            query = """
+            SELECT open_time, open_price, high_price, low_price, close_price, volume
+            FROM fact_klines
+            WHERE symbol = %s AND interval_code = '1m'
+            ORDER BY open_time DESC
+            LIMIT %s
+            """
+            df = pd.read_sql(query, conn, params=(symbol, limit))
+        finally:
+            conn.close()
+        
+        return self._finish_frame(df)
+    
+    def _load_bars(self, symbol, interval, limit):
+        """
+        Load the latest OHLCV bars for a symbol at the requested interval.
+        
+        1m bars come straight from _load_klines. Larger intervals are
+        resampled in memory when the hot store or history files cover the
+        window; otherwise the bucketing is done by MySQL (from the hourly or
+        daily rollups when the interval allows it) so only `limit` rows are
+        transferred.
+        
+        Args:
+            symbol: Trading pair symbol
+            interval: Bar interval ('1m', '5m', '1h', '1d', ...)
+            limit: Number of bars
+            
+        Returns:
+            DataFrame with open_time (bar start) and float OHLCV columns, oldest first
+        """
+        minutes = self._interval_minutes(interval)
+        if minutes <= 1:
+            return self._load_klines(symbol, limit)
+        
+        window, version = self._versioned_window(symbol, limit * minutes)
+        if window is not None:
+            times, values = window
+            bar_times, bars = resample_cached(symbol, minutes, version, times, values)
+            return self._frame_from_window((bar_times[-limit:], bars[:, -limit:]))
+        
+        df = None
+        if minutes % 1440 == 0:
+            df = self._query_bars(symbol, minutes, limit, 'daily_klines', 'date')
+        elif minutes % 60 == 0:
+            df = self._query_bars(symbol, minutes, limit, 'hourly_klines', 'hour_start')
+        
+        # Rollups are filled by the aggregation step; fall back to raw klines if empty
+        if df is None or df.empty:
+            df = self._query_bars(symbol, minutes, limit, 'fact_klines', 'open_time')
+        return df
+    
+    def _load_panel(self, symbols, interval, limit, column='close_price'):
+        """
+        Load one column for several symbols aligned on shared bar times.
+        
+        Each symbol's bars are loaded independently (from memory when
+        possible), so a symbol with denser data cannot crowd out the others.
+        Bars missing for any symbol are dropped.
+        
+        Args:
+            symbols: Trading pair symbols (duplicates are loaded once)
+            interval: Bar interval ('1m', '5m', '1h', ...)
+            limit: Number of bars to load per symbol
+            column: OHLCV column to align (default: 'close_price')
+            
+        Returns:
+            Tuple (times, matrix): int64 bar-start epoch minutes, oldest first,
+            and a (len(symbols), n) float64 matrix. Both are empty when any
+            symbol has no data.
+        """
+        loaded = {}
+        for symbol in symbols:
+            if symbol in loaded:
+                continue
+            bars = self._load_bars(symbol, interval, limit)
+            if bars.empty:
+                print(f"Panel: No data found for symbol {symbol}")
+                return np.empty(0, dtype=np.int64), np.empty((len(symbols), 0), dtype=np.float64)
+            loaded[symbol] = (to_epoch_minutes(bars['open_time'].values), bars[column].to_numpy(dtype=float))
+        
+        return align_series(
+            [loaded[symbol][0] for symbol in symbols],
+            [loaded[symbol][1] for symbol in symbols]
+        )
+    
+    def _latest_range(self, symbol, minutes, limit):
+        """
+        Minute range covered by the latest `limit` bars of `minutes`.
+        
+        Returns:
+            Tuple (start, end) of epoch minutes (end exclusive), or None without data
+        """
+        latest = self._load_klines(symbol, 1)
+        if latest.empty:
+            return None
+        end = int(to_epoch_minutes(latest['open_time'].values)[-1]) + 1
+        start = int(bucket_starts(end - 1, minutes)) - (limit - 1) * minutes
+        return start, end
+    
+    @staticmethod
+    def _as_datetime(epoch_minutes):
+        return from_epoch_minutes(epoch_minutes).item()
+    
+    def _distribution_summary(self, symbol, metric, limit):
+        """
+        Moments and quantile sketch of a metric over the latest `limit` 1m candles.
+        
+        Whole hours come from hourly_distribution_sketches; the partial
+        hours at either end and hours not aggregated yet are summarized from
+        fact_klines, so no more than about two hours of raw rows are read.
+        
+        Args:
+            symbol: Trading pair symbol
+            metric: 'return' or 'price' (see stats.sketch.metric_values)
+            limit: Number of 1m candles
+            
+        Returns:
+            Tuple (Moments, DDSketch), or None when no hourly sketches exist
+        """
+        span = self._latest_range(symbol, 1, limit)
+        if span is None:
+            return None
+        start, end = span
+        first_hour = -(-start // 60) * 60
+        last_hour = end // 60 * 60
+        alpha = sketch.METRIC_ALPHA[metric]
+        
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT hour_start, count, mean, m2, m3, m4, min_value, max_value, sketch
+                FROM hourly_distribution_sketches
+                WHERE symbol = %s AND metric = %s AND alpha = %s
+                    AND hour_start >= %s AND hour_start < %s
+                ORDER BY hour_start ASC
+            """, (symbol, metric, alpha, self._as_datetime(first_hour), self._as_datetime(last_hour)))
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                return None
+            
+            moments = sketch.Moments()
+            quantiles = sketch.DDSketch(alpha)
+            for row in rows:
+                moments = moments.merge(sketch.Moments(*row[1:8]))
+                quantiles.merge(sketch.DDSketch.from_bytes(row[8], alpha))
+            
+            covered_start = int(to_epoch_minutes([rows[0][0]])[0])
+            covered_end = int(to_epoch_minutes([rows[-1][0]])[0]) + 60
+            
+            # Minutes before the first stored hour and after the last one
+            for lo, hi in ((start, covered_start), (covered_end, end)):
+                if lo >= hi:
+                    continue
+                cursor.execute("""
+                    SELECT open_price, close_price
+                    FROM fact_klines
+                    WHERE symbol = %s AND interval_code = '1m' AND open_time >= %s AND open_time < %s
+                """, (symbol, self._as_datetime(lo), self._as_datetime(hi)))
+                candles = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 2)
+                values = sketch.metric_values(metric, candles[:, 0], candles[:, 1])
+                moments = moments.merge(sketch.Moments.from_values(values))
+                quantiles.add(values)
+            cursor.close()
+        finally:
+            conn.close()
+        
+        return moments, quantiles
+    
+    def _query_bars(self, symbol, minutes, limit, table, time_column):
+        """
+        Bucket rows of `table` into `minutes` bars inside MySQL.
+        
+        Buckets are whole multiples of `minutes` counted from 1970-01-01 on
+        the stored (local) timestamps (from Monday 1970-01-05 for weekly
+        intervals), matching the in-memory resample.
+        """
+        offset = bucket_offset(minutes)
+        interval_filter = "AND interval_code = '1m'" if table == 'fact_klines' else ""
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT MAX({time_column}) FROM {table} WHERE symbol = %s {interval_filter}",
+                (symbol,)
+            )
+            latest = cursor.fetchone()[0]
+            cursor.close()
+            if latest is None:
+                return pd.DataFrame(columns=['open_time', *COLUMNS])
+            
+            # Start of the oldest bucket we need, so the range scan stays on the index
+            latest_minute = int(pd.Timestamp(latest).value // 60_000_000_000)
+            first_bucket = int(bucket_starts(latest_minute, minutes)) - (limit - 1) * minutes
+            start_time = pd.Timestamp(first_bucket * 60, unit='s').to_pydatetime()
+            
+            query = f"""
+            SELECT
+                DATE_ADD('1970-01-01', INTERVAL bucket * %s + %s MINUTE) AS open_time,
+                CAST(SUBSTRING_INDEX(GROUP_CONCAT(open_price ORDER BY bar_time ASC), ',', 1) AS DECIMAL(20, 8)) AS open_price,
+                MAX(high_price) AS high_price,
+                MIN(low_price) AS low_price,
+                CAST(SUBSTRING_INDEX(GROUP_CONCAT(close_price ORDER BY bar_time DESC), ',', 1) AS DECIMAL(20, 8)) AS close_price,
+                SUM(volume) AS volume
+            FROM (
+                SELECT
+                    {time_column} AS bar_time,
+                    (TIMESTAMPDIFF(MINUTE, '1970-01-01', {time_column}) - %s) DIV %s AS bucket,
+                    open_price, high_price, low_price, close_price, volume
+                FROM {table}
+                WHERE symbol = %s {interval_filter} AND {time_column} >= %s
+            ) AS bars
+            GROUP BY bucket
+            ORDER BY bucket DESC
+            LIMIT %s
+            """
+            df = pd.read_sql(query, conn, params=(minutes, offset, offset, minutes, symbol, start_time, limit))
+        finally:
+            conn.close()
+        
+        return self._finish_frame(df)
+    
+    def _format_times_to_utc(self, times):
+        """
+        Convert a column of MySQL datetimes (naive, in config.DB_TIMEZONE) to
+        UTC ISO strings in one vectorized pass.
+        
+        Args:
+            times: Array-like of datetimes (Series, ndarray or list)
+            
+        Returns:
+            List of ISO strings in UTC with 'Z' suffix (e.g., "2026-01-13T07:00:00Z")
+        """
+        return timestamps.utc_iso(times)
+    
+    def _epoch_ms(self, times):
+        """Epoch milliseconds (UTC) of MySQL datetimes, for columnar responses."""
+        return timestamps.utc_epoch_ms(times)
+    
     def _format_datetime_to_utc(self, dt):
         """
-        Convert MySQL datetime (local timezone) to UTC ISO string.
+        Convert a single MySQL datetime (local timezone) to UTC ISO string.
         
-        MySQL stores datetime in local timezone (UTC+7 for Vietnam).
-        This method converts it to proper UTC before sending to frontend.
+        Use _format_times_to_utc for whole columns.
         
         Args:
-            dt: datetime object from MySQL (naive, in local timezone)
+            dt: datetime object from MySQL (naive, in config.DB_TIMEZONE)
             
         Returns:
-            ISO format string in UTC with 'Z' suffix (e.g., "2026-01-13T07:00:00Z")
+            ISO format string in UTC with 'Z' suffix, or None
         """
         if dt is None:
             return None
+        return timestamps.utc_iso([dt])[0]
+
+    
+    def data_symbols(self, symbol, **params):
+        """
+        Symbols whose data the response depends on.
+        
+        Cached results are keyed on these symbols' watermarks; providers
+        that read other symbols than the requested one override this.
+        """
+        return [symbol]
+    
+    def bars_needed(self, **params):
+        """
+        Number of bars of params['interval'] that compute() works on.
+        
+        Providers that only read the symbol's bar series override this and
+        compute(), and implement get_data() with _get_bar_data(). Separating
+        fetch from compute lets the batch endpoint load the series once and
+        hand the tail each provider needs to its compute().
         
-        from datetime import timezone, timedelta
+        Returns:
+            Bar count, or None when the provider loads its own data
+        """
+        return None
+    
+    def compute(self, symbol: str, bars: pd.DataFrame, **params):
+        """
+        Build the response from preloaded bars.
         
-        # MySQL stores in local timezone (UTC+7)
-        VN_TZ = timezone(timedelta(hours=7))
+        Args:
+            symbol: Trading pair symbol
+            bars: The latest bars_needed() bars, as returned by _load_bars()
+            **params: Same parameters as get_data()
+        """
+        raise NotImplementedError(f"{type(self).__name__} loads its own data")
+    
+    def _from_state(self, symbol, **params):
+        """
+        Response from incrementally maintained indicator state, if available.
         
-        # Mark the naive datetime as being in Vietnam timezone
-        dt_local = dt.replace(tzinfo=VN_TZ)
+        Returns:
+            The same response as compute() would build, or None to compute it
+        """
+        return None
+    
+    def _indicator_state(self, symbol, kind, key, params):
+        """
+        Tail of an indicator series without recomputing it.
         
-        # Convert to UTC
-        dt_utc = dt_local.astimezone(timezone.utc)
+        Served from the shared IndicatorEngine when it covers the request,
+        otherwise from fact_indicators for the default parameter sets.
         
-        # Format as ISO string with 'Z' suffix
-        return dt_utc.isoformat().replace('+00:00', 'Z')
-
+        Args:
+            symbol: Trading pair symbol
+            kind: Indicator name (see stats.incremental.INDICATORS)
+            key: Tuple of indicator parameters
+            params: Request parameters (interval, limit)
+            
+        Returns:
+            Tuple (datetime64 bar times, (fields, limit) array), or None
+        """
+        interval = params.get('interval', '1m')
+        limit = params.get('limit', 200)
+        if config.INDICATOR_STATE_BARS > 0:
+            series = get_indicator_engine().series(symbol, self._interval_minutes(interval), kind, key, limit)
+            if series is not None:
+                times, values = series
+                return from_epoch_minutes(times), values
+        return self._indicator_table(symbol, kind, key, interval, limit)
+    
+    def _indicator_table(self, symbol, kind, key, interval, limit):
+        """
+        Latest `limit` rows of fact_indicators, or None.
+        
+        Only the parameter sets and intervals the pipeline precomputes are
+        stored. The rows are not used when they cover fewer than `limit`
+        bars or end before the latest candle in the hot store.
+        """
+        if (interval not in config.INDICATOR_INTERVALS or limit < 1
+                or params_key(key) != params_key(incremental.DEFAULT_PARAMS.get(kind, ()))):
+            return None
+        
+        fields = len(incremental.INDICATORS[kind].fields)
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT open_time, {', '.join(f'value{i + 1}' for i in range(fields))}
+                FROM fact_indicators
+                WHERE symbol = %s AND interval_code = %s AND indicator = %s AND params = %s
+                ORDER BY open_time DESC
+                LIMIT %s
+            """, (symbol, interval, kind, params_key(key), limit))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+        if len(rows) < limit:
+            return None
+        
+        rows.reverse()
+        times = to_epoch_minutes([row[0] for row in rows])
+        latest = get_hot_store().snapshot(symbol)
+        if latest is not None:
+            minutes = self._interval_minutes(interval)
+            if bucket_starts(int(latest[0][-1]), minutes) > times[-1]:
+                return None
+        values = np.array([row[1:] for row in rows], dtype=np.float64).T
+        return from_epoch_minutes(times), values
+    
+    def _state_result(self, symbol, **params):
+        """_from_state(), with errors reported and treated as a miss."""
+        try:
+            return self._from_state(symbol, **params)
+        except Exception as e:
+            print(f"Error reading indicator state for {symbol}: {e}")
+            return None
+    
+    def _delta_params(self, symbol, params):
+        """
+        Split a `since` request into the parameters that serve it.
+        
+        `since` (epoch ms, in the response's time convention) asks for the
+        bars starting at or after the bar containing it. Only that many bars
+        (up to `limit`) are loaded or read from indicator state; providers
+        whose values depend on the warm-up still compute the full window so
+        the tail matches a full response.
+        
+        Args:
+            symbol: Trading pair symbol
+            params: Request parameters, possibly with 'since'
+            
+        Returns:
+            Tuple (state_params, compute_params, threshold_ms), where
+            threshold_ms is None for requests without `since`
+        """
+        params = dict(params)
+        since = params.pop('since', None)
+        if since is None:
+            return params, params, None
+        
+        minutes = self._interval_minutes(params.get('interval', '1m'))
+        local = timestamps.from_utc_epoch_ms([int(since)], self.RESPONSE_TZ)
+        first = int(bucket_starts(int(to_epoch_minutes(local)[0]), minutes))
+        threshold = int(timestamps.utc_epoch_ms(from_epoch_minutes([first]), self.RESPONSE_TZ)[0])
+        
+        limit = params.get('limit', 200)
+        latest = self._load_klines(symbol, 1)
+        if latest.empty:
+            count = limit
+        else:
+            last = int(bucket_starts(int(to_epoch_minutes(latest['open_time'].values)[-1]), minutes))
+            count = min(max((last - first) // minutes + 1, 1), limit)
+        
+        tail = {**params, 'limit': count}
+        return tail, (params if self.WARMUP_DEPENDENT else tail), threshold
+    
+    @staticmethod
+    def _since_tail(result, threshold_ms):
+        """
+        Points of a bar-series response at or after threshold_ms.
+        
+        Works on both formats: columnar (every list as long as 'time' is
+        cut) and one dict per point with ISO 'time' strings.
+        """
+        if threshold_ms is None or not result:
+            return result
+        
+        if isinstance(result, dict):
+            times = np.asarray(result['time'], dtype=np.int64)
+            start = int(np.searchsorted(times, threshold_ms, side='left'))
+            return {
+                name: values[start:] if isinstance(values, list) and len(values) == len(times) else values
+                for name, values in result.items()
+            }
+        
+        times = np.array([row['time'].rstrip('Z') for row in result], dtype='datetime64[ms]').astype(np.int64)
+        return result[int(np.searchsorted(times, threshold_ms, side='left')):]
+    
+    def _get_bar_data(self, symbol, **params):
+        """
+        get_data() of bar-series providers: answer from indicator state when
+        possible, otherwise fetch bars_needed() bars and compute().
+        
+        With `since`, only the points from that bar on are returned (see
+        _delta_params).
+        """
+        try:
+            state_params, compute_params, since = self._delta_params(symbol, params)
+        except Exception as e:
+            print(f"Error resolving since for {symbol}: {e}")
+            return []
+        
+        result = self._state_result(symbol, **state_params)
+        if result is not None:
+            return self._since_tail(result, since)
+        
+        try:
+            bars = self._load_bars(symbol, compute_params.get('interval', '1m'), self.bars_needed(**compute_params))
+        except Exception as e:
+            print(f"Error loading bars for {symbol}: {e}")
+            return []
+        return self._since_tail(self.compute(symbol, bars, **compute_params), since)
     
     @abstractmethod
     def get_data(self, symbol: str, **params) -> Dict[str, Any]:
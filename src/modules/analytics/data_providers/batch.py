@@ -0,0 +1,86 @@
+"""
+Several providers for one symbol from a single bar fetch.
+
+Charts request candlestick, volume, RSI, MACD, Bollinger and ATR for the
+same symbol and interval. Bar-series providers (those with bars_needed())
+are grouped by interval; each group loads the longest series it needs once
+and every provider computes from its own tail of it. Providers answered
+from incremental indicator state skip the fetch. Other providers are
+served by their regular get_data(). With `since`, every bar-series
+provider returns only its points from that bar on.
+"""
+
+from .registry import DataProviderRegistry
+
+
+def split_params(names, params):
+    """
+    Per-provider parameters from one query string.
+
+    Unprefixed keys apply to every provider; `<provider>.<key>` keys apply
+    to that provider only and take precedence (e.g. rsi.period=14 next to
+    bollinger.period=20).
+
+    Returns:
+        Dictionary of {provider_name: params}
+    """
+    per_provider = {name: {k: v for k, v in params.items() if '.' not in k} for name in names}
+    for key, value in params.items():
+        name, _, sub_key = key.partition('.')
+        if sub_key and name in per_provider:
+            per_provider[name][sub_key] = value
+    return per_provider
+
+
+def get_batch(symbol, names, params):
+    """
+    Run several registered providers for one symbol.
+
+    Args:
+        symbol: Trading pair symbol
+        names: Provider names, all registered
+        params: Shared and provider-prefixed parameters (see split_params)
+
+    Returns:
+        Dictionary of {provider_name: data} in the order of `names`
+    """
+    names = list(dict.fromkeys(names))
+    per_provider = split_params(names, params)
+    results = {}
+
+    groups = {}
+    for name in names:
+        provider = DataProviderRegistry.get(name)
+        needed = provider.bars_needed(**per_provider[name])
+        if needed is None:
+            results[name] = provider.get_data(symbol, **per_provider[name])
+            continue
+
+        try:
+            state_params, compute_params, since = provider._delta_params(symbol, per_provider[name])
+        except Exception as e:
+            print(f"Error resolving since for batch {symbol} {name}: {e}")
+            results[name] = []
+            continue
+
+        results[name] = provider._since_tail(provider._state_result(symbol, **state_params), since)
+        if results[name] is None:
+            interval = compute_params.get('interval', '1m')
+            needed = provider.bars_needed(**compute_params)
+            groups.setdefault(interval, []).append((name, provider, needed, compute_params, since))
+
+    for interval, members in groups.items():
+        try:
+            bars = members[0][1]._load_bars(symbol, interval, max(member[2] for member in members))
+        except Exception as e:
+            print(f"Error loading bars for batch {symbol} {interval}: {e}")
+            bars = None
+
+        for name, provider, needed, compute_params, since in members:
+            if bars is None:
+                results[name] = []
+                continue
+            tail = bars.iloc[max(len(bars) - needed, 0):].reset_index(drop=True)
+            results[name] = provider._since_tail(provider.compute(symbol, tail, **compute_params), since)
+
+    return {name: results[name] for name in names}
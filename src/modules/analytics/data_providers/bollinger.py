@@ -2,66 +2,41 @@
 Bollinger Bands data provider.
 """
 
-import pandas as pd
 import numpy as np
 from .base import DataProvider
+from src.modules.marketdata.columnar import wants_columnar, columnar
 
 
 class BollingerProvider(DataProvider):
     """Provider for Bollinger Bands indicator data."""
     
+    def bars_needed(self, **params):
+        # Lấy dư thêm data để tính SMA đoạn đầu chính xác
+        return params.get('limit', 200) + params.get('period', 20) + 1
+    
     def get_data(self, symbol: str, **params):
+        return self._get_bar_data(symbol, **params)
+    
+    def _from_state(self, symbol, **params):
+        key = (params.get('period', 20), params.get('std_dev', 2))
+        series = self._indicator_state(symbol, 'bollinger', key, params)
+        if series is None:
+            return None
+        times, (upper, middle, lower, price) = series
+        return self._respond(times, upper, middle, lower, price, params)
+    
+    def compute(self, symbol: str, bars, **params):
         period = params.get('period', 20)
         std_dev = params.get('std_dev', 2)
         limit = params.get('limit', 200)
-        interval = params.get('interval', '1m')
-        
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        needed_candles = limit + period + 1
-        fetch_limit = needed_candles * multiplier
 
         try:
-            conn = self._get_connection()
-            
-            # Fetch data
-            query = """
-            SELECT 
-                open_time,
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            # Lấy dư thêm data để tính SMA đoạn đầu chính xác
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
-            if df.empty or len(df) < period:
-                return []
-            
-            df = df.iloc[::-1].reset_index(drop=True)
-            df['open_time'] = pd.to_datetime(df['open_time'])
-            df['close_price'] = df['close_price'].astype(float)
-            
-            prices = df['close_price'].values
-
-            if interval != '1m':
-                df.set_index('open_time', inplace=True)
-                p_interval = interval.replace('m', 'min').replace('h', 'H').replace('d', 'D')
-                df = df.resample(p_interval).agg({'close_price': 'last'}).dropna()
-                df = df.reset_index()
+            df = bars[['open_time', 'close_price']]
 
             if len(df) < period:
                 return []
+            
+            prices = df['close_price'].values
 
             # 2. Tính SMA (Middle Band)
             # mode='valid' sẽ trả về mảng ngắn hơn mảng gốc (len - period + 1)
@@ -80,23 +55,49 @@ class BollingerProvider(DataProvider):
             upper_band = df_result['sma'] + (df_result['std'] * std_dev)
             lower_band = df_result['sma'] - (df_result['std'] * std_dev)
             
-            # Prepare result
-            result = []
-            for idx, row in df_result.iterrows():
-                result.append({
-                    'time': self._format_datetime_to_utc(row['open_time']),
-                    'upper': round(float(upper_band[idx]), 8),
-                    'middle': round(float(row['sma']), 8),
-                    'lower': round(float(lower_band[idx]), 8),
-                    'price': round(float(row['close_price']), 8)
-                })
-
-            return result
+            return self._respond(
+                df_result['open_time'].values,
+                upper_band.values,
+                df_result['sma'].values,
+                lower_band.values,
+                df_result['close_price'].values,
+                params
+            )
             
         except Exception as e:
             print(f"Error calculating Bollinger Bands: {e}")
             return []
     
+    def _respond(self, times, upper, middle, lower, price, params):
+        if wants_columnar(params):
+            return columnar(
+                self._epoch_ms(times),
+                upper=np.round(upper, 8),
+                middle=np.round(middle, 8),
+                lower=np.round(lower, 8),
+                price=np.round(price, 8)
+            )
+        
+        # Prepare result
+        result = [
+            {
+                'time': t,
+                'upper': round(u, 8),
+                'middle': round(m, 8),
+                'lower': round(l, 8),
+                'price': round(p, 8)
+            }
+            for t, u, m, l, p in zip(
+                self._format_times_to_utc(times),
+                upper.tolist(),
+                middle.tolist(),
+                lower.tolist(),
+                price.tolist()
+            )
+        ]
+
+        return result
+    
     def get_metadata(self):
         return {
             'name': 'Bollinger Bands',
@@ -2,13 +2,20 @@
 Candlestick data provider for OHLCV chart data.
 """
 
-import pandas as pd
 from .base import DataProvider
+from src.modules.marketdata.columnar import wants_columnar, columnar
+from src.modules.marketdata.timestamps import utc_iso, utc_epoch_ms
 
 
 class CandlestickProvider(DataProvider):
     """Provider for candlestick (OHLCV) data."""
     
+    # Candle times are wall-clock times labelled UTC
+    RESPONSE_TZ = 'UTC'
+    
+    def bars_needed(self, **params):
+        return params.get('limit', 200)
+    
     def get_data(self, symbol: str, **params):
         """
         Get candlestick data for charting.
@@ -17,6 +24,7 @@ class CandlestickProvider(DataProvider):
             symbol: Trading pair symbol
             limit: Number of candles to return (default: 200)
             interval: Time interval (default: '1m')
+            format: 'columnar' for one array per field with epoch-ms times
             
         Returns:
             List of candlestick dictionaries with time, open, high, low, close, volume
@@ -24,66 +32,45 @@ class CandlestickProvider(DataProvider):
         limit = params.get('limit', 200)
         interval = params.get('interval', '1m')
         print(f"Fetching {limit} candlesticks for {symbol} at interval {interval}")
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        fetch_limit = limit * multiplier
-
+        return self._get_bar_data(symbol, **params)
+    
+    def compute(self, symbol: str, df, **params):
+        """Candlesticks from preloaded bars."""
         try:
-            conn = self._get_connection()
-            
-            query = """
-            SELECT open_time, open_price, high_price, low_price, close_price, volume
-            FROM fact_klines
-            WHERE symbol = %s
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
             if df.empty:
                 print("No candlestick data found.")                
                 return []
-            
-            df = df.iloc[::-1]
-            
-            # if interval != '1m':
-            df['open_time'] = pd.to_datetime(df['open_time'])
-            df.set_index('open_time', inplace=True)
-            
-            p_interval = interval.replace('m', 'min')
-            
-            df = df.resample(p_interval).agg({
-                'open_price': 'first',
-                'high_price': 'max',
-                'low_price': 'min',
-                'close_price': 'last',
-                'volume': 'sum'
-            }).dropna()
-            df = df.reset_index()
 
-            df = df.tail(limit)
+            # Candle times are sent as-is (wall-clock time labelled UTC) so the
+            # chart axis shows local time
+            if wants_columnar(params):
+                return columnar(
+                    utc_epoch_ms(df['open_time'].values, source_tz='UTC'),
+                    open=df['open_price'].values,
+                    high=df['high_price'].values,
+                    low=df['low_price'].values,
+                    close=df['close_price'].values,
+                    volume=df['volume'].values
+                )
 
-            candlesticks = []
-            for _, row in df.iterrows():
-                t_val = row['open_time'] if 'open_time' in row else row.name
-                open_time_local = t_val.replace(tzinfo=None).isoformat() + 'Z'
-                
-                candlesticks.append({
-                    'time': open_time_local,
-                    'open': float(row['open_price']),
-                    'high': float(row['high_price']),
-                    'low': float(row['low_price']),
-                    'close': float(row['close_price']),
-                    'volume': float(row['volume'])
-                })
+            candlesticks = [
+                {
+                    'time': t,
+                    'open': o,
+                    'high': h,
+                    'low': l,
+                    'close': c,
+                    'volume': v
+                }
+                for t, o, h, l, c, v in zip(
+                    utc_iso(df['open_time'].values, source_tz='UTC'),
+                    df['open_price'].tolist(),
+                    df['high_price'].tolist(),
+                    df['low_price'].tolist(),
+                    df['close_price'].tolist(),
+                    df['volume'].tolist()
+                )
+            ]
             
             return candlesticks
             
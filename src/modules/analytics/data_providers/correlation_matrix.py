@@ -0,0 +1,102 @@
+"""
+Correlation matrix data provider for all tracked symbols.
+"""
+
+import numpy as np
+import pandas as pd
+from .base import DataProvider
+import src.config as config
+
+
+class CorrelationMatrixProvider(DataProvider):
+    """Provider for the N×N return correlation matrix of tracked symbols."""
+
+    def data_symbols(self, symbol, **params):
+        symbols = params.get('symbols') or config.SYMBOLS
+        if isinstance(symbols, str):
+            symbols = [s.strip() for s in symbols.split(',') if s.strip()]
+        return [symbol, *symbols]
+
+    def get_data(self, symbol: str, **params):
+        """
+        Get the correlation matrix of returns over the latest window.
+
+        Args:
+            symbol: Trading pair symbol, listed first in the matrix
+            symbols: Comma-separated symbols (default: config.SYMBOLS)
+            window: Number of returns in the correlation window (default: 30)
+            interval: Time interval (default: '1m')
+
+        Returns:
+            Dictionary with symbols, matrix (rows and columns in symbols order),
+            time of the latest bar, window and interval
+        """
+        window = params.get('window', 30)
+        interval = params.get('interval', '1m')
+        symbols = params.get('symbols') or config.SYMBOLS
+        if isinstance(symbols, str):
+            symbols = [s.strip() for s in symbols.split(',') if s.strip()]
+
+        # Requested symbol first, no duplicates
+        symbols = list(dict.fromkeys([symbol, *symbols]))
+        if len(symbols) < 2:
+            return {}
+
+        try:
+            return self._compute(symbols, interval, window)
+
+        except Exception as e:
+            print(f"Error calculating correlation matrix: {e}")
+            import traceback
+            traceback.print_exc()
+            return {}
+
+    def _compute(self, symbols, interval, window):
+        """Correlation of the last `window` aligned returns, in one matrix product."""
+        times, prices = self._load_panel(symbols, interval, window + 1)
+        if len(times) < 3:
+            print(f"Correlation matrix: Not enough aligned data points. Got {len(times)}, need {window + 1}")
+            return {}
+
+        returns = prices[:, 1:] / prices[:, :-1] - 1
+        returns = returns - returns.mean(axis=1, keepdims=True)
+        norms = np.sqrt(np.einsum('ij,ij->i', returns, returns))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = (returns @ returns.T) / np.outer(norms, norms)
+        # Constant series have no defined correlation; report 0 as CorrelationProvider does
+        matrix = np.clip(np.nan_to_num(matrix, nan=0.0, posinf=0.0, neginf=0.0), -1.0, 1.0)
+        np.fill_diagonal(matrix, 1.0)
+
+        return {
+            'symbols': symbols,
+            'matrix': np.round(matrix, 4).tolist(),
+            'time': self._format_datetime_to_utc(pd.Timestamp(int(times[-1]) * 60, unit='s')),
+            'window': returns.shape[1],
+            'interval': interval
+        }
+
+    def get_metadata(self):
+        """Return metadata about this provider."""
+        return {
+            'name': 'Correlation Matrix',
+            'description': 'Return correlation between every pair of tracked coins',
+            'parameters': {
+                'symbols': {
+                    'type': 'string',
+                    'default': None,
+                    'description': 'Comma-separated symbols (default: all tracked symbols)'
+                },
+                'window': {
+                    'type': 'integer',
+                    'default': 30,
+                    'description': 'Number of returns in the correlation window'
+                },
+                'interval': {
+                    'type': 'string',
+                    'default': '1m',
+                    'description': 'Time interval'
+                }
+            },
+            'data_format': '{symbols, matrix, time, window, interval}'
+        }
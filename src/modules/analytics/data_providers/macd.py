@@ -2,121 +2,90 @@
 MACD (Moving Average Convergence Divergence) data provider.
 """
 
-import pandas as pd
 import numpy as np
 from .base import DataProvider
+from src.modules.marketdata.columnar import wants_columnar, columnar
+from src.modules.stats import indicators
+from src.modules.stats.incremental import warmup_bars
 
 
 class MACDProvider(DataProvider):
     """Provider for MACD indicator data."""
     
+    WARMUP_DEPENDENT = True
+    
+    def bars_needed(self, **params):
+        # Lấy dư ra để tính EMA ban đầu cho chính xác
+        key = (params.get('fast_period', 12), params.get('slow_period', 26), params.get('signal_period', 9))
+        return params.get('limit', 200) + warmup_bars('macd', key)
+    
     def get_data(self, symbol: str, **params):
+        return self._get_bar_data(symbol, **params)
+    
+    def _from_state(self, symbol, **params):
+        key = (params.get('fast_period', 12), params.get('slow_period', 26), params.get('signal_period', 9))
+        series = self._indicator_state(symbol, 'macd', key, params)
+        if series is None:
+            return None
+        times, (macd_line, signal_line, histogram) = series
+        return self._respond(times, macd_line, signal_line, histogram, params)
+    
+    def compute(self, symbol: str, df, **params):
         fast_period = params.get('fast_period', 12)
         slow_period = params.get('slow_period', 26)
         signal_period = params.get('signal_period', 9)
         limit = params.get('limit', 200)
-        interval = params.get('interval', '1m')
-        
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-
-        needed_candles = limit + slow_period + signal_period + 1
-        fetch_limit = needed_candles * multiplier
 
         try:
-            conn = self._get_connection()
-            
-            # Fetch data (lấy dư ra để tính EMA ban đầu cho chính xác)
-            query = """
-            SELECT 
-                open_time,
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
-            if df.empty or len(df) < slow_period + signal_period:
-                return []
-            
-            df = df.iloc[::-1].reset_index(drop=True)
-            df['open_time'] = pd.to_datetime(df['open_time'])
-            df['close_price'] = df['close_price'].astype(float)
-            
-            if interval != '1m':
-                df.set_index('open_time', inplace=True)
-                p_interval = interval.replace('m', 'min').replace('h', 'H').replace('d', 'D')
-                df = df.resample(p_interval).agg({'close_price': 'last'}).dropna()
-                df = df.reset_index()
-
             if len(df) < slow_period + signal_period:
                 return []
             
-            # Calculate EMAs
-            prices = df['close_price'].values
-            
-            # Fast EMA
-            ema_fast = self._calculate_ema(prices, fast_period)
-            
-            # Slow EMA
-            ema_slow = self._calculate_ema(prices, slow_period)
-            
-            # MACD line
-            macd_line = ema_fast - ema_slow
-            
-            # Signal line (EMA of MACD)
-            # Lưu ý: Signal line tính trên MACD line, bỏ qua đoạn đầu chưa ổn định
-            signal_line = self._calculate_ema(macd_line, signal_period)
+            # MACD line, signal line (EMA of MACD) and histogram
+            macd_line, signal_line, histogram = indicators.macd(
+                df['close_price'].values, fast_period, slow_period, signal_period
+            )
             
-            # Histogram
-            histogram = macd_line - signal_line
-            
-            # Prepare result
-            result = []
             # Chỉ lấy dữ liệu từ điểm đã có đủ cả MACD và Signal
             # start_idx = slow_period + signal_period
             start_idx = max(0, len(df) - limit)
-
-            for i in range(start_idx, len(df)):
-                # if i < start_idx: continue # Bỏ qua đoạn đầu chưa tính đủ chỉ báo
-                
-                result.append({
-                    'time': self._format_datetime_to_utc(df.iloc[i]['open_time']),
-                    'macd': round(float(macd_line[i]), 8),
-                    'signal': round(float(signal_line[i]), 8),
-                    'histogram': round(float(histogram[i]), 8)
-                })
-            
-            # Return only requested limit
-            return result[-limit:]
+            return self._respond(
+                df['open_time'].values[start_idx:],
+                macd_line[start_idx:],
+                signal_line[start_idx:],
+                histogram[start_idx:],
+                params
+            )
             
         except Exception as e:
             print(f"Error calculating MACD: {e}")
             return []
     
-    def _calculate_ema(self, data, period):
-        """Calculate Exponential Moving Average."""
-        ema = np.zeros(len(data))
-        multiplier = 2 / (period + 1)
+    def _respond(self, times, macd_line, signal_line, histogram, params):
+        if wants_columnar(params):
+            return columnar(
+                self._epoch_ms(times),
+                macd=np.round(macd_line, 8),
+                signal=np.round(signal_line, 8),
+                histogram=np.round(histogram, 8)
+            )
         
-        # Start with SMA for the first valid point
-        # (Cách đơn giản: Lấy phần tử đầu tiên làm EMA đầu tiên)
-        ema[0] = data[0] 
-        
-        # Calculate EMA recursive
-        for i in range(1, len(data)):
-            ema[i] = (data[i] - ema[i - 1]) * multiplier + ema[i - 1]
+        # Prepare result
+        result = [
+            {
+                'time': t,
+                'macd': round(m, 8),
+                'signal': round(s, 8),
+                'histogram': round(h, 8)
+            }
+            for t, m, s, h in zip(
+                self._format_times_to_utc(times),
+                macd_line.tolist(),
+                signal_line.tolist(),
+                histogram.tolist()
+            )
+        ]
         
-        return ema
+        return result
     
     def get_metadata(self):
         return {
@@ -6,11 +6,15 @@ Shows distribution of closing prices over time.
 import pandas as pd
 import numpy as np
 from .base import DataProvider
+from src.modules.stats import sketch
 
 
 class PriceDistributionProvider(DataProvider):
     """Provider for Price Distribution data."""
     
+    # 1m ranges at least this long are served from the stored hourly sketches
+    SKETCH_MIN_CANDLES = 1440
+    
     def get_data(self, symbol: str, **params):
         """
         Get Price Distribution data - histogram of closing prices.
@@ -29,35 +33,57 @@ class PriceDistributionProvider(DataProvider):
         interval = params.get('interval', '1m')
         
         try:
-            conn = self._get_connection()
-            
-            query = """
-            SELECT 
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = %s
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, interval, limit))
-            conn.close()
-            
-            if df.empty:
-                return []
-            
-            # Get closing prices
-            prices = df['close_price'].astype(float).values
-            
-            # Calculate statistics for market state analysis
-            mean_price = float(np.mean(prices))
-            median_price = float(np.median(prices))
-            std_price = float(np.std(prices))
-            min_price = float(np.min(prices))
-            max_price = float(np.max(prices))
+            summary = None
+            if interval == '1m' and limit >= self.SKETCH_MIN_CANDLES:
+                try:
+                    summary = self._distribution_summary(symbol, 'price', limit)
+                except Exception as e:
+                    # e.g. hourly_distribution_sketches not created yet; fall back to raw candles
+                    print(f"Price Distribution: hourly sketches unavailable for {symbol}: {e}")
             
-            # Create histogram
-            hist, bin_edges = np.histogram(prices, bins=bins)
+            if summary is not None:
+                moments, quantiles = summary
+                if moments.n == 0:
+                    return []
+                count = moments.n
+                mean_price, std_price = moments.mean, moments.std
+                min_price, max_price = moments.min, moments.max
+                median_price = float(np.clip(quantiles.quantiles([0.5])[0], min_price, max_price))
+                
+                values, counts = quantiles.buckets()
+                values = np.clip(values, min_price, max_price)
+                hist, bin_edges = sketch.histogram_from_buckets(values, counts, bins, min_price, max_price)
+            else:
+                conn = self._get_connection()
+                
+                query = """
+                SELECT 
+                    close_price
+                FROM fact_klines
+                WHERE symbol = %s AND interval_code = %s
+                ORDER BY open_time DESC
+                LIMIT %s
+                """
+                
+                df = pd.read_sql(query, conn, params=(symbol, interval, limit))
+                conn.close()
+                
+                if df.empty:
+                    return []
+                
+                # Get closing prices
+                prices = df['close_price'].astype(float).values
+                count = len(prices)
+                
+                # Calculate statistics for market state analysis
+                mean_price = float(np.mean(prices))
+                median_price = float(np.median(prices))
+                std_price = float(np.std(prices))
+                min_price = float(np.min(prices))
+                max_price = float(np.max(prices))
+                
+                # Create histogram
+                hist, bin_edges = np.histogram(prices, bins=bins)
             
             # Prepare result with statistics
             result = []
@@ -67,7 +93,7 @@ class PriceDistributionProvider(DataProvider):
                     'price_max': round(bin_edges[i + 1], 2),
                     'price_center': round((bin_edges[i] + bin_edges[i + 1]) / 2, 2),
                     'count': int(hist[i]),
-                    'percentage': round((hist[i] / len(prices)) * 100, 2)
+                    'percentage': round((hist[i] / count) * 100, 2)
                 })
             
             # Add statistics to result
@@ -12,6 +12,7 @@ from .macd import MACDProvider
 from .bollinger import BollingerProvider
 from .schema_debug import SchemaDebugProvider
 from .correlation import CorrelationProvider
+from .correlation_matrix import CorrelationMatrixProvider
 from .atr import ATRProvider
 from .volume_profile import VolumeProfileProvider
 from .price_distribution import PriceDistributionProvider
@@ -80,6 +81,7 @@ DataProviderRegistry.register('macd', MACDProvider)
 DataProviderRegistry.register('bollinger', BollingerProvider)
 DataProviderRegistry.register('schema_debug', SchemaDebugProvider)
 DataProviderRegistry.register('correlation', CorrelationProvider)
+DataProviderRegistry.register('correlation_matrix', CorrelationMatrixProvider)
 DataProviderRegistry.register('atr', ATRProvider)
 DataProviderRegistry.register('volume_profile', VolumeProfileProvider)
 DataProviderRegistry.register('price_distribution', PriceDistributionProvider)
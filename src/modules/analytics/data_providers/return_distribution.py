@@ -3,14 +3,17 @@ Return Distribution data provider.
 Shows distribution of price returns (percentage changes) over time.
 """
 
-import pandas as pd
 import numpy as np
 from .base import DataProvider
+from src.modules.stats import sketch
 
 
 class ReturnDistributionProvider(DataProvider):
     """Provider for Return Distribution data."""
     
+    # 1m ranges at least this long are served from the stored hourly sketches
+    SKETCH_MIN_CANDLES = 1440
+    
     def get_data(self, symbol: str, **params):
         """
         Get Return Distribution data - histogram of price returns.
@@ -27,89 +30,75 @@ class ReturnDistributionProvider(DataProvider):
         bins = params.get('bins', 30)
         limit = params.get('limit', 200)
         interval = params.get('interval', '1m')
-        
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        fetch_limit = limit * multiplier
 
         try:
-            conn = self._get_connection()
-            
-            query = """
-            SELECT 
-                open_time,
-                open_price,
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
-            if df.empty or len(df) < 2:
-                return []
+            summary = None
+            if self._interval_minutes(interval) == 1 and limit >= self.SKETCH_MIN_CANDLES:
+                try:
+                    summary = self._distribution_summary(symbol, 'return', limit)
+                except Exception as e:
+                    # e.g. hourly_distribution_sketches not created yet; fall back to raw candles
+                    print(f"Return Distribution: hourly sketches unavailable for {symbol}: {e}")
             
-            # Reverse to get chronological order
-            df = df.iloc[::-1].reset_index(drop=True)
-            df['open_time'] = pd.to_datetime(df['open_time'])
-
-            if interval != '1m':
-                df.set_index('open_time', inplace=True)
-                p_interval = interval.replace('m', 'min').replace('h', 'H').replace('d', 'D')
+            if summary is not None:
+                moments, quantiles = summary
+                if moments.n < 2:
+                    return []
+                count = moments.n
+                mean_return, std_return = moments.mean, moments.std
+                min_return, max_return = moments.min, moments.max
+                skewness, kurtosis = moments.skewness, moments.kurtosis
                 
-                df = df.resample(p_interval).agg({
-                    'open_price': 'first',
-                    'close_price': 'last'
-                }).dropna()
-                df = df.reset_index()
+                # Bucket values are within alpha of the true value; keep them inside the observed range
+                values, counts = quantiles.buckets()
+                values = np.clip(values, min_return, max_return)
+                p5, p25, p50, p75, p95 = np.clip(
+                    quantiles.quantiles([0.05, 0.25, 0.5, 0.75, 0.95]), min_return, max_return
+                )
+                percentiles = {'p5': p5, 'p25': p25, 'p50': p50, 'p75': p75, 'p95': p95}
+                hist, bin_edges = sketch.histogram_from_buckets(values, counts, bins, min_return, max_return)
+            else:
+                df = self._load_bars(symbol, interval, limit)
 
-            # Calculate returns (percentage change)
-            open_prices = df['open_price'].astype(float).values
-            close_prices = df['close_price'].astype(float).values
-            if len(df) < 2:
-                return []
+                # Calculate returns (percentage change)
+                open_prices = df['open_price'].astype(float).values
+                close_prices = df['close_price'].astype(float).values
+                if len(df) < 2:
+                    return []
 
-            # Calculate return percentage: ((close - open) / open) * 100
-            returns = ((close_prices - open_prices) / open_prices) * 100
-            
-            # Calculate risk statistics
-            mean_return = float(np.mean(returns))
-            std_return = float(np.std(returns))
-            min_return = float(np.min(returns))
-            max_return = float(np.max(returns))
-            
-            # Calculate skewness (measure of asymmetry)
-            if len(returns) > 2 and std_return > 0:
-                skewness = float(np.mean(((returns - mean_return) / std_return) ** 3))
-            else:
-                skewness = 0.0
-            
-            # Calculate kurtosis (measure of tail heaviness)
-            if len(returns) > 2 and std_return > 0:
-                kurtosis = float(np.mean(((returns - mean_return) / std_return) ** 4)) - 3.0
-            else:
-                kurtosis = 0.0
-            
-            # Calculate percentiles for risk analysis
-            percentiles = {
-                'p5': float(np.percentile(returns, 5)),
-                'p25': float(np.percentile(returns, 25)),
-                'p50': float(np.percentile(returns, 50)),
-                'p75': float(np.percentile(returns, 75)),
-                'p95': float(np.percentile(returns, 95))
-            }
-            
-            # Create histogram
-            hist, bin_edges = np.histogram(returns, bins=bins)
+                # Calculate return percentage: ((close - open) / open) * 100
+                returns = sketch.metric_values('return', open_prices, close_prices)
+                count = len(returns)
+                
+                # Calculate risk statistics
+                mean_return = float(np.mean(returns))
+                std_return = float(np.std(returns))
+                min_return = float(np.min(returns))
+                max_return = float(np.max(returns))
+                
+                # Calculate skewness (measure of asymmetry)
+                if len(returns) > 2 and std_return > 0:
+                    skewness = float(np.mean(((returns - mean_return) / std_return) ** 3))
+                else:
+                    skewness = 0.0
+                
+                # Calculate kurtosis (measure of tail heaviness)
+                if len(returns) > 2 and std_return > 0:
+                    kurtosis = float(np.mean(((returns - mean_return) / std_return) ** 4)) - 3.0
+                else:
+                    kurtosis = 0.0
+                
+                # Calculate percentiles for risk analysis
+                percentiles = {
+                    'p5': float(np.percentile(returns, 5)),
+                    'p25': float(np.percentile(returns, 25)),
+                    'p50': float(np.percentile(returns, 50)),
+                    'p75': float(np.percentile(returns, 75)),
+                    'p95': float(np.percentile(returns, 95))
+                }
+                
+                # Create histogram
+                hist, bin_edges = np.histogram(returns, bins=bins)
             
             # Prepare result
             result = []
@@ -119,7 +108,7 @@ class ReturnDistributionProvider(DataProvider):
                     'return_max': round(bin_edges[i + 1], 4),
                     'return_center': round((bin_edges[i] + bin_edges[i + 1]) / 2, 4),
                     'count': int(hist[i]),
-                    'percentage': round((hist[i] / len(returns)) * 100, 2)
+                    'percentage': round((hist[i] / count) * 100, 2)
                 })
             
             return {
@@ -131,7 +120,7 @@ class ReturnDistributionProvider(DataProvider):
                     'max': round(max_return, 4),
                     'skewness': round(skewness, 4),
                     'kurtosis': round(kurtosis, 4),
-                    'percentiles': {k: round(v, 4) for k, v in percentiles.items()}
+                    'percentiles': {k: round(float(v), 4) for k, v in percentiles.items()}
                 }
             }
             
@@ -2,14 +2,21 @@
 RSI (Relative Strength Index) data provider.
 """
 
-import pandas as pd
 import numpy as np
 from .base import DataProvider
+from src.modules.marketdata.columnar import wants_columnar, columnar
+from src.modules.stats import indicators
+from src.modules.stats.incremental import warmup_bars
 
 
 class RSIProvider(DataProvider):
     """Provider for RSI indicator data."""
     
+    WARMUP_DEPENDENT = True
+    
+    def bars_needed(self, **params):
+        return params.get('limit', 200) + warmup_bars('rsi', (params.get('period', 14),))
+    
     def get_data(self, symbol: str, **params):
         """
         Get RSI indicator data.
@@ -18,109 +25,55 @@ class RSIProvider(DataProvider):
             symbol: Trading pair symbol
             period: RSI period (default: 14)
             limit: Number of data points (default: 200)
+            format: 'columnar' for one array per field with epoch-ms times
             
         Returns:
             List of RSI data points with time and rsi value
         """
+        return self._get_bar_data(symbol, **params)
+    
+    def _from_state(self, symbol, **params):
+        series = self._indicator_state(symbol, 'rsi', (params.get('period', 14),), params)
+        if series is None:
+            return None
+        times, (rsi_values,) = series
+        return self._respond(times, rsi_values, params)
+    
+    def compute(self, symbol: str, df, **params):
+        """RSI from preloaded bars (more than `limit`, to seed the averages)."""
         period = params.get('period', 14)
         limit = params.get('limit', 200)
-        interval = params.get('interval', '1m')
-        
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        needed_candles = limit + period + 1 
-        fetch_limit = needed_candles * multiplier
 
         try:
-            conn = self._get_connection()
-            
-            # Fetch more data than needed for calculation
-            query = """
-            SELECT 
-                open_time,
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
-            if df.empty or len(df) < period + 1:
-                return []
-            
-            # Reverse to get chronological order
-            df = df.iloc[::-1]
-            df['open_time'] = pd.to_datetime(df['open_time'])
-            df['close_price'] = df['close_price'].astype(float)
-
-            if interval != '1m':
-                df.set_index('open_time', inplace=True)
-                p_interval = interval.replace('m', 'min').replace('h', 'H').replace('d', 'D')
-                df = df.resample(p_interval).agg({'close_price': 'last'}).dropna()
-                df = df.reset_index()
-
             if len(df) < period + 1:
                 return []
 
-            # Calculate RSI
-            prices = df['close_price'].values
-            deltas = np.diff(prices)
-            gains = np.where(deltas > 0, deltas, 0)
-            losses = np.where(deltas < 0, -deltas, 0)
-            
-            # Calculate average gains and losses
-            avg_gains = []
-            avg_losses = []
-            
-            # Initial averages
-            avg_gain = np.mean(gains[:period])
-            avg_loss = np.mean(losses[:period])
-            avg_gains.append(avg_gain)
-            avg_losses.append(avg_loss)
-            
-            # Smoothed averages
-            for i in range(period, len(gains)):
-                avg_gain = (avg_gain * (period - 1) + gains[i]) / period
-                avg_loss = (avg_loss * (period - 1) + losses[i]) / period
-                avg_gains.append(avg_gain)
-                avg_losses.append(avg_loss)
+            # Calculate RSI (element i belongs to bar i + period)
+            rsi_values = indicators.rsi(df['close_price'].values, period)[-limit:]
+            times = df['open_time'].iloc[period:].iloc[-limit:]
             
-            # Calculate RSI
-            rsi_values = []
-            for avg_gain, avg_loss in zip(avg_gains, avg_losses):
-                if avg_loss == 0:
-                    rsi = 100
-                else:
-                    rs = avg_gain / avg_loss
-                    rsi = 100 - (100 / (1 + rs))
-                rsi_values.append(rsi)
-            
-            # Prepare result
-            result = []
-            for i in range(len(rsi_values)):
-                idx = i + period
-                if idx < len(df):
-                    result.append({
-                        'time': self._format_datetime_to_utc(df.iloc[idx]['open_time']),
-                        'rsi': round(rsi_values[i], 2)
-                    })
-            
-            # Return only requested limit
-            return result[-limit:]
+            return self._respond(times.values, rsi_values, params)
             
         except Exception as e:
             print(f"Error calculating RSI: {e}")
             return []
     
+    def _respond(self, times, rsi_values, params):
+        """Format RSI values and their bar times."""
+        if wants_columnar(params):
+            return columnar(self._epoch_ms(times), rsi=np.round(rsi_values, 2))
+        
+        # Prepare result
+        result = [
+            {
+                'time': t,
+                'rsi': round(v, 2)
+            }
+            for t, v in zip(self._format_times_to_utc(times), rsi_values.tolist())
+        ]
+        
+        return result
+    
     def get_metadata(self):
         """Return metadata about this provider."""
         return {
@@ -0,0 +1,151 @@
+"""
+One indicator for many periods over a single bar fetch.
+
+Tuning thresholds needs RSI, ATR or Bollinger Bands for dozens of periods.
+Instead of one request (and one fetch) per period, the sweep loads the
+series once, long enough to seed the longest period, and returns a
+(periods x time) matrix per output field in columnar form. Each RSI and ATR
+row is seeded warmup_bars() before its first point like the single-period
+provider, so it equals that provider's response:
+
+    {"periods": [5, 6, ...], "time": [1767225600000, ...], "rsi": [[...], [...]]}
+
+Row i of each matrix belongs to periods[i]; times are UTC epoch milliseconds.
+"""
+
+import numpy as np
+
+from src.modules.marketdata import timestamps
+from src.modules.marketdata.columnar import columnar
+from src.modules.stats import indicators
+from src.modules.stats.incremental import INDICATORS, warmup_bars
+from .registry import DataProviderRegistry
+
+# Upper bound on periods per request
+MAX_PERIODS = 200
+
+
+def _rsi(bars, periods):
+    return {'rsi': np.round(indicators.rsi_matrix(bars['close_price'].values, periods), 2)}
+
+
+def _atr(bars, periods):
+    return {'atr': np.round(indicators.atr_matrix(
+        bars['high_price'].values, bars['low_price'].values, bars['close_price'].values, periods
+    ), 4)}
+
+
+def _bollinger(bars, periods, std_dev=2):
+    upper, middle, lower = indicators.bollinger_matrix(bars['close_price'].values, periods, std_dev)
+    return {
+        'upper': np.round(upper, 8),
+        'middle': np.round(middle, 8),
+        'lower': np.round(lower, 8),
+        'price': np.round(bars['close_price'].values, 8)
+    }
+
+
+SWEEPS = {
+    'rsi': _rsi,
+    'atr': _atr,
+    'bollinger': _bollinger,
+}
+
+
+def parse_periods(text):
+    """
+    Parse a period list.
+
+    Accepts a range `5..50`, a stepped range `5..50..5` or a comma list
+    `7,14,21` (ranges are inclusive).
+
+    Returns:
+        Sorted list of unique positive periods
+
+    Raises:
+        ValueError: If the text is malformed, a period is below 2 or there
+            are more than MAX_PERIODS periods
+    """
+    text = (text or '').strip()
+    if not text:
+        raise ValueError("periods parameter is required")
+
+    if '..' in text:
+        bounds = text.split('..')
+        if len(bounds) not in (2, 3):
+            raise ValueError(f"Invalid periods range: {text!r}")
+        start, stop = int(bounds[0]), int(bounds[1])
+        step = int(bounds[2]) if len(bounds) == 3 else 1
+        if step <= 0 or stop < start:
+            raise ValueError(f"Invalid periods range: {text!r}")
+        periods = list(range(start, stop + 1, step))
+    else:
+        periods = [int(p) for p in text.split(',') if p.strip()]
+
+    periods = sorted(set(periods))
+    if not periods or periods[0] < 2:
+        raise ValueError("Periods must be at least 2")
+    if len(periods) > MAX_PERIODS:
+        raise ValueError(f"At most {MAX_PERIODS} periods per sweep")
+    return periods
+
+
+def _without_nan(matrix):
+    """NaN (periods lacking history) as None, so the response stays valid JSON."""
+    if not np.isnan(matrix).any():
+        return matrix
+    values = matrix.astype(object)
+    values[np.isnan(matrix)] = None
+    return values
+
+
+def get_sweep(symbol, indicator, periods, params):
+    """
+    Compute one indicator for many periods from one bar fetch.
+
+    Args:
+        symbol: Trading pair symbol
+        indicator: Name in SWEEPS
+        periods: Periods from parse_periods()
+        params: interval (default '1m'), limit (default 200), std_dev (Bollinger)
+
+    Returns:
+        Columnar dictionary with 'periods', 'time' and one matrix per field
+        (a plain list for fields that do not depend on the period), or an
+        empty dictionary if the bars could not be loaded
+    """
+    interval = params.get('interval', '1m')
+    limit = params.get('limit', 200)
+    options = {'std_dev': params['std_dev']} if indicator == 'bollinger' and 'std_dev' in params else {}
+
+    # Periods sharing a warm-up are computed together from the same tail;
+    # rolling windows are exact from any start, so they share one
+    warmups = {period: warmup_bars(indicator, (period,)) for period in periods}
+    groups = {}
+    for period, warmup in warmups.items():
+        key = warmup if INDICATORS[indicator].recursive else max(warmups.values())
+        groups.setdefault(key, []).append(period)
+
+    provider = DataProviderRegistry.get(indicator)
+    try:
+        bars = provider._load_bars(symbol, interval, limit + max(warmups.values()))
+    except Exception as e:
+        print(f"Error loading bars for {indicator} sweep {symbol}: {e}")
+        return {}
+
+    n = min(len(bars), limit)
+    fields = {}
+    for warmup, group in groups.items():
+        rows = [periods.index(period) for period in group]
+        tail = bars.iloc[max(len(bars) - limit - warmup, 0):]
+        for name, values in SWEEPS[indicator](tail, group, **options).items():
+            values = values[..., values.shape[-1] - n:]
+            if values.ndim == 1:
+                fields[name] = values
+            else:
+                fields.setdefault(name, np.full((len(periods), n), np.nan))[rows] = values
+    return columnar(
+        timestamps.utc_epoch_ms(bars['open_time'].values[len(bars) - n:]),
+        periods=periods,
+        **{name: _without_nan(values) for name, values in fields.items()}
+    )
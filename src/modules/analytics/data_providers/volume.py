@@ -2,13 +2,16 @@
 Volume data provider for volume analysis charts.
 """
 
-import pandas as pd
 from .base import DataProvider
+from src.modules.marketdata.columnar import wants_columnar, columnar
 
 
 class VolumeProvider(DataProvider):
     """Provider for trading volume data."""
     
+    def bars_needed(self, **params):
+        return params.get('limit', 200)
+    
     def get_data(self, symbol: str, **params):
         """
         Get volume data over time.
@@ -16,67 +19,41 @@ class VolumeProvider(DataProvider):
             symbol: Trading pair symbol
             limit: Number of data points (default: 200)
             interval: Time interval (default: '1m')
+            format: 'columnar' for one array per field with epoch-ms times
         Returns:
             List of volume data points with time, volume, close_price, open_price
         """
-        limit = params.get('limit', 200)
-        interval = params.get('interval', '1m')
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        fetch_limit = limit * multiplier
-
+        return self._get_bar_data(symbol, **params)
+    
+    def compute(self, symbol: str, df, **params):
+        """Volume series from preloaded bars."""
         try:
-            conn = self._get_connection()
-            
-            query = """
-            SELECT 
-                open_time,
-                volume,
-                open_price,
-                close_price
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
             if df.empty:
                 return []
-            
-            # Reverse to get chronological order
-            df = df.iloc[::-1]
-            df['open_time'] = pd.to_datetime(df['open_time'])
 
-            if interval != '1m':
-                df.set_index('open_time', inplace=True)
-                p_interval = interval.replace('m', 'min').replace('h', 'H').replace('d', 'D')
-                
-                df = df.resample(p_interval).agg({
-                    'volume': 'sum',
-                    'open_price': 'first',
-                    'close_price': 'last'
-                }).dropna()
-                df = df.reset_index()
+            if wants_columnar(params):
+                return columnar(
+                    self._epoch_ms(df['open_time'].values),
+                    volume=df['volume'].fillna(0).values,
+                    price=df['close_price'].fillna(0).values,
+                    open=df['open_price'].fillna(0).values
+                )
 
-            df = df.tail(limit)
             # Convert to list of dictionaries
-            volume_data = []
-            for _, row in df.iterrows():
-                volume_data.append({
-                    'time': self._format_datetime_to_utc(row['open_time']),
-                    'volume': float(row['volume']) if pd.notna(row['volume']) else 0,
-                    'price': float(row['close_price']) if pd.notna(row['close_price']) else 0,
-                    'open': float(row['open_price']) if pd.notna(row['open_price']) else 0
-                })
+            volume_data = [
+                {
+                    'time': t,
+                    'volume': v,
+                    'price': c,
+                    'open': o
+                }
+                for t, v, c, o in zip(
+                    self._format_times_to_utc(df['open_time'].values),
+                    df['volume'].fillna(0).tolist(),
+                    df['close_price'].fillna(0).tolist(),
+                    df['open_price'].fillna(0).tolist()
+                )
+            ]
             
             return volume_data
             
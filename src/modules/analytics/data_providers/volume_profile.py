@@ -3,14 +3,19 @@ Volume Profile data provider.
 Shows volume distribution across different price levels.
 """
 
-import pandas as pd
 import numpy as np
 from .base import DataProvider
+import src.config as config
+from src.modules.marketdata.hot_store import to_epoch_minutes
+from src.modules.warehouse import volume_profiles
 
 
 class VolumeProfileProvider(DataProvider):
     """Provider for Volume Profile data."""
     
+    # Ranges at least this long are served from the stored hourly profiles
+    HOURLY_PROFILE_MIN_MINUTES = 1440
+    
     def get_data(self, symbol: str, **params):
         """
         Get Volume Profile data - volume distribution across price levels.
@@ -27,104 +32,67 @@ class VolumeProfileProvider(DataProvider):
         bins = params.get('bins', 20)
         limit = params.get('limit', 200)
         interval = params.get('interval', '1m')
-        
-        multiplier = 1
-        if interval.endswith('m'):
-            multiplier = int(interval.replace('m', ''))
-        elif interval.endswith('h'):
-            multiplier = int(interval.replace('h', '')) * 60
-        elif interval.endswith('d'):
-            multiplier = int(interval.replace('d', '')) * 1440
-            
-        fetch_limit = limit * multiplier
 
         try:
-            conn = self._get_connection()
-            
-            query = """
-            SELECT 
-                open_time,
-                high_price,
-                low_price,
-                close_price,
-                open_price,
-                volume
-            FROM fact_klines
-            WHERE symbol = %s AND interval_code = '1m'
-            ORDER BY open_time DESC
-            LIMIT %s
-            """
-            
-            df = pd.read_sql(query, conn, params=(symbol, fetch_limit))
-            conn.close()
-            
-            if df.empty:
-                return []
-
-            for col in ['high_price', 'low_price', 'close_price', 'open_price', 'volume']:
-                df[col] = df[col].astype(float)
-
-            # Reverse to get chronological order
-            df = df.iloc[::-1]
-            
-            # Calculate price range
-            min_price = min(df['low_price'].min(), df['open_price'].min())
-            max_price = max(df['high_price'].max(), df['close_price'].max())
-            
-            # Create price bins
-            price_bins = np.linspace(min_price, max_price, bins + 1)
-            bin_centers = (price_bins[:-1] + price_bins[1:]) / 2
-            
-            # Initialize volume for each bin
-            volume_profile = np.zeros(len(bin_centers))
-            
-            # Distribute volume across price levels for each candle
-            for _, row in df.iterrows():
-                high = float(row['high_price'])
-                low = float(row['low_price'])
-                vol = float(row['volume'])
+            minutes = self._interval_minutes(interval)
+            binned = None
+            if limit * minutes >= self.HOURLY_PROFILE_MIN_MINUTES:
+                try:
+                    binned = self._profile_from_hours(symbol, minutes, limit, bins)
+                except Exception as e:
+                    # e.g. hourly_volume_profiles not created yet; fall back to raw candles
+                    print(f"Volume Profile: hourly profiles unavailable for {symbol}: {e}")
+            
+            if binned is None:
+                # 1m candles spanning the bars: resampled bars would spread
+                # their volume over their whole high-low range
+                df = self._load_klines(symbol, limit * minutes)
+                
+                if df.empty:
+                    return []
                 
-                # Find bins that this candle covers
-                bin_indices = np.where((bin_centers >= low) & (bin_centers <= high))[0]
+                low = df['low_price'].to_numpy(dtype=float)
+                high = df['high_price'].to_numpy(dtype=float)
+                volume = df['volume'].to_numpy(dtype=float)
                 
-                if len(bin_indices) > 0:
-                    # Distribute volume equally across covered bins
-                    vol_per_bin = vol / len(bin_indices)
-                    volume_profile[bin_indices] += vol_per_bin
+                # Calculate price range
+                min_price = min(low.min(), df['open_price'].min())
+                max_price = max(high.max(), df['close_price'].max())
+                
+                # Create price bins
+                price_bins = np.linspace(min_price, max_price, bins + 1)
+                bin_centers = (price_bins[:-1] + price_bins[1:]) / 2
+                
+                volume_profile = self._spread_volume(bin_centers, low, high, volume)
+            else:
+                bin_centers, volume_profile = binned
             
-            # Prepare result
-            result = []
             total_volume = float(volume_profile.sum())
             
-            for i, (price, vol) in enumerate(zip(bin_centers, volume_profile)):
-                result.append({
-                    'price_level': round(price, 2),
-                    'volume': round(vol, 2),
-                    'volume_percentage': round((vol / total_volume * 100) if total_volume > 0 else 0, 2),
+            # Prepare result (bin centers are already in ascending price order)
+            percentages = volume_profile / total_volume * 100 if total_volume > 0 else np.zeros(bins)
+            result = [
+                {
+                    'price_level': round(float(price), 2),
+                    'volume': round(float(vol), 2),
+                    'volume_percentage': round(float(pct), 2),
                     'bin_index': i
-                })
-            
-            # Sort by price level
-            result.sort(key=lambda x: x['price_level'])
+                }
+                for i, (price, vol, pct) in enumerate(zip(bin_centers, volume_profile, percentages))
+            ]
             
             # Find POC (Point of Control) - price level with highest volume
             poc_index = np.argmax(volume_profile)
-            poc_price = round(bin_centers[poc_index], 2)
+            poc_price = round(float(bin_centers[poc_index]), 2)
             poc_volume = round(float(volume_profile[poc_index]), 2)
             
-            # Find value area (70% of volume) - prices containing 70% of total volume
+            # Find value area (70% of volume): the largest bins until their running total reaches 70%
             sorted_indices = np.argsort(volume_profile)[::-1]
-            cumulative_volume = 0
-            value_area_indices = []
-            for idx in sorted_indices:
-                cumulative_volume += volume_profile[idx]
-                value_area_indices.append(int(idx))
-                if cumulative_volume >= total_volume * 0.7:
-                    break
-            
-            value_area_prices = [round(bin_centers[i], 2) for i in value_area_indices]
-            value_area_min = round(min(value_area_prices), 2) if value_area_prices else poc_price
-            value_area_max = round(max(value_area_prices), 2) if value_area_prices else poc_price
+            cumulative_volume = np.cumsum(volume_profile[sorted_indices])
+            area_size = min(int(np.searchsorted(cumulative_volume, total_volume * 0.7, side='left')) + 1, bins)
+            value_area_prices = bin_centers[sorted_indices[:area_size]]
+            value_area_min = round(float(value_area_prices.min()), 2)
+            value_area_max = round(float(value_area_prices.max()), 2)
             
             return {
                 'profile': result,
@@ -145,6 +113,97 @@ class VolumeProfileProvider(DataProvider):
             traceback.print_exc()
             return []
     
+    def _profile_from_hours(self, symbol, minutes, limit, bins):
+        """
+        Volume profile of the latest `limit` bars from stored hourly histograms.
+        
+        Whole hours come from hourly_volume_profiles; the partial hours at
+        either end of the range and hours not aggregated yet are built from
+        fact_klines on the same log-price grid. The merged histogram is then
+        rebinned onto `bins` equal-width price bins.
+        
+        Returns:
+            Tuple (bin_centers, volume_profile), or None when no hourly profiles exist
+        """
+        span = self._latest_range(symbol, minutes, limit)
+        if span is None:
+            return None
+        start, end = span
+        first_hour = -(-start // 60) * 60
+        # The hour still in progress is always read from raw candles
+        last_hour = end // 60 * 60
+        
+        tick_bps = config.VOLUME_PROFILE_TICK_BPS
+        as_datetime = self._as_datetime
+        
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT hour_start, base_level, volumes
+                FROM hourly_volume_profiles
+                WHERE symbol = %s AND tick_bps = %s AND hour_start >= %s AND hour_start < %s
+                ORDER BY hour_start ASC
+            """, (symbol, tick_bps, as_datetime(first_hour), as_datetime(last_hour)))
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.close()
+                return None
+            
+            histograms = [(base, volume_profiles.unpack(blob)) for _, base, blob in rows]
+            covered_start = int(to_epoch_minutes([rows[0][0]])[0])
+            covered_end = int(to_epoch_minutes([rows[-1][0]])[0]) + 60
+            
+            # Minutes before the first stored hour and after the last one
+            for lo, hi in ((start, covered_start), (covered_end, end)):
+                if lo >= hi:
+                    continue
+                cursor.execute("""
+                    SELECT low_price, high_price, volume
+                    FROM fact_klines
+                    WHERE symbol = %s AND interval_code = '1m' AND open_time >= %s AND open_time < %s
+                """, (symbol, as_datetime(lo), as_datetime(hi)))
+                candles = np.array(cursor.fetchall(), dtype=np.float64).reshape(-1, 3)
+                histograms.append(volume_profiles.build_histogram(
+                    candles[:, 0], candles[:, 1], candles[:, 2], tick_bps
+                ))
+            cursor.close()
+        finally:
+            conn.close()
+        
+        base, volumes = volume_profiles.merge_histograms(histograms)
+        occupied = np.flatnonzero(volumes > 0)
+        if len(occupied) == 0:
+            return None
+        
+        # Price range spanned by levels that traded
+        min_price = float(volume_profiles.level_to_price(base + occupied[0], tick_bps))
+        max_price = float(volume_profiles.level_to_price(base + occupied[-1] + 1, tick_bps))
+        price_bins = np.linspace(min_price, max_price, bins + 1)
+        bin_centers = (price_bins[:-1] + price_bins[1:]) / 2
+        return bin_centers, volume_profiles.rebin(base, volumes, price_bins, tick_bps)
+    
+    @staticmethod
+    def _spread_volume(bin_centers, low, high, volume):
+        """
+        Spread each candle's volume equally over the bins whose center lies in [low, high].
+        
+        Every candle covers a contiguous run of bins, found with two binary
+        searches. Its share is added at the first bin and removed after the
+        last one in a difference array, whose running sum is the profile.
+        """
+        first = np.searchsorted(bin_centers, low, side='left')
+        stop = np.searchsorted(bin_centers, high, side='right')
+        covered = stop - first
+        
+        mask = covered > 0
+        share = volume[mask] / covered[mask]
+        size = len(bin_centers) + 1
+        diff = (np.bincount(first[mask], weights=share, minlength=size)
+                - np.bincount(stop[mask], weights=share, minlength=size))
+        # Running sums can leave tiny negative residue in empty bins
+        return np.maximum(np.cumsum(diff[:-1]), 0.0)
+    
     def get_metadata(self):
         """Return metadata about this provider."""
         return {
@@ -0,0 +1,228 @@
+"""
+Server-Sent Events push of new candles, indicator tails and order books.
+
+Every open chart used to poll the analytics endpoints. Instead, browsers
+subscribe to /api/stream/<symbol>?interval=<interval> and the transform
+pushes to them as data is loaded:
+
+    event: candles    closed bars since the last push, with the default
+                      indicator tails (batch endpoint format, columnar)
+    event: orderbook  the latest order book snapshot
+
+Each event is computed and serialized once per (symbol, interval) that has
+subscribers, then the same bytes are queued for every subscriber, so the
+work per load does not grow with the number of open tabs. Slow clients
+lose their oldest queued events rather than holding memory.
+
+The hub lives in the process that runs the transform (the API process
+when the pipeline is triggered or scheduled there).
+"""
+
+import json
+import queue
+import threading
+
+import numpy as np
+
+import src.config as config
+from src.modules.marketdata import timestamps
+from src.modules.marketdata.hot_store import to_epoch_minutes, from_epoch_minutes
+from src.modules.marketdata.resample import bucket_starts, parse_interval
+
+
+def sse_message(event, data):
+    """Encode one SSE event (data serialized as JSON)."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _until(result, end_ms):
+    """Columnar series cut to times at or before end_ms."""
+    if not isinstance(result, dict) or 'time' not in result:
+        return result
+    times = np.asarray(result['time'], dtype=np.int64)
+    stop = int(np.searchsorted(times, end_ms, side='right'))
+    return {
+        name: values[:stop] if isinstance(values, list) and len(values) == len(times) else values
+        for name, values in result.items()
+    }
+
+
+class Subscription:
+    """One client's queue of encoded events."""
+
+    def __init__(self, symbol, interval, max_queue):
+        self.symbol = symbol
+        self.interval = interval
+        self.minutes = parse_interval(interval)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def put(self, message):
+        """Queue a message, dropping the oldest one when the client lags."""
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class PushHub:
+    """Subscriptions per (symbol, interval) and the events published to them."""
+
+    def __init__(self, max_subscribers=None, max_queue=None):
+        self.max_subscribers = config.PUSH_MAX_SUBSCRIBERS if max_subscribers is None else max_subscribers
+        self.max_queue = config.PUSH_QUEUE_SIZE if max_queue is None else max_queue
+        # (symbol, interval) -> set of Subscription
+        self._topics = {}
+        # (symbol, interval) -> epoch minute of the last closed bar pushed
+        self._last_closed = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.errors = 0
+
+    def subscribe(self, symbol, interval='1m'):
+        """
+        Register a client for one symbol and interval.
+
+        Returns:
+            Subscription, or None when max_subscribers are connected
+
+        Raises:
+            ValueError: If the interval is not supported
+        """
+        subscription = Subscription(symbol, interval, self.max_queue)
+        with self._lock:
+            if sum(len(subs) for subs in self._topics.values()) >= self.max_subscribers:
+                return None
+            self._topics.setdefault((symbol, interval), set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        key = (subscription.symbol, subscription.interval)
+        with self._lock:
+            subscribers = self._topics.get(key)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[key]
+                self._last_closed.pop(key, None)
+
+    def _intervals(self, symbol):
+        with self._lock:
+            return [interval for s, interval in self._topics if s == symbol]
+
+    def publish(self, symbol, event, data, interval=None):
+        """
+        Send one event to the subscribers of a symbol.
+
+        Args:
+            symbol: Trading pair symbol
+            event: SSE event name
+            data: JSON-serializable payload, encoded once
+            interval: Only this interval's subscribers (default: all of the symbol)
+        """
+        message = sse_message(event, data)
+        with self._lock:
+            targets = [sub for (s, i), subs in self._topics.items()
+                       if s == symbol and interval in (None, i) for sub in subs]
+            self.published += 1
+            self.delivered += len(targets)
+        for subscription in targets:
+            subscription.put(message)
+
+    def on_klines(self, symbol, open_times):
+        """
+        Push the bars closed by a kline load to each subscribed interval.
+
+        Args:
+            symbol: Trading pair symbol
+            open_times: open_time datetimes of the loaded 1m candles
+        """
+        intervals = self._intervals(symbol)
+        if not intervals or not len(open_times):
+            return
+
+        from src.modules.analytics.data_providers.registry import DataProviderRegistry
+        latest = DataProviderRegistry.get('candlestick')._load_klines(symbol, 1)
+        if latest.empty:
+            return
+        latest_minute = int(to_epoch_minutes(latest['open_time'].values)[-1])
+        earliest_minute = int(to_epoch_minutes(open_times).min())
+
+        for interval in intervals:
+            try:
+                self._push_closed_bars(symbol, interval, earliest_minute, latest_minute)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error pushing candles for {symbol} {interval}: {e}")
+
+    def _push_closed_bars(self, symbol, interval, earliest_minute, latest_minute):
+        from src.modules.analytics.data_providers.batch import get_batch
+
+        minutes = parse_interval(interval)
+        # Bars ending at or before the latest candle are closed
+        last_closed = int(bucket_starts(latest_minute + 1, minutes)) - minutes
+        first = int(bucket_starts(earliest_minute, minutes))
+        previous = self._last_closed.get((symbol, interval))
+        if previous is not None:
+            first = min(first, previous + minutes)
+        if last_closed < first:
+            return
+
+        def indicator_ms(minute):
+            return int(timestamps.utc_epoch_ms(from_epoch_minutes([minute]))[0])
+
+        # Candle times are wall-clock times labelled UTC; indicator times are true UTC
+        names = ['candlestick', *config.PUSH_INDICATORS]
+        data = get_batch(symbol, names, {
+            'interval': interval,
+            'limit': config.PUSH_MAX_BARS,
+            'format': 'columnar',
+            'since': indicator_ms(first),
+            'candlestick.since': first * 60_000,
+        })
+        data = {
+            name: _until(result, last_closed * 60_000 if name == 'candlestick' else indicator_ms(last_closed))
+            for name, result in data.items()
+        }
+        self._last_closed[(symbol, interval)] = last_closed
+        self.publish(symbol, 'candles', {'symbol': symbol, 'interval': interval, **data}, interval=interval)
+
+    def on_depth(self, symbol):
+        """Push the latest order book snapshot to all subscribers of a symbol."""
+        if not self._intervals(symbol):
+            return
+        from src.modules.analytics.data_providers.registry import DataProviderRegistry
+        try:
+            book = DataProviderRegistry.get('orderbook').get_data(symbol)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error pushing orderbook for {symbol}: {e}")
+            return
+        self.publish(symbol, 'orderbook', {'symbol': symbol, **book})
+
+    def get_statistics(self):
+        """Get subscriber and delivery counts."""
+        with self._lock:
+            return {
+                'subscribers': sum(len(subs) for subs in self._topics.values()),
+                'topics': {f"{symbol}@{interval}": len(subs) for (symbol, interval), subs in self._topics.items()},
+                'published': self.published,
+                'delivered': self.delivered,
+                'dropped': sum(sub.dropped for subs in self._topics.values() for sub in subs),
+                'errors': self.errors
+            }
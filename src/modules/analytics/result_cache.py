@@ -0,0 +1,171 @@
+"""
+Result cache for analytics data providers.
+
+Charts re-poll every few seconds, mostly when no new candle has arrived.
+Provider responses are cached under (provider, symbol, normalized params,
+watermark), where the watermark is that of every symbol the response reads
+(DataProvider.data_symbols). The transform bumps a symbol's watermark on
+each load, so entries built from older data are never looked up again and
+age out of the LRU.
+
+The cache is bounded by entry count and by the approximate JSON size of
+the stored responses. RESULT_CACHE_TTL additionally expires entries for
+deployments where candles are loaded by another process, whose loads this
+process's watermarks do not see.
+
+Behind it sits an optional shared tier (shared_cache.py) holding the
+serialized responses for all worker processes under the same keys; a miss
+here checks the shared tier before computing. Concurrent misses for the
+same key are coalesced (single_flight.py), so only one of them computes.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import src.config as config
+from src.services import get_watermarks, get_shared_cache, get_single_flight
+from src.modules.analytics.shared_cache import key_string
+
+
+def normalize_params(params):
+    """Hashable, order-independent form of request parameters (200 and '200' match)."""
+    return tuple(sorted((str(k), str(v)) for k, v in params.items()))
+
+
+class ResultCache:
+    """LRU of provider responses keyed by request and data watermark."""
+
+    def __init__(self, max_entries=None, max_bytes=None, ttl=None):
+        self.max_entries = config.RESULT_CACHE_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = int(config.RESULT_CACHE_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.ttl = config.RESULT_CACHE_TTL if ttl is None else ttl
+        # key -> (stored_at, size, result)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def key(self, provider_name, provider, symbol, params):
+        """Cache key of a request, including the watermark of the data it reads."""
+        symbols = provider.data_symbols(symbol, **params)
+        return (provider_name, symbol, normalize_params(params), get_watermarks().token(symbols))
+
+    def get(self, key):
+        """Cached response, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[0] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, result, size=None):
+        """Store a response; responses larger than the whole cache are not kept."""
+        if size is None:
+            size = len(json.dumps(result, default=str))
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), size, result)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+    def _shared_get(self, shared, key):
+        try:
+            data = shared.get(key_string('result', key))
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"Error reading shared result cache: {e}")
+            return None
+        if data is None:
+            self.shared_misses += 1
+            return None
+        self.shared_hits += 1
+        return data
+
+    def _shared_set(self, shared, key, payload):
+        try:
+            shared.set(key_string('result', key), payload, ttl=self.ttl if self.ttl > 0 else 3600)
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"Error writing shared result cache: {e}")
+
+    def get_data(self, provider_name, provider, symbol, params):
+        """
+        provider.get_data() through the cache (in-process, then shared tier).
+
+        Empty responses (what providers return on errors) are not cached,
+        so a transient failure is retried on the next request.
+        """
+        key = self.key(provider_name, provider, symbol, params)
+        result = self.get(key)
+        if result is not None:
+            return result
+        return get_single_flight().do(key, lambda: self._load(key, provider, symbol, params))
+
+    def _load(self, key, provider, symbol, params):
+        shared = get_shared_cache()
+        payload = self._shared_get(shared, key) if shared is not None else None
+        if payload is not None:
+            result = json.loads(payload)
+            self.put(key, result, size=len(payload))
+            return result
+
+        result = provider.get_data(symbol, **params)
+        if result:
+            payload = json.dumps(result, default=str).encode()
+            if shared is not None:
+                self._shared_set(shared, key, payload)
+            self.put(key, result, size=len(payload))
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def _shared_statistics():
+        shared = get_shared_cache()
+        if shared is None:
+            return None
+        try:
+            return shared.get_statistics()
+        except Exception as e:
+            return {'error': str(e)}
+
+    def get_statistics(self):
+        """Get entry counts, size and hit statistics."""
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'shared_hits': self.shared_hits,
+            'shared_misses': self.shared_misses,
+            'shared_errors': self.shared_errors,
+            'shared': self._shared_statistics()
+        }
@@ -7,6 +7,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 import src.config as config
+from src.modules.marketdata.columnar import COLUMNAR, columnar
+from src.modules.marketdata.timestamps import utc_iso, utc_epoch_ms, from_utc_epoch_ms
 
 
 class AnalyticsService:
@@ -24,7 +26,7 @@ class AnalyticsService:
         """Get database connection."""
         return mysql.connector.connect(**self.db_config)
     
-    def get_candlestick_data(self, symbol, limit=200, interval='1m'):
+    def get_candlestick_data(self, symbol, limit=200, interval='1m', response_format=None, since=None):
         """
         Get candlestick (OHLCV) data for charting.
         
@@ -32,6 +34,9 @@ class AnalyticsService:
             symbol: Trading pair symbol
             limit: Number of candles to return
             interval: Time interval (default '1m')
+            response_format: 'columnar' for one array per field with epoch-ms times
+            since: Epoch ms of the last candle the client has; only candles
+                from that one on (new or still updating) are returned
             
         Returns:
             List of candlestick data dictionaries
@@ -48,12 +53,19 @@ class AnalyticsService:
                 close_price,
                 volume
             FROM fact_klines
-            WHERE symbol = %s AND interval_code = %s
+            WHERE symbol = %s AND interval_code = %s {since_filter}
             ORDER BY open_time DESC
             LIMIT %s
             """
             
-            df = pd.read_sql(query, conn, params=(symbol, interval, limit))
+            params = [symbol, interval]
+            if since is not None:
+                # Candle times are wall-clock times labelled UTC, so no zone conversion
+                params.append(from_utc_epoch_ms([since], 'UTC')[0].item())
+            df = pd.read_sql(
+                query.format(since_filter='AND open_time >= %s' if since is not None else ''),
+                conn, params=(*params, limit)
+            )
             conn.close()
             
             if df.empty:
@@ -62,19 +74,39 @@ class AnalyticsService:
             # Reverse to get chronological order
             df = df.iloc[::-1]
             
+            df = df.fillna({c: 0 for c in ['open_price', 'high_price', 'low_price', 'close_price', 'volume']})
+            open_times = pd.to_datetime(df['open_time']).values
+            
+            # Candle times are sent as-is (wall-clock time labelled UTC)
+            if response_format == COLUMNAR:
+                return columnar(
+                    utc_epoch_ms(open_times, source_tz='UTC'),
+                    open=df['open_price'].to_numpy(dtype=float),
+                    high=df['high_price'].to_numpy(dtype=float),
+                    low=df['low_price'].to_numpy(dtype=float),
+                    close=df['close_price'].to_numpy(dtype=float),
+                    volume=df['volume'].to_numpy(dtype=float)
+                )
+            
             # Convert to list of dictionaries
-            candlesticks = []
-            for _, row in df.iterrows():
-                # Use replace(tzinfo=UTC) then isoformat() to get proper UTC indicator
-                open_time_utc = row['open_time'].replace(tzinfo=None).isoformat() + 'Z' if pd.notna(row['open_time']) else None
-                candlesticks.append({
-                    'time': open_time_utc,
-                    'open': float(row['open_price']) if pd.notna(row['open_price']) else 0,
-                    'high': float(row['high_price']) if pd.notna(row['high_price']) else 0,
-                    'low': float(row['low_price']) if pd.notna(row['low_price']) else 0,
-                    'close': float(row['close_price']) if pd.notna(row['close_price']) else 0,
-                    'volume': float(row['volume']) if pd.notna(row['volume']) else 0
-                })
+            candlesticks = [
+                {
+                    'time': t,
+                    'open': o,
+                    'high': h,
+                    'low': l,
+                    'close': c,
+                    'volume': v
+                }
+                for t, o, h, l, c, v in zip(
+                    utc_iso(open_times, source_tz='UTC'),
+                    df['open_price'].astype(float).tolist(),
+                    df['high_price'].astype(float).tolist(),
+                    df['low_price'].astype(float).tolist(),
+                    df['close_price'].astype(float).tolist(),
+                    df['volume'].astype(float).tolist()
+                )
+            ]
             
             return candlesticks
             
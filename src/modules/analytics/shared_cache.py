@@ -0,0 +1,279 @@
+"""
+Shared cache tier for analytics results across worker processes.
+
+Each API worker keeps its own in-memory ResultCache, so with several
+workers every response would otherwise be computed once per process. This
+tier stores serialized responses where all workers on the host (or all
+hosts, with Redis) can read them, under the same key as the in-memory
+cache, including the symbol watermarks. The watermarks themselves are kept
+here too, so a load seen by the transform's process invalidates entries in
+every worker.
+
+Backends (SHARED_CACHE_BACKEND):
+    file  - one file per entry under SHARED_CACHE_DIR, written atomically
+            and read through mmap; pruned by TTL and SHARED_CACHE_MB
+    redis - any server speaking the Redis protocol at SHARED_CACHE_URL
+            (GET/SET/INCR only), through a small built-in RESP client
+    none  - in-process caching only
+"""
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: counters are only atomic within one process
+    fcntl = None
+
+import src.config as config
+
+
+def key_string(namespace, key):
+    """Stable string form of a cache key tuple (same across processes)."""
+    digest = hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class FileBackend:
+    """
+    Shared cache in a local directory.
+
+    Entries with a TTL live in `values/` behind an 8-byte expiry header and
+    are pruned oldest-first once the directory exceeds max_bytes. Entries
+    without a TTL (watermarks, counters) live in `meta/` and are never pruned.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or config.SHARED_CACHE_DIR
+        self.max_bytes = int(config.SHARED_CACHE_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        for sub in ('values', 'meta'):
+            os.makedirs(os.path.join(self.directory, sub), exist_ok=True)
+        self._sets = itertools.count(1)
+        self._tmp_names = itertools.count()
+        self._lock = threading.Lock()
+
+    def _path(self, key, persistent):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, 'meta' if persistent else 'values', name)
+
+    def _write(self, path, data):
+        # Write a private file and rename it over the entry, so readers never see a partial value
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.{next(self._tmp_names)}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b''
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    return view[:]
+        except FileNotFoundError:
+            return None
+
+    def get(self, key):
+        """Value stored under key, or None if missing or expired."""
+        data = self._read(self._path(key, persistent=True))
+        if data is not None:
+            return data
+        data = self._read(self._path(key, persistent=False))
+        if data is None or len(data) < 8:
+            return None
+        expires_at, = struct.unpack('<d', data[:8])
+        if time.time() > expires_at:
+            return None
+        return data[8:]
+
+    def set(self, key, value, ttl=None):
+        """Store value; without a ttl the entry is persistent and never pruned."""
+        if ttl is None:
+            self._write(self._path(key, persistent=True), value)
+            return
+        self._write(self._path(key, persistent=False), struct.pack('<d', time.time() + ttl) + value)
+        if next(self._sets) % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def incr(self, key):
+        """Atomically add one to a persistent integer counter and return it."""
+        path = self._path(key, persistent=True)
+        with self._lock, open(path + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                value = int(self._read(path) or 0) + 1
+                self._write(path, str(value).encode())
+                return value
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def prune(self):
+        """Delete expired entries, then the oldest ones until under max_bytes."""
+        directory = os.path.join(self.directory, 'values')
+        now = time.time()
+        entries = []
+        for entry in os.scandir(directory):
+            try:
+                st = entry.stat()
+                if entry.name.endswith('.tmp'):
+                    # Leftover of a crashed writer
+                    if now - st.st_mtime > 60:
+                        os.unlink(entry.path)
+                    continue
+                with open(entry.path, 'rb') as f:
+                    expires_at, = struct.unpack('<d', f.read(8))
+                if now > expires_at:
+                    os.unlink(entry.path)
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+            except (OSError, struct.error):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get_statistics(self):
+        directory = os.path.join(self.directory, 'values')
+        sizes = [entry.stat().st_size for entry in os.scandir(directory) if not entry.name.endswith('.tmp')]
+        return {'backend': 'file', 'directory': self.directory, 'entries': len(sizes), 'bytes': sum(sizes)}
+
+
+class RedisBackend:
+    """
+    Shared cache on a Redis-protocol server.
+
+    Speaks RESP2 directly over one socket (reconnecting after errors), so no
+    client library is needed; only GET, SET (with PX) and INCR are used.
+    """
+
+    def __init__(self, url=None, timeout=1.0):
+        parsed = urlparse(url or config.SHARED_CACHE_URL)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        if self.password:
+            self._roundtrip('AUTH', self.password)
+        if self.db:
+            self._roundtrip('SELECT', self.db)
+
+    def _close(self):
+        for resource in (self._reader, self._sock):
+            try:
+                if resource is not None:
+                    resource.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Connection closed by Redis server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload
+        if kind == b'-':
+            raise RuntimeError(payload.decode(errors='replace'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            return None if count < 0 else [self._reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def _roundtrip(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._reply()
+
+    def _command(self, *args):
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(*args)
+            except (OSError, ConnectionError):
+                self._close()
+                raise
+
+    def get(self, key):
+        return self._command('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            self._command('SET', key, value)
+        else:
+            self._command('SET', key, value, 'PX', max(int(ttl * 1000), 1))
+
+    def incr(self, key):
+        return self._command('INCR', key)
+
+    def get_statistics(self):
+        return {'backend': 'redis', 'host': self.host, 'port': self.port, 'db': self.db}
+
+
+BACKENDS = {
+    'file': FileBackend,
+    'redis': RedisBackend,
+}
+
+
+def create_backend(name=None):
+    """
+    Backend selected by SHARED_CACHE_BACKEND.
+
+    Returns:
+        A FileBackend or RedisBackend, or None for 'none'
+
+    Raises:
+        ValueError: If the name is not a known backend
+    """
+    name = (name or config.SHARED_CACHE_BACKEND).lower()
+    if name in ('', 'none'):
+        return None
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown shared cache backend: {name!r}")
+    return BACKENDS[name]()
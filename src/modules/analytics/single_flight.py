@@ -0,0 +1,101 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+When several dashboards open at once they ask for the same provider
+response at the same moment, before any of them has filled the result
+cache. Without coordination each request computes it on its own DB
+connection. SingleFlight lets the first request (the leader) compute the
+result while identical requests arriving meanwhile wait for it and share
+the leader's result, or its exception.
+
+Only computations in flight are shared; once the leader finishes, the key
+is released and the next request computes (or hits the cache) again.
+"""
+
+import threading
+
+import src.config as config
+
+
+class _Call:
+    """One in-flight computation and the requests waiting on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Map of key -> in-flight computation, with coalescing counters."""
+
+    def __init__(self, timeout=None):
+        self.timeout = config.SINGLE_FLIGHT_TIMEOUT if timeout is None else timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def do(self, key, fn):
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key: Hashable identity of the computation
+            fn: Zero-argument callable computing the result
+
+        Returns:
+            fn()'s result, computed by this caller or by the one in flight
+
+        Raises:
+            Whatever fn() raised in the leader
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            if call.done.wait(self.timeout if self.timeout > 0 else None):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # The leader is stuck; compute independently rather than queue behind it
+            with self._lock:
+                self.timeouts += 1
+            return fn()
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def get_statistics(self):
+        """Get coalescing counters."""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'waiting': sum(call.waiters for call in self._calls.values()),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'timeout': self.timeout
+            }
@@ -8,9 +8,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 class DataLakeManager:
-    def __init__(self):
+    def __init__(self, minio_client: MinioClient = None):
         # Initialize MinIO client - MANDATORY, no fallback
-        self.minio_client = MinioClient()
+        self.minio_client = minio_client or MinioClient()
         logger.info("DataLakeManager initialized with MinIO storage")
     
     def get_db_connection(self):
@@ -3,6 +3,7 @@ from minio.error import S3Error
 import src.config as config
 import io
 import logging
+import threading
 from urllib3.util.retry import Retry
 from urllib3 import PoolManager
 
@@ -14,6 +15,10 @@ class MinioClient:
     Provides S3-compatible object storage for the data lake.
     """
     
+    # Buckets already confirmed to exist, shared by all instances in the process
+    _verified_buckets = set()
+    _verified_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize MinIO client and ensure buckets exist."""
         # Configure retry strategy to handle disk space issues
@@ -46,12 +51,18 @@ class MinioClient:
         self._ensure_buckets()
     
     def _ensure_buckets(self):
-        """Create buckets if they don't exist."""
+        """Create buckets if they don't exist (checked once per process)."""
         try:
             for bucket in [self.bucket_raw, self.bucket_archive]:
-                if not self.client.bucket_exists(bucket):
-                    self.client.make_bucket(bucket)
-                    logger.info(f"Created MinIO bucket: {bucket}")
+                if bucket in MinioClient._verified_buckets:
+                    continue
+                with MinioClient._verified_lock:
+                    if bucket in MinioClient._verified_buckets:
+                        continue
+                    if not self.client.bucket_exists(bucket):
+                        self.client.make_bucket(bucket)
+                        logger.info(f"Created MinIO bucket: {bucket}")
+                    MinioClient._verified_buckets.add(bucket)
         except S3Error as e:
             logger.error(f"Error ensuring buckets exist: {e}")
             raise
@@ -13,11 +13,14 @@ logger = logging.getLogger(__name__)
 
 
 class ExtractionManager:
-    def __init__(self):
+    def __init__(self, minio_client: MinioClient = None, session: requests.Session = None):
         self.api_url = "https://api.binance.com/api/v3"
         
+        # Reuse one HTTP session so Binance connections are kept alive
+        self.session = session or requests.Session()
+        
         # Initialize MinIO client - MANDATORY, no fallback
-        self.minio_client = MinioClient()
+        self.minio_client = minio_client or MinioClient()
         logger.info("ExtractionManager initialized with MinIO storage")
 
 
@@ -82,7 +85,7 @@ class ExtractionManager:
             params["startTime"] = start_ms
         
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=10)
             if response.status_code == 200:
                 return response.json()
             else:
@@ -100,7 +103,7 @@ class ExtractionManager:
             "limit": limit
         }
         try:
-            response = requests.get(endpoint, params=params, timeout=10)
+            response = self.session.get(endpoint, params=params, timeout=10)
             if response.status_code == 200:
                 return response.json()
             else:
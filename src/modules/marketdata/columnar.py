@@ -0,0 +1,40 @@
+"""
+Columnar JSON responses for time series.
+
+The default responses are a list with one dict per bar, which costs a
+Python dict, a formatted time string and several float objects per row.
+With `format=columnar` the same series is returned as one list per field,
+built straight from NumPy arrays:
+
+    {"time": [1767225600000, ...], "open": [...], "close": [...]}
+
+Times are UTC epoch milliseconds (see timestamps.utc_epoch_ms), so clients
+can use them without parsing.
+"""
+
+import numpy as np
+
+COLUMNAR = 'columnar'
+
+
+def wants_columnar(params):
+    """True when the request parameters ask for the columnar format."""
+    return params.get('format') == COLUMNAR
+
+
+def columnar(times_ms, **columns):
+    """
+    Build a columnar response.
+
+    Args:
+        times_ms: int64 epoch-millisecond times
+        **columns: Field name -> array of values (one per time), or a scalar
+            that applies to the whole series
+
+    Returns:
+        Dictionary with 'time' and one list (or scalar) per field
+    """
+    result = {'time': np.asarray(times_ms, dtype=np.int64).tolist()}
+    for name, values in columns.items():
+        result[name] = values.tolist() if isinstance(values, np.ndarray) else values
+    return result
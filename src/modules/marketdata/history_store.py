@@ -0,0 +1,325 @@
+"""
+Memory-mapped on-disk columnar history of 1m candles.
+
+Each symbol gets a directory under HISTORY_STORE_DIR holding one raw,
+fixed-width file per column: open_time.i64 (int64 epoch minutes, see
+hot_store) and one .f64 file per OHLCV column. Files are append-only and
+sorted by time, so a time range is located with a binary search on the
+open_time column and read as memmap slices without parsing anything.
+
+The transform stage appends committed candles; a full rebuild from the
+warehouse marks a symbol as complete, after which readers trust it.
+Candles that land inside the stored range (gap repair, backfills) would
+need a rewrite of every column file, so they are appended to late.bin
+instead and merged in one rewrite per symbol by flush_late(); while that
+file exists readers treat the symbol as incomplete and use the warehouse.
+
+Writers in different processes (the API and backfill_recent_data.py) are
+serialized with an flock on a per-symbol lock file next to the directory.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process
+    fcntl = None
+
+import mysql.connector
+import numpy as np
+
+import src.config as config
+from src.modules.marketdata.hot_store import COLUMNS, to_epoch_minutes
+
+logger = logging.getLogger(__name__)
+
+TIME_FILE = 'open_time.i64'
+META_FILE = 'meta.json'
+LATE_FILE = 'late.bin'
+LATE_DTYPE = np.dtype([('open_time', '<i8'), ('values', '<f8', (len(COLUMNS),))])
+
+
+class HistoryStore:
+    """Append-only columnar kline files, one directory per symbol."""
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or config.HISTORY_STORE_DIR
+        self._lock = threading.Lock()
+        # symbol -> ((row count, inode), time memmap, {column: memmap})
+        self._maps = {}
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.base_dir, symbol)
+
+    @contextlib.contextmanager
+    def _locked(self, symbol):
+        """Exclusive write access to a symbol's files, across threads and processes."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        with self._lock, open(self._symbol_dir(symbol) + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _column_path(self, symbol, column):
+        return os.path.join(self._symbol_dir(symbol), f"{column}.f64")
+
+    def _file_state(self, symbol):
+        """(rows fully written, inode) of the time column, which is always written last."""
+        try:
+            st = os.stat(os.path.join(self._symbol_dir(symbol), TIME_FILE))
+            return st.st_size // 8, st.st_ino
+        except OSError:
+            return 0, None
+
+    def version(self, symbol):
+        """Token that changes whenever the symbol's files are appended to or rewritten."""
+        try:
+            st = os.stat(os.path.join(self._symbol_dir(symbol), TIME_FILE))
+        except OSError:
+            return None
+        # In-place overwrites of existing rows touch the column files, not the time file
+        mtimes = []
+        for column in COLUMNS:
+            try:
+                mtimes.append(os.stat(self._column_path(symbol, column)).st_mtime_ns)
+            except OSError:
+                return None
+        return ('history', st.st_ino, st.st_size, st.st_mtime_ns, max(mtimes))
+
+    def _row_count(self, symbol):
+        return self._file_state(symbol)[0]
+
+    def _is_rebuilt(self, symbol):
+        try:
+            with open(os.path.join(self._symbol_dir(symbol), META_FILE)) as f:
+                return bool(json.load(f).get('complete'))
+        except (OSError, ValueError):
+            return False
+
+    def _late_path(self, symbol):
+        return os.path.join(self._symbol_dir(symbol), LATE_FILE)
+
+    def is_complete(self, symbol):
+        """True once the symbol has been rebuilt from the warehouse and has no unmerged late candles."""
+        return self._is_rebuilt(symbol) and not os.path.exists(self._late_path(symbol))
+
+    def _open(self, symbol):
+        """Return (n, times, {column: values}) memmaps, remapping after growth or rewrite."""
+        state = self._file_state(symbol)
+        n = state[0]
+        cached = self._maps.get(symbol)
+        if cached is not None and cached[0] == state:
+            return (n,) + cached[1:]
+        if n == 0:
+            return 0, np.empty(0, dtype=np.int64), {c: np.empty(0, dtype=np.float64) for c in COLUMNS}
+
+        times = np.memmap(os.path.join(self._symbol_dir(symbol), TIME_FILE), dtype=np.int64, mode='r', shape=(n,))
+        columns = {
+            c: np.memmap(self._column_path(symbol, c), dtype=np.float64, mode='r', shape=(n,))
+            for c in COLUMNS
+        }
+        self._maps[symbol] = (state, times, columns)
+        return n, times, columns
+
+    def _write_all(self, symbol, times, values, complete):
+        """Atomically replace a symbol's files with sorted, unique rows."""
+        symbol_dir = self._symbol_dir(symbol)
+        tmp_dir = symbol_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for i, column in enumerate(COLUMNS):
+            np.ascontiguousarray(values[i], dtype=np.float64).tofile(os.path.join(tmp_dir, f"{column}.f64"))
+        np.ascontiguousarray(times, dtype=np.int64).tofile(os.path.join(tmp_dir, TIME_FILE))
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump({'complete': complete, 'updated_at': datetime.now().isoformat()}, f)
+
+        self._maps.pop(symbol, None)
+        old_dir = symbol_dir + '.old'
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(symbol_dir):
+            os.rename(symbol_dir, old_dir)
+        os.rename(tmp_dir, symbol_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def append(self, symbol, open_times, ohlcv):
+        """
+        Add candles for a symbol.
+
+        New candles after the last stored one are appended to the files;
+        candles for existing times are overwritten in place; anything that
+        would land inside the existing range is held until flush_late().
+
+        Args:
+            symbol: Trading pair symbol
+            open_times: Sequence of naive open_time datetimes
+            ohlcv: Array-like of shape (n, 5) with open, high, low, close, volume
+        """
+        if len(open_times) == 0:
+            return
+
+        times = to_epoch_minutes(open_times)
+        values = np.asarray(ohlcv, dtype=np.float64).reshape(len(times), len(COLUMNS)).T
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[:, order]
+        last_of_group = np.append(times[1:] != times[:-1], True)
+        times, values = times[last_of_group], values[:, last_of_group]
+
+        with self._locked(symbol):
+            n, stored_times, stored = self._open(symbol)
+
+            if n == 0:
+                self._write_all(symbol, times, values, complete=False)
+                return
+
+            # Overwrite candles we already have (e.g. the still-open last minute)
+            pos = np.searchsorted(stored_times, times)
+            in_range = pos < n
+            existing = np.zeros(len(times), dtype=bool)
+            existing[in_range] = stored_times[pos[in_range]] == times[in_range]
+            newer = times > stored_times[-1]
+
+            late = ~(existing | newer)
+            if late.any():
+                self._hold_late(symbol, times[late], values[:, late])
+                keep = ~late
+                times, values, pos = times[keep], values[:, keep], pos[keep]
+                existing, newer = existing[keep], newer[keep]
+
+            if existing.any():
+                for i, column in enumerate(COLUMNS):
+                    with open(self._column_path(symbol, column), 'r+b') as f:
+                        for p, v in zip(pos[existing], values[i, existing]):
+                            f.seek(int(p) * 8)
+                            f.write(np.float64(v).tobytes())
+                self._maps.pop(symbol, None)
+
+            if newer.any():
+                # Write at row n (dropping leftovers of an interrupted append), time column last
+                for i, column in enumerate(COLUMNS):
+                    self._write_at(self._column_path(symbol, column), n, values[i, newer])
+                self._write_at(os.path.join(self._symbol_dir(symbol), TIME_FILE), n, times[newer])
+
+    @staticmethod
+    def _write_at(path, row, data):
+        with open(path, 'r+b') as f:
+            f.seek(row * 8)
+            f.write(np.ascontiguousarray(data).tobytes())
+            f.truncate()
+
+    def _hold_late(self, symbol, times, values):
+        """Append candles inside the stored range to late.bin for flush_late()."""
+        rows = np.empty(len(times), dtype=LATE_DTYPE)
+        rows['open_time'] = times
+        rows['values'] = values.T
+        with open(self._late_path(symbol), 'ab') as f:
+            f.write(rows.tobytes())
+
+    def flush_late(self, symbols=None):
+        """
+        Merge late candles into the files, one rewrite per symbol.
+
+        Args:
+            symbols: Symbols to flush (default: every stored symbol)
+        """
+        for symbol in self._stored_symbols() if symbols is None else symbols:
+            if not os.path.exists(self._late_path(symbol)):
+                continue
+            with self._locked(symbol):
+                try:
+                    rows = np.fromfile(self._late_path(symbol), dtype=LATE_DTYPE)
+                except FileNotFoundError:
+                    continue
+                self._merge(symbol, rows['open_time'], rows['values'].T)
+                logger.info(f"History store merged {len(rows)} late candles for {symbol}")
+
+    def _merge(self, symbol, times, values):
+        """Rewrite the files with late candles (gap fills) merged in; later rows win."""
+        n, stored_times, stored = self._open(symbol)
+        all_times = np.concatenate([np.asarray(stored_times), times])
+        all_values = np.concatenate([np.vstack([stored[c] for c in COLUMNS]), values], axis=1)
+        order = np.argsort(all_times, kind='stable')
+        all_times, all_values = all_times[order], all_values[:, order]
+        last_of_group = np.append(all_times[1:] != all_times[:-1], True)
+        # The rewritten directory has no late.bin
+        self._write_all(symbol, all_times[last_of_group], all_values[:, last_of_group], self._is_rebuilt(symbol))
+
+    def tail(self, symbol, limit):
+        """
+        Latest `limit` candles, or None when the store is not complete for the symbol.
+
+        Returns:
+            Tuple (times, values) with values as a (5, n) float64 array in COLUMNS order
+        """
+        if not self.is_complete(symbol):
+            return None
+        n, times, columns = self._open(symbol)
+        if n == 0:
+            return None
+        s = max(0, n - limit)
+        return times[s:], np.vstack([columns[c][s:] for c in COLUMNS])
+
+    def rebuild_from_warehouse(self, symbols, chunk_size=100000):
+        """Rewrite each symbol's files from fact_klines and mark them complete."""
+        conn = mysql.connector.connect(
+            host=config.DB_HOST,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            database=config.DB_NAME
+        )
+        cursor = conn.cursor()
+        try:
+            for symbol in symbols:
+                cursor.execute("""
+                    SELECT open_time, open_price, high_price, low_price, close_price, volume
+                    FROM fact_klines
+                    WHERE symbol = %s AND interval_code = '1m'
+                    ORDER BY open_time ASC
+                """, (symbol,))
+
+                time_chunks = []
+                value_chunks = []
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    time_chunks.append(to_epoch_minutes([row[0] for row in rows]))
+                    value_chunks.append(np.array([row[1:] for row in rows], dtype=np.float64).T)
+
+                if time_chunks:
+                    times = np.concatenate(time_chunks)
+                    values = np.concatenate(value_chunks, axis=1)
+                else:
+                    times = np.empty(0, dtype=np.int64)
+                    values = np.empty((len(COLUMNS), 0), dtype=np.float64)
+
+                # The warehouse already holds any late candles, so late.bin is dropped with the old files
+                with self._locked(symbol):
+                    self._write_all(symbol, times, values, complete=True)
+                logger.info(f"History store rebuilt {symbol}: {len(times)} candles")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _stored_symbols(self):
+        if not os.path.isdir(self.base_dir):
+            return []
+        return [name for name in sorted(os.listdir(self.base_dir))
+                if os.path.isdir(self._symbol_dir(name)) and not name.endswith(('.tmp', '.old'))]
+
+    def get_statistics(self):
+        """Get row counts per stored symbol."""
+        symbols = {}
+        for name in self._stored_symbols():
+            symbols[name] = {'candles': self._row_count(name), 'complete': self.is_complete(name)}
+        return {'symbols': symbols}
@@ -0,0 +1,360 @@
+"""
+In-memory hot store for recent 1m candles.
+
+Each process keeps the last HOT_STORE_DAYS of OHLCV per symbol in
+preallocated NumPy column arrays, so chart refreshes can be served without
+re-reading the same rows from MySQL. The store is filled from the warehouse
+at startup and appended to by the transform stage as kline files are loaded.
+
+Candles committed by another process (backfill_recent_data.py, another
+worker's transform) never reach this copy, so each buffer remembers the
+symbol's watermark generation it was warmed at. A read that finds the
+watermark moved by someone else, or the buffer older than HOT_STORE_TTL,
+re-warms the symbol from the warehouse first.
+
+Times are stored as int64 "epoch minutes" of the naive MySQL open_time
+(wall-clock minutes since 1970-01-01), which converts back to the same naive
+datetime without any timezone handling.
+"""
+
+import itertools
+import logging
+import threading
+import time
+
+import mysql.connector
+import numpy as np
+
+import src.config as config
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+
+def to_epoch_minutes(times):
+    """Convert naive datetimes (or datetime64 values) to int64 epoch minutes."""
+    return np.asarray(times, dtype='datetime64[m]').astype(np.int64)
+
+
+def from_epoch_minutes(minutes):
+    """Convert int64 epoch minutes to a datetime64[m] array (zero-copy view)."""
+    return np.asarray(minutes, dtype=np.int64).view('datetime64[m]')
+
+
+class _SymbolBuffer:
+    """
+    Ring buffer of candles for one symbol.
+
+    The arrays are twice the capacity so the live window is always one
+    contiguous slice: appends go to the end and, once the end is reached,
+    the newest `capacity` rows are copied into a fresh allocation. Readers
+    therefore get plain slices, and slices handed out earlier keep pointing
+    at the old arrays instead of being overwritten.
+    """
+
+    def __init__(self, capacity, serial):
+        self.capacity = capacity
+        # Identifies this buffer within its store; never reused, unlike id()
+        self.serial = serial
+        self.lock = threading.Lock()
+        # True when the buffer holds every candle the warehouse has for the symbol
+        self.complete = False
+        # Bumped on every change so derived data (resampled bars) can be reused safely
+        self.version = 0
+        # Watermark generation and monotonic time of the warehouse read (None if never warmed)
+        self.generation = None
+        self.warmed_at = None
+        self.start = 0
+        self.end = 0
+        self.times, self.values = self._allocate()
+
+    def _allocate(self):
+        size = 2 * self.capacity
+        return np.empty(size, dtype=np.int64), np.empty((len(COLUMNS), size), dtype=np.float64)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def _replace(self, times, values):
+        """Swap in new contents (already sorted and unique) using fresh arrays."""
+        if len(times) > self.capacity:
+            times = times[-self.capacity:]
+            values = values[:, -self.capacity:]
+            self.complete = False
+        new_times, new_values = self._allocate()
+        n = len(times)
+        new_times[:n] = times
+        new_values[:, :n] = values
+        self.times, self.values = new_times, new_values
+        self.start, self.end = 0, n
+
+    def append(self, times, values):
+        """Append sorted candles; older or duplicate times are merged in place."""
+        if len(times) == 0:
+            return
+        self.version += 1
+
+        if len(self) and times[0] <= self.times[self.end - 1]:
+            self._merge(times, values)
+            return
+
+        k = len(times)
+        if self.end + k > len(self.times):
+            keep = min(len(self), max(self.capacity - k, 0))
+            if keep < len(self):
+                self.complete = False
+            self._replace(self.times[self.end - keep:self.end], self.values[:, self.end - keep:self.end])
+            if k > self.capacity:
+                times, values, k = times[-self.capacity:], values[:, -self.capacity:], self.capacity
+                self.complete = False
+
+        self.times[self.end:self.end + k] = times
+        self.values[:, self.end:self.end + k] = values
+        self.end += k
+        if len(self) > self.capacity:
+            self.start = self.end - self.capacity
+            self.complete = False
+
+    def _merge(self, times, values):
+        """Slow path for late or corrected candles (updates, gap fills)."""
+        existing_times = self.times[self.start:self.end]
+        existing_values = self.values[:, self.start:self.end]
+
+        # Without the full history an older candle would leave a hole before it
+        if not self.complete and len(existing_times):
+            mask = times >= existing_times[0]
+            times, values = times[mask], values[:, mask]
+            if len(times) == 0:
+                return
+
+        all_times = np.concatenate([existing_times, times])
+        all_values = np.concatenate([existing_values, values], axis=1)
+
+        # Stable sort keeps the new row after the old one for equal times
+        order = np.argsort(all_times, kind='stable')
+        all_times = all_times[order]
+        all_values = all_values[:, order]
+        last_of_group = np.append(all_times[1:] != all_times[:-1], True)
+        self._replace(all_times[last_of_group], all_values[:, last_of_group])
+
+    def window(self, limit):
+        """Latest `limit` candles as views, or None if the buffer cannot answer."""
+        n = len(self)
+        if n == 0 or (limit > n and not self.complete):
+            return None
+        s = max(self.start, self.end - limit)
+        return self.times[s:self.end], self.values[:, s:self.end]
+
+
+class HotStore:
+    """Process-wide store of the most recent 1m candles per symbol."""
+
+    def __init__(self, days=None, ttl=None):
+        self.days = days or config.HOT_STORE_DAYS
+        self.capacity = self.days * 1440
+        self.ttl = config.HOT_STORE_TTL if ttl is None else ttl
+        self._buffers = {}
+        self._lock = threading.Lock()
+        # Serializes re-warms so concurrent readers of a stale symbol query once
+        self._warm_lock = threading.Lock()
+        self._serials = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.rewarms = 0
+
+    @staticmethod
+    def _generation(symbol):
+        from src.services import get_watermarks
+        return get_watermarks().get(symbol)[1]
+
+    def _is_stale(self, symbol, buffer):
+        """True when the warehouse may hold candles the buffer has not seen."""
+        if buffer.warmed_at is None:
+            return False
+        if self.ttl > 0 and time.monotonic() - buffer.warmed_at > self.ttl:
+            return True
+        return self._generation(symbol) != buffer.generation
+
+    def _get_buffer(self, symbol, create=False):
+        buffer = self._buffers.get(symbol)
+        if buffer is None and create:
+            with self._lock:
+                buffer = self._buffers.get(symbol)
+                if buffer is None:
+                    buffer = self._buffers[symbol] = _SymbolBuffer(self.capacity, next(self._serials))
+        return buffer
+
+    def _current_buffer(self, symbol):
+        """The symbol's buffer for a read, re-warmed first if it went stale."""
+        buffer = self._buffers.get(symbol)
+        if buffer is None or not self._is_stale(symbol, buffer):
+            return buffer
+        with self._warm_lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is not None and self._is_stale(symbol, buffer):
+                try:
+                    self.warm([symbol])
+                    self.rewarms += 1
+                except Exception as e:
+                    # Serve the symbol from the database until the next warm
+                    logger.warning(f"Failed to re-warm hot store for {symbol}: {e}")
+                    self.clear(symbol)
+                buffer = self._buffers.get(symbol)
+        return buffer
+
+    def append(self, symbol, open_times, ohlcv):
+        """
+        Add candles for a symbol.
+
+        Only symbols that have been warmed are tracked; appending to an
+        unknown symbol would create a buffer that looks like the latest
+        data but is missing everything before it.
+
+        Args:
+            symbol: Trading pair symbol
+            open_times: Sequence of naive open_time datetimes
+            ohlcv: Array-like of shape (n, 5) with open, high, low, close, volume
+        """
+        buffer = self._get_buffer(symbol)
+        if buffer is None or len(open_times) == 0:
+            return
+
+        times = to_epoch_minutes(open_times)
+        values = np.asarray(ohlcv, dtype=np.float64).reshape(len(times), len(COLUMNS)).T
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[:, order]
+
+        # Keep only the last row for duplicate times within the batch
+        last_of_group = np.append(times[1:] != times[:-1], True)
+        times, values = times[last_of_group], values[:, last_of_group]
+
+        with buffer.lock:
+            buffer.append(times, values)
+
+    def acknowledge(self, symbol, mark):
+        """
+        Record that this process's own load moved the symbol's watermark.
+
+        Called by the transform with the mark returned by Watermarks.bump()
+        after append(). Only a single step is accepted: if another process
+        bumped in between, the buffer keeps its old generation and the next
+        read re-warms it.
+
+        Args:
+            symbol: Trading pair symbol
+            mark: (latest, generation) watermark returned by the bump
+        """
+        buffer = self._get_buffer(symbol)
+        if buffer is None or buffer.generation is None:
+            return
+        with buffer.lock:
+            if mark[1] == buffer.generation + 1:
+                buffer.generation = mark[1]
+
+    def window(self, symbol, limit):
+        """
+        Get the latest candles for a symbol without copying.
+
+        Args:
+            symbol: Trading pair symbol
+            limit: Number of 1m candles wanted
+
+        Returns:
+            Tuple (times, values) of int64 epoch minutes and a (5, n) float64
+            array in COLUMNS order, or None when the caller must go to the database
+        """
+        buffer = self._current_buffer(symbol)
+        result = None
+        if buffer is not None:
+            with buffer.lock:
+                result = buffer.window(limit)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def snapshot(self, symbol):
+        """
+        All candles held for a symbol, whether or not the buffer is complete.
+
+        Returns:
+            Tuple (times, values) of views as in window(), or None if the
+            symbol is not tracked or empty
+        """
+        buffer = self._current_buffer(symbol)
+        if buffer is None:
+            return None
+        with buffer.lock:
+            if len(buffer) == 0:
+                return None
+            return buffer.times[buffer.start:buffer.end], buffer.values[:, buffer.start:buffer.end]
+
+    def is_complete(self, symbol):
+        """True when the buffer holds every candle the warehouse has for the symbol."""
+        buffer = self._current_buffer(symbol)
+        return buffer is not None and buffer.complete
+
+    def version(self, symbol):
+        """Token that changes whenever the symbol's candles change (None if not tracked)."""
+        buffer = self._current_buffer(symbol)
+        if buffer is None:
+            return None
+        return ('hot', buffer.serial, buffer.version)
+
+    def warm(self, symbols):
+        """Load the last `capacity` candles per symbol from the warehouse."""
+        conn = mysql.connector.connect(
+            host=config.DB_HOST,
+            user=config.DB_USER,
+            password=config.DB_PASSWORD,
+            database=config.DB_NAME
+        )
+        cursor = conn.cursor()
+        try:
+            for symbol in symbols:
+                # Read before the rows, so a load committed meanwhile shows up as a newer generation
+                generation = self._generation(symbol)
+                warmed_at = time.monotonic()
+                cursor.execute("""
+                    SELECT open_time, open_price, high_price, low_price, close_price, volume
+                    FROM fact_klines
+                    WHERE symbol = %s AND interval_code = '1m'
+                    ORDER BY open_time DESC
+                    LIMIT %s
+                """, (symbol, self.capacity))
+                rows = cursor.fetchall()[::-1]
+
+                buffer = _SymbolBuffer(self.capacity, next(self._serials))
+                if rows:
+                    times = to_epoch_minutes([row[0] for row in rows])
+                    values = np.array([row[1:] for row in rows], dtype=np.float64).T
+                    buffer.append(times, values)
+                buffer.complete = len(rows) < self.capacity
+                buffer.generation, buffer.warmed_at = generation, warmed_at
+
+                with self._lock:
+                    self._buffers[symbol] = buffer
+                logger.info(f"Hot store warmed {symbol}: {len(rows)} candles")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def clear(self, symbol=None):
+        """Drop one symbol (or everything) so it is served from the database again."""
+        with self._lock:
+            if symbol is None:
+                self._buffers.clear()
+            else:
+                self._buffers.pop(symbol, None)
+
+    def get_statistics(self):
+        """Get hot store size and hit statistics."""
+        return {
+            'days': self.days,
+            'symbols': {symbol: len(buffer) for symbol, buffer in self._buffers.items()},
+            'hits': self.hits,
+            'misses': self.misses,
+            'rewarms': self.rewarms
+        }
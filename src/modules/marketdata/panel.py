@@ -0,0 +1,37 @@
+"""
+Aligned multi-symbol panels.
+
+Cross-asset analytics need one value per symbol per bar. Each symbol's
+series is loaded on its own, then the series are aligned on the bar times
+they all share (an inner join on sorted int64 epoch minutes), giving a
+dense float64 matrix without pivot tables or NaN filling.
+"""
+
+from functools import reduce
+
+import numpy as np
+
+
+def align_series(times_list, values_list):
+    """
+    Inner-join several sorted time series on their timestamps.
+
+    Args:
+        times_list: Sequence of sorted, unique int64 epoch-minute arrays
+        values_list: Matching sequence of 1-D value arrays
+
+    Returns:
+        Tuple (times, matrix) with the shared times and a (k, n) float64 matrix,
+        row i holding values_list[i] at those times
+    """
+    if not times_list:
+        return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float64)
+
+    times = reduce(
+        lambda a, b: np.intersect1d(a, b, assume_unique=True),
+        [np.asarray(t, dtype=np.int64) for t in times_list]
+    )
+    matrix = np.empty((len(times_list), len(times)), dtype=np.float64)
+    for i, (t, v) in enumerate(zip(times_list, values_list)):
+        matrix[i] = np.asarray(v, dtype=np.float64)[np.searchsorted(t, times)]
+    return times, matrix
@@ -0,0 +1,152 @@
+"""
+Interval parsing and vectorized OHLCV resampling.
+
+Candles are bucketed on int64 epoch minutes (see hot_store) with plain
+floor division, so no DatetimeIndex is needed. Intervals that are whole
+days start at midnight and whole weeks start on Monday, both on the stored
+local timestamps.
+
+Resampled bars are memoized per (symbol, interval, end) together with the
+version of the candles they were built from, so providers asking for the
+same series after the same ingest share one computation.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from src.modules.marketdata.hot_store import COLUMNS
+
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# 1970-01-01 was a Thursday; weekly buckets are shifted to start on Monday
+WEEK_OFFSET = 4 * MINUTES_PER_DAY
+
+_UNIT_MINUTES = {'m': 1, 'h': 60, 'd': MINUTES_PER_DAY, 'w': MINUTES_PER_WEEK}
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(COLUMNS))
+
+
+def parse_interval(interval):
+    """
+    Convert an interval string to minutes.
+
+    Args:
+        interval: '1m', '5m', '1h', '4h', '1d', '1w', ...
+
+    Returns:
+        Interval length in minutes
+
+    Raises:
+        ValueError: If the interval is not a positive count with a m/h/d/w unit
+    """
+    interval = str(interval).strip()
+    unit = interval[-1:]
+    if unit not in _UNIT_MINUTES or not interval[:-1].isdigit() or int(interval[:-1]) <= 0:
+        raise ValueError(f"Invalid interval: {interval!r}")
+    return int(interval[:-1]) * _UNIT_MINUTES[unit]
+
+
+def bucket_offset(minutes):
+    """Minute offset of bucket boundaries from the epoch (Monday start for weeks)."""
+    return WEEK_OFFSET if minutes % MINUTES_PER_WEEK == 0 else 0
+
+
+def bucket_starts(times, minutes):
+    """Start minute of the bucket each epoch-minute time falls into."""
+    offset = bucket_offset(minutes)
+    return (times - offset) // minutes * minutes + offset
+
+
+def resample_ohlcv(times, values, minutes):
+    """
+    Aggregate sorted 1m candles into bars.
+
+    Args:
+        times: int64 epoch minutes, ascending
+        values: (5, n) float64 array in COLUMNS order
+        minutes: Bar length in minutes
+
+    Returns:
+        Tuple (bar_times, bar_values) with bar start minutes and a (5, m) array
+    """
+    times = np.asarray(times, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(times) == 0 or minutes <= 1:
+        return times, values
+
+    buckets = bucket_starts(times, minutes)
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], len(times)) - 1
+
+    bars = np.empty((len(COLUMNS), len(starts)), dtype=np.float64)
+    bars[OPEN] = values[OPEN, starts]
+    bars[HIGH] = np.maximum.reduceat(values[HIGH], starts)
+    bars[LOW] = np.minimum.reduceat(values[LOW], starts)
+    bars[CLOSE] = values[CLOSE, ends]
+    bars[VOLUME] = np.add.reduceat(values[VOLUME], starts)
+    return buckets[starts], bars
+
+
+class BarCache:
+    """Small LRU of resampled bars keyed by (symbol, minutes, last source minute)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, source_len):
+        """
+        Cached bars built from at least `source_len` candles of `version`, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] >= source_len:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, source_len, bars):
+        with self._lock:
+            self._entries[key] = (version, source_len, bars)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_statistics(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+bar_cache = BarCache()
+
+
+def resample_cached(symbol, minutes, version, times, values):
+    """
+    Resample with memoization.
+
+    Args:
+        symbol: Trading pair symbol
+        minutes: Bar length in minutes
+        version: Token identifying the source candles (changes on every ingest)
+        times, values: Source 1m candles as for resample_ohlcv
+
+    Returns:
+        Tuple (bar_times, bar_values)
+    """
+    if version is None or len(times) == 0:
+        return resample_ohlcv(times, values, minutes)
+
+    key = (symbol, minutes, int(times[-1]))
+    cached = bar_cache.get(key, version, len(times))
+    if cached is not None:
+        return cached
+    bars = resample_ohlcv(times, values, minutes)
+    bar_cache.put(key, version, len(times), bars)
+    return bars
@@ -0,0 +1,74 @@
+"""
+Vectorized conversion of stored datetimes to UTC.
+
+MySQL DATETIME columns hold naive wall-clock times in config.DB_TIMEZONE.
+These helpers localize a whole column at once with pandas, convert it to
+UTC and format it as ISO strings or epoch milliseconds, instead of building
+a timezone-aware datetime per row.
+"""
+
+import numpy as np
+import pandas as pd
+
+import src.config as config
+
+
+def to_utc(times, source_tz=None):
+    """
+    Convert naive datetimes to naive UTC datetime64 values.
+
+    Args:
+        times: Array-like of naive datetimes (or datetime64 values)
+        source_tz: Zone the values are in (default: config.DB_TIMEZONE)
+
+    Returns:
+        datetime64 array in UTC; missing values stay NaT
+    """
+    index = pd.DatetimeIndex(np.atleast_1d(np.asarray(times, dtype='datetime64[us]')))
+    source_tz = source_tz or config.DB_TIMEZONE
+    if source_tz != 'UTC':
+        index = index.tz_localize(source_tz, ambiguous='NaT', nonexistent='shift_forward')
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values
+
+
+def utc_iso(times, source_tz=None):
+    """
+    Format naive datetimes as UTC ISO strings with a 'Z' suffix.
+
+    Matches datetime.isoformat(): seconds precision, or microseconds when
+    any value has a fractional second.
+
+    Returns:
+        List of strings (None for missing values)
+    """
+    utc = to_utc(times, source_tz)
+    missing = np.isnat(utc)
+    whole_seconds = utc[~missing].astype('datetime64[s]') == utc[~missing]
+    unit = 's' if whole_seconds.all() else 'us'
+    strings = np.char.add(np.datetime_as_string(utc, unit=unit), 'Z').astype(object)
+    strings[missing] = None
+    return strings.tolist()
+
+
+def utc_epoch_ms(times, source_tz=None):
+    """Epoch milliseconds (int64) of naive datetimes in `source_tz`."""
+    return to_utc(times, source_tz).astype('datetime64[ms]').astype(np.int64)
+
+
+def from_utc_epoch_ms(epoch_ms, target_tz=None):
+    """
+    Inverse of utc_epoch_ms: naive datetime64 wall-clock times in `target_tz`.
+
+    Args:
+        epoch_ms: Array-like of epoch milliseconds (UTC)
+        target_tz: Zone to express the times in (default: config.DB_TIMEZONE)
+
+    Returns:
+        datetime64[ms] array of naive times
+    """
+    index = pd.DatetimeIndex(np.atleast_1d(np.asarray(epoch_ms, dtype=np.int64)).astype('datetime64[ms]'))
+    target_tz = target_tz or config.DB_TIMEZONE
+    if target_tz != 'UTC':
+        index = index.tz_localize('UTC').tz_convert(target_tz).tz_localize(None)
+    return index.values.astype('datetime64[ms]')
@@ -0,0 +1,97 @@
+"""
+Per-symbol data watermarks.
+
+The transform bumps a symbol's watermark every time it commits candles or
+an orderbook snapshot for it. A watermark is the latest candle open_time
+seen plus a generation counter, because a reloaded file can rewrite the
+latest candle without moving open_time. Anything derived from a symbol's
+data (such as cached provider results) keys on the watermark and goes
+stale as soon as new data is loaded.
+"""
+
+import threading
+
+from src.modules.marketdata.hot_store import to_epoch_minutes
+
+
+class Watermarks:
+    """
+    Thread-safe map of symbol -> (latest open_time in epoch ms, generation).
+
+    With a shared backend (see analytics.shared_cache) the marks are kept
+    there, so every worker process sees the loads done by the transform's
+    process; the local map is the fallback when the backend fails.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._marks = {}
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    @staticmethod
+    def _key(symbol):
+        return f"watermark:{symbol}"
+
+    def _shared_get(self, symbol):
+        data = self.backend.get(self._key(symbol))
+        if not data:
+            return None
+        latest, generation = data.decode().split(',')
+        return (int(latest) if latest else None, int(generation))
+
+    def bump(self, symbol, open_times=()):
+        """
+        Record a load for a symbol.
+
+        Args:
+            symbol: Trading pair symbol
+            open_times: open_time datetimes of the loaded candles (empty for
+                orderbook snapshots)
+
+        Returns:
+            The new watermark
+        """
+        latest = int(to_epoch_minutes(open_times).max()) * 60_000 if len(open_times) else None
+        with self._lock:
+            previous, generation = self._marks.get(symbol, (None, 0))
+            local_latest = previous if previous is not None and (latest is None or previous > latest) else latest
+            mark = (local_latest, generation + 1)
+            self._marks[symbol] = mark
+
+        if self.backend is not None:
+            try:
+                generation = self.backend.incr(f"{self._key(symbol)}:generation")
+                shared = self._shared_get(symbol)
+                if shared is not None and shared[0] is not None and (latest is None or shared[0] > latest):
+                    latest = shared[0]
+                mark = (latest, generation)
+                self.backend.set(self._key(symbol), f"{'' if latest is None else latest},{generation}".encode())
+            except Exception as e:
+                self.errors += 1
+                print(f"Error updating shared watermark for {symbol}: {e}")
+        return mark
+
+    def bump_all(self, symbols):
+        """Invalidate every symbol's derived data (e.g. after gap repair rewrote candles)."""
+        for symbol in symbols:
+            self.bump(symbol)
+
+    def get(self, symbol):
+        """Current watermark; (None, 0) before the first load."""
+        if self.backend is not None:
+            try:
+                shared = self._shared_get(symbol)
+                return shared if shared is not None else (None, 0)
+            except Exception as e:
+                self.errors += 1
+                print(f"Error reading shared watermark for {symbol}: {e}")
+        return self._marks.get(symbol, (None, 0))
+
+    def token(self, symbols):
+        """Hashable watermark of several symbols, in the given order."""
+        return tuple(self.get(symbol) for symbol in symbols)
+
+    def get_statistics(self):
+        return {symbol: {'latest_open_time': latest, 'generation': generation}
+                for symbol, (latest, generation) in self._marks.items()}
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from src.modules.stats import indicators
 
 class StatsCalculator:
     
@@ -28,18 +29,12 @@ class StatsCalculator:
         if len(prices) < slow:
             return None, None, None
         
-        prices_series = pd.Series(prices)
-        ema_fast = prices_series.ewm(span=fast, adjust=False).mean()
-        ema_slow = prices_series.ewm(span=slow, adjust=False).mean()
-        
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        histogram = macd_line - signal_line
+        macd_line, signal_line, histogram = indicators.macd(prices, fast, slow, signal)
         
         return (
-            round(macd_line.iloc[-1], 4),
-            round(signal_line.iloc[-1], 4),
-            round(histogram.iloc[-1], 4)
+            round(float(macd_line[-1]), 4),
+            round(float(signal_line[-1]), 4),
+            round(float(histogram[-1]), 4)
         )
     
     @staticmethod
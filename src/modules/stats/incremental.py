@@ -0,0 +1,543 @@
+"""
+Incremental indicator state, advanced as candles are ingested.
+
+RSI, MACD, ATR and Bollinger Bands are recursions over bars: Wilder
+averages, EMAs and rolling sums only need their previous value and the new
+bar. The engine keeps that state per (symbol, interval, indicator,
+parameters), together with the last INDICATOR_STATE_BARS outputs, so a
+provider can answer the tail series without recomputing it.
+
+A state is built lazily from the symbol's candles in the hot store with
+the vectorized kernels in indicators.py, seeded warmup_bars() bars before
+its oldest kept output like the providers' compute(). After that the transform feeds
+every loaded 1m candle to update(), which folds it into the bar in progress
+and, when a bar closes, advances each state in O(1). The bar in progress
+is evaluated on the fly without being committed, so the latest candle can
+still be corrected. Candles older than that mean history changed (gap
+repair, backfill): the symbol's states are dropped and rebuilt on the next
+request.
+"""
+
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+import src.config as config
+from src.services import get_hot_store
+from src.modules.marketdata.hot_store import to_epoch_minutes
+from src.modules.marketdata.resample import OPEN, HIGH, LOW, CLOSE, VOLUME, bucket_starts, resample_ohlcv
+from src.modules.stats import indicators
+
+# Weight the seed may still carry in an output once a recursion has warmed
+# up, far below the precision the providers round to
+SEED_WEIGHT = 1e-12
+
+
+def decay_bars(alpha):
+    """Bars after which x += alpha * (value - x) keeps less than SEED_WEIGHT of its seed."""
+    if alpha >= 1:
+        return 0
+    return math.ceil(math.log(SEED_WEIGHT) / math.log(1.0 - alpha))
+
+
+class _IndicatorState:
+    """Recursion state of one indicator plus its recent outputs."""
+
+    fields = ()
+
+    # True when outputs depend on how far back the recursion was seeded
+    recursive = True
+
+    @staticmethod
+    def min_warmup(*params):
+        """Fewest bars before the first output the kernel needs."""
+        raise NotImplementedError
+
+    def __init__(self, history):
+        # (bar start minute, output tuple) for committed bars, oldest first
+        self.outputs = deque(maxlen=history)
+        # Bars still to commit before outputs are seeded warmup_bars() back
+        self.cold = 0
+
+    def _record(self, bar_times, columns):
+        """Keep the last `history` rows of full-length output columns."""
+        n = self.outputs.maxlen
+        for t, row in zip(bar_times[-n:].tolist(), zip(*(c[-n:].tolist() for c in columns))):
+            self.outputs.append((t, row))
+
+    def build(self, bar_times, bar_values):
+        """Initialize from committed bars; returns False if there are too few."""
+        raise NotImplementedError
+
+    def push(self, bar):
+        """Commit one closed bar (OHLCV tuple) and return its output."""
+        raise NotImplementedError
+
+    def peek(self, bar):
+        """Output for a bar in progress, leaving the state unchanged."""
+        raise NotImplementedError
+
+
+class RSIState(_IndicatorState):
+    fields = ('rsi',)
+
+    @staticmethod
+    def min_warmup(period=14):
+        return max(period, decay_bars(1.0 / period))
+
+    def __init__(self, history, period=14):
+        super().__init__(history)
+        self.period = period
+
+    def build(self, bar_times, bar_values):
+        close = bar_values[CLOSE]
+        period = self.period
+        if len(close) < period + 1:
+            return False
+        deltas = np.diff(close)
+        gains = np.where(deltas > 0, deltas, 0.0)
+        losses = np.where(deltas < 0, -deltas, 0.0)
+        avg_gain = indicators.wilder_smooth(gains[period - 1:], period, gains[:period].mean())
+        avg_loss = indicators.wilder_smooth(losses[period - 1:], period, losses[:period].mean())
+        self.avg_gain, self.avg_loss = float(avg_gain[-1]), float(avg_loss[-1])
+        self.prev_close = float(close[-1])
+        self._record(bar_times[period:], [indicators.rsi(close, period)])
+        return True
+
+    def _step(self, close):
+        change = close - self.prev_close
+        avg_gain = (self.avg_gain * (self.period - 1) + max(change, 0.0)) / self.period
+        avg_loss = (self.avg_loss * (self.period - 1) + max(-change, 0.0)) / self.period
+        rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return avg_gain, avg_loss, (rsi,)
+
+    def push(self, bar):
+        self.avg_gain, self.avg_loss, output = self._step(bar[CLOSE])
+        self.prev_close = bar[CLOSE]
+        return output
+
+    def peek(self, bar):
+        return self._step(bar[CLOSE])[2]
+
+
+class ATRState(_IndicatorState):
+    fields = ('atr',)
+
+    @staticmethod
+    def min_warmup(period=14):
+        return max(period, decay_bars(1.0 / period))
+
+    def __init__(self, history, period=14):
+        super().__init__(history)
+        self.period = period
+
+    def build(self, bar_times, bar_values):
+        period = self.period
+        if bar_values.shape[1] < period + 1:
+            return False
+        atr = indicators.atr(bar_values[HIGH], bar_values[LOW], bar_values[CLOSE], period)
+        self.atr = float(atr[-1])
+        self.prev_close = float(bar_values[CLOSE, -1])
+        self._record(bar_times[period - 1:], [atr])
+        return True
+
+    def _step(self, bar):
+        high, low = bar[HIGH], bar[LOW]
+        true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        return (self.atr * (self.period - 1) + true_range) / self.period
+
+    def push(self, bar):
+        self.atr = self._step(bar)
+        self.prev_close = bar[CLOSE]
+        return (self.atr,)
+
+    def peek(self, bar):
+        return (self._step(bar),)
+
+
+class MACDState(_IndicatorState):
+    fields = ('macd', 'signal', 'histogram')
+
+    @staticmethod
+    def min_warmup(fast_period=12, slow_period=26, signal_period=9):
+        # The signal EMA inherits what is left of the slower line's seed
+        line = decay_bars(2.0 / (max(fast_period, slow_period) + 1))
+        return max(slow_period + signal_period, line + decay_bars(2.0 / (signal_period + 1)))
+
+    def __init__(self, history, fast_period=12, slow_period=26, signal_period=9):
+        super().__init__(history)
+        self.periods = (fast_period, slow_period, signal_period)
+        self.alphas = tuple(2.0 / (p + 1) for p in self.periods)
+
+    def build(self, bar_times, bar_values):
+        fast, slow, signal = self.periods
+        close = bar_values[CLOSE]
+        if len(close) < slow + signal:
+            return False
+        ema_fast = indicators.ema(close, fast)
+        ema_slow = indicators.ema(close, slow)
+        macd_line = ema_fast - ema_slow
+        signal_line = indicators.ema(macd_line, signal)
+        self.emas = (float(ema_fast[-1]), float(ema_slow[-1]), float(signal_line[-1]))
+        self._record(bar_times, [macd_line, signal_line, macd_line - signal_line])
+        return True
+
+    def _step(self, close):
+        a_fast, a_slow, a_signal = self.alphas
+        ema_fast, ema_slow, signal = self.emas
+        ema_fast += a_fast * (close - ema_fast)
+        ema_slow += a_slow * (close - ema_slow)
+        macd = ema_fast - ema_slow
+        signal += a_signal * (macd - signal)
+        return (ema_fast, ema_slow, signal), (macd, signal, macd - signal)
+
+    def push(self, bar):
+        self.emas, output = self._step(bar[CLOSE])
+        return output
+
+    def peek(self, bar):
+        return self._step(bar[CLOSE])[1]
+
+
+class BollingerState(_IndicatorState):
+    fields = ('upper', 'middle', 'lower', 'price')
+
+    # A plain rolling window: exact once it is full
+    recursive = False
+
+    @staticmethod
+    def min_warmup(period=20, std_dev=2):
+        return period - 1
+
+    # Recompute the window sums from scratch this often to stop drift
+    RESYNC_EVERY = 1024
+
+    def __init__(self, history, period=20, std_dev=2):
+        super().__init__(history)
+        self.period = period
+        self.std_dev = std_dev
+
+    def build(self, bar_times, bar_values):
+        period = self.period
+        close = bar_values[CLOSE]
+        if len(close) < period:
+            return False
+        upper, middle, lower = indicators.bollinger(close, period, self.std_dev)
+        self.window = deque(close[-period:].tolist(), maxlen=period)
+        self._resync()
+        self._record(bar_times[period - 1:], [upper, middle, lower, close[period - 1:]])
+        return True
+
+    def _resync(self):
+        values = np.array(self.window)
+        self.mean = float(values.mean())
+        self.m2 = float(((values - self.mean) ** 2).sum())
+        self.pushes = 0
+
+    def _step(self, close):
+        """Sliding-window update of the mean and the sum of squared deviations."""
+        oldest = self.window[0]
+        mean = self.mean + (close - oldest) / self.period
+        m2 = self.m2 + (close - oldest) * (close - mean + oldest - self.mean)
+        return mean, m2
+
+    def _output(self, mean, m2, close):
+        std = math.sqrt(max(m2, 0.0) / (self.period - 1)) if self.period > 1 else float('nan')
+        return (mean + std * self.std_dev, mean, mean - std * self.std_dev, close)
+
+    def push(self, bar):
+        close = bar[CLOSE]
+        self.mean, self.m2 = self._step(close)
+        self.window.append(close)
+        self.pushes += 1
+        if self.pushes >= self.RESYNC_EVERY:
+            self._resync()
+        return self._output(self.mean, self.m2, close)
+
+    def peek(self, bar):
+        return self._output(*self._step(bar[CLOSE]), bar[CLOSE])
+
+
+INDICATORS = {
+    'rsi': RSIState,
+    'atr': ATRState,
+    'macd': MACDState,
+    'bollinger': BollingerState,
+}
+
+# Parameter sets the charts use; these are also precomputed into fact_indicators
+DEFAULT_PARAMS = {
+    'rsi': (14,),
+    'macd': (12, 26, 9),
+    'bollinger': (20, 2),
+    'atr': (14,),
+}
+
+
+def warmup_bars(kind, params):
+    """
+    Bars before the first output that an indicator series is computed from.
+
+    Recursive indicators start as many bars back as their averages need to
+    forget the seed (see SEED_WEIGHT), and at least INDICATOR_WARMUP_BARS,
+    on every path: the providers' compute(), the states here and
+    fact_indicators. All paths therefore return the same values.
+    """
+    state = INDICATORS[kind]
+    minimum = state.min_warmup(*params)
+    return max(config.INDICATOR_WARMUP_BARS, minimum) if state.recursive else minimum
+
+
+def params_key(params):
+    """Canonical string of an indicator parameter tuple (2 and 2.0 give '2')."""
+    return ','.join(format(float(p), 'g') for p in params)
+
+
+def indicator_series(kind, params, bar_times, bar_values, first=None):
+    """
+    Output series of an indicator over bars.
+
+    Args:
+        kind: Indicator name in INDICATORS
+        params: Tuple of indicator parameters
+        bar_times: Bar start epoch minutes, ascending
+        bar_values: (5, n) OHLCV array
+        first: Only outputs from this bar start on, seeded warmup_bars()
+            bars before it (default: the whole series)
+
+    Returns:
+        Tuple (epoch minutes, (fields, m) float64 array), or None if there
+        are too few bars
+    """
+    bar_times = np.asarray(bar_times, dtype=np.int64)
+    if first is not None:
+        seed = max(int(np.searchsorted(bar_times, first)) - warmup_bars(kind, params), 0)
+        bar_times, bar_values = bar_times[seed:], bar_values[:, seed:]
+    state = INDICATORS[kind](max(len(bar_times), 1), *params)
+    if not state.build(bar_times, bar_values):
+        return None
+    times = np.array([t for t, _ in state.outputs], dtype=np.int64)
+    values = np.array([row for _, row in state.outputs], dtype=np.float64).T.reshape(len(state.fields), -1)
+    if first is not None:
+        keep = times >= first
+        times, values = times[keep], values[:, keep]
+    return times, values
+
+
+def _combine(first, second):
+    """OHLCV of two consecutive candles (or bars) merged into one."""
+    if first is None:
+        return second
+    return (first[OPEN], max(first[HIGH], second[HIGH]), min(first[LOW], second[LOW]),
+            second[CLOSE], first[VOLUME] + second[VOLUME])
+
+
+class _BarGroup:
+    """Indicator states for one symbol and interval, plus the bar in progress."""
+
+    def __init__(self, minutes):
+        self.minutes = minutes
+        self.states = {}
+        # Bar in progress: bucket start, candles folded so far, and the latest
+        # candle kept apart because the next fetch may still correct it
+        self.bucket = None
+        self.fixed = None
+        self.last_time = None
+        self.last = None
+        # Serial of the hot store buffer the states were built from
+        self.serial = None
+
+    def build(self, times, values, keys, history, complete=False):
+        """
+        (Re)build every state in `keys` from sorted 1m candles.
+
+        Unless the candles are the symbol's whole history (`complete`),
+        outputs seeded fewer than warmup_bars() bars back are dropped, since
+        compute() would seed them further back.
+        """
+        bar_times, bar_values = resample_ohlcv(times, values, self.minutes)
+        if len(bar_times) == 0:
+            return
+
+        # The last bucket stays open; its candles become the bar in progress
+        self.bucket = int(bar_times[-1])
+        in_bucket = np.flatnonzero(times >= self.bucket)
+        self.fixed = None
+        for i in in_bucket[:-1]:
+            self.fixed = _combine(self.fixed, tuple(values[:, i].tolist()))
+        self.last_time = int(times[-1])
+        self.last = tuple(values[:, -1].tolist())
+
+        # Seed from the same trailing window compute() loads for limit = history + 1
+        committed_times, committed_values = bar_times[:-1], bar_values[:, :-1]
+        self.states = {}
+        for kind, params in keys:
+            state = INDICATORS[kind](history, *params)
+            warmup = warmup_bars(kind, params)
+            seed = max(len(committed_times) - history - warmup, 0)
+            if not state.build(committed_times[seed:], committed_values[:, seed:]):
+                self.states[(kind, params)] = None
+                continue
+            if not complete:
+                bars = len(committed_times) - seed
+                while len(state.outputs) > max(bars - warmup, 0):
+                    state.outputs.popleft()
+                state.cold = max(warmup - bars, 0)
+            self.states[(kind, params)] = state
+
+    def add(self, time, candle):
+        """
+        Fold one 1m candle in.
+
+        Returns:
+            False if the candle is older than the bar in progress (history changed)
+        """
+        if time < self.last_time:
+            return False
+        if time == self.last_time:
+            self.last = candle
+            return True
+
+        bucket = int(bucket_starts(time, self.minutes))
+        if bucket == self.bucket:
+            self.fixed = _combine(self.fixed, self.last)
+        else:
+            bar = _combine(self.fixed, self.last)
+            for state in self.states.values():
+                if state is None:
+                    continue
+                output = state.push(bar)
+                if state.cold:
+                    state.cold -= 1
+                else:
+                    state.outputs.append((self.bucket, output))
+            self.bucket, self.fixed = bucket, None
+        self.last_time, self.last = time, candle
+        return True
+
+    def series(self, key, limit):
+        """Latest `limit` outputs including the bar in progress, or None."""
+        state = self.states.get(key)
+        if state is None or state.cold or limit > len(state.outputs) + 1:
+            return None
+        current = state.peek(_combine(self.fixed, self.last))
+        rows = list(state.outputs)[len(state.outputs) - (limit - 1):] if limit > 1 else []
+        rows.append((self.bucket, current))
+        times = np.array([t for t, _ in rows], dtype=np.int64)
+        values = np.array([row for _, row in rows], dtype=np.float64).T
+        return times, values
+
+
+class IndicatorEngine:
+    """Process-wide incremental indicator states, fed from the hot store and ingest."""
+
+    def __init__(self, history=None):
+        self.history = history or config.INDICATOR_STATE_BARS
+        self._groups = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.invalidations = 0
+
+    def series(self, symbol, minutes, kind, params, limit):
+        """
+        Tail of an indicator series from state.
+
+        Args:
+            symbol: Trading pair symbol
+            minutes: Bar length in minutes
+            kind: Indicator name in INDICATORS
+            params: Tuple of constructor parameters (e.g. (period,))
+            limit: Number of bars wanted, the bar in progress last
+
+        Returns:
+            Tuple (bar start epoch minutes, (fields, limit) float64 array), or
+            None when the state cannot answer (symbol not in the hot store,
+            too few candles to warm up, or limit beyond the kept history)
+        """
+        if limit < 1 or limit > self.history + 1:
+            self.misses += 1
+            return None
+
+        key = (kind, tuple(params))
+        # A re-warmed buffer (another process loaded candles) gets a new serial
+        version = get_hot_store().version(symbol)
+        serial = version[1] if version is not None else None
+        with self._lock:
+            group = self._groups.get((symbol, minutes))
+            if group is None or group.serial != serial or key not in group.states:
+                group = self._build(symbol, minutes, key, group, serial)
+            result = group.series(key, limit) if group is not None else None
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _build(self, symbol, minutes, key, group, serial):
+        hot_store = get_hot_store()
+        complete = hot_store.is_complete(symbol)
+        snapshot = hot_store.snapshot(symbol)
+        if snapshot is None:
+            return None
+        keys = list(group.states) if group is not None else []
+        keys.append(key)
+
+        group = _BarGroup(minutes)
+        group.serial = serial
+        group.build(*snapshot, keys, self.history, complete)
+        self._groups[(symbol, minutes)] = group
+        self.builds += 1
+        return group
+
+    def update(self, symbol, open_times, ohlcv):
+        """
+        Advance the symbol's states with freshly loaded 1m candles.
+
+        Args:
+            symbol: Trading pair symbol
+            open_times: Sequence of naive open_time datetimes
+            ohlcv: Array-like of shape (n, 5) with open, high, low, close, volume
+        """
+        if len(open_times) == 0:
+            return
+        with self._lock:
+            groups = [(key, group) for key, group in self._groups.items() if key[0] == symbol]
+            if not groups:
+                return
+
+            times = to_epoch_minutes(open_times)
+            values = np.asarray(ohlcv, dtype=np.float64).reshape(len(times), 5)
+            order = np.argsort(times, kind='stable')
+            candles = [(int(times[i]), tuple(values[i].tolist())) for i in order]
+
+            for key, group in groups:
+                if not all(group.add(time, candle) for time, candle in candles):
+                    # A candle before the bar in progress changed; rebuild on demand
+                    del self._groups[key]
+                    self.invalidations += 1
+
+    def reset(self, symbol=None):
+        """Drop states (all, or one symbol's) after the candles were reloaded."""
+        with self._lock:
+            if symbol is None:
+                self._groups.clear()
+            else:
+                for key in [k for k in self._groups if k[0] == symbol]:
+                    del self._groups[key]
+
+    def get_statistics(self):
+        """Get state counts and hit statistics."""
+        return {
+            'groups': len(self._groups),
+            'states': sum(len(group.states) for group in self._groups.values()),
+            'history': self.history,
+            'hits': self.hits,
+            'misses': self.misses,
+            'builds': self.builds,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,273 @@
+"""
+Vectorized indicator kernels shared by the analytics providers.
+
+Wilder smoothing is the recursion y[t] = y[t-1] + (x[t] - y[t-1]) / period,
+a first-order IIR filter. It is evaluated with pandas' compiled EWM
+(alpha = 1 / period, adjust=False), which runs the same recursion without a
+Python-level loop. The MACD EMA is the same filter with alpha = 2 / (span + 1).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def wilder_smooth(values, period, seed):
+    """
+    Wilder's running average.
+
+    Args:
+        values: 1-D array of inputs; values[0] is replaced by the seed
+        period: Smoothing period
+        seed: Initial average (usually the simple mean of the first period inputs)
+
+    Returns:
+        float64 array with result[0] = seed and
+        result[t] = (result[t-1] * (period - 1) + values[t]) / period
+    """
+    values = np.array(values, dtype=np.float64)
+    if len(values) == 0:
+        return values
+    values[0] = seed
+    return pd.Series(values).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+
+
+def rsi(close, period=14):
+    """
+    Relative Strength Index with Wilder smoothing.
+
+    Args:
+        close: 1-D array of close prices
+        period: RSI period
+
+    Returns:
+        float64 array of len(close) - period values; element i belongs to close[i + period]
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < period + 1:
+        return np.empty(0, dtype=np.float64)
+
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    avg_gain = wilder_smooth(gains[period - 1:], period, gains[:period].mean())
+    avg_loss = wilder_smooth(losses[period - 1:], period, losses[:period].mean())
+
+    no_loss = avg_loss == 0
+    rs = avg_gain / np.where(no_loss, 1.0, avg_loss)
+    return np.where(no_loss, 100.0, 100.0 - 100.0 / (1.0 + rs))
+
+
+def true_range(high, low, close):
+    """
+    True range per bar; the first bar uses its own close as the previous close.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    prev_close = np.empty_like(close)
+    prev_close[1:] = close[:-1]
+    prev_close[:1] = close[:1]
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period=14):
+    """
+    Average True Range with Wilder smoothing.
+
+    The seed is the mean of true ranges 1..period and smoothing continues
+    from true range `period`, as the ATR provider has always done.
+
+    Returns:
+        float64 array of len(close) - period + 1 values; element i belongs to bar i + period - 1
+    """
+    tr = true_range(high, low, close)
+    if len(tr) < period + 1:
+        return np.empty(0, dtype=np.float64)
+    return wilder_smooth(tr[period - 1:], period, tr[1:period + 1].mean())
+
+
+def ema(values, span):
+    """
+    Exponential moving average seeded with the first value.
+
+    Args:
+        values: 1-D array of inputs
+        span: EMA period; alpha = 2 / (span + 1)
+
+    Returns:
+        float64 array with result[0] = values[0] and
+        result[t] = result[t-1] + alpha * (values[t] - result[t-1])
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values.copy()
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD line, signal line and histogram over the whole series.
+
+    Returns:
+        Tuple of three float64 arrays of len(close)
+    """
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger(close, period=20, std_dev=2):
+    """
+    Bollinger Bands: rolling mean plus/minus std_dev sample standard deviations.
+
+    Returns:
+        Tuple (upper, middle, lower) of float64 arrays of len(close) - period + 1;
+        element i belongs to close[i + period - 1]
+    """
+    close = pd.Series(np.asarray(close, dtype=np.float64))
+    if len(close) < period:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, empty
+    middle = close.rolling(window=period).mean().to_numpy()[period - 1:]
+    std = close.rolling(window=period).std().to_numpy()[period - 1:]
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def rsi_matrix(close, periods):
+    """
+    RSI for several periods over one series.
+
+    Price changes, gains and losses are computed once; each period only
+    runs its own Wilder smoothing.
+
+    Returns:
+        (len(periods), len(close)) float64 array aligned to close, NaN where
+        a period has too few prior bars
+    """
+    close = np.asarray(close, dtype=np.float64)
+    result = np.full((len(periods), len(close)), np.nan)
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    for row, period in enumerate(periods):
+        if len(close) < period + 1:
+            continue
+        avg_gain = wilder_smooth(gains[period - 1:], period, gains[:period].mean())
+        avg_loss = wilder_smooth(losses[period - 1:], period, losses[:period].mean())
+        no_loss = avg_loss == 0
+        rs = avg_gain / np.where(no_loss, 1.0, avg_loss)
+        result[row, period:] = np.where(no_loss, 100.0, 100.0 - 100.0 / (1.0 + rs))
+    return result
+
+
+def atr_matrix(high, low, close, periods):
+    """
+    ATR for several periods over one series, sharing the true range.
+
+    Returns:
+        (len(periods), len(close)) float64 array aligned to the bars, NaN
+        where a period has too few prior bars
+    """
+    tr = true_range(high, low, close)
+    result = np.full((len(periods), len(tr)), np.nan)
+    for row, period in enumerate(periods):
+        if len(tr) < period + 1:
+            continue
+        result[row, period - 1:] = wilder_smooth(tr[period - 1:], period, tr[1:period + 1].mean())
+    return result
+
+
+def bollinger_matrix(close, periods, std_dev=2):
+    """
+    Bollinger Bands for several periods in one pass.
+
+    Window sums for every period come from one cumulative sum of the
+    (centered) closes and their squares, so no per-period rolling is run.
+
+    Returns:
+        Tuple (upper, middle, lower) of (len(periods), len(close)) float64
+        arrays aligned to close, NaN before a period's first full window
+    """
+    close = np.asarray(close, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+    n = len(close)
+    middle = np.full((len(periods), n), np.nan)
+    std = np.full((len(periods), n), np.nan)
+    if n == 0:
+        return middle, middle.copy(), middle.copy()
+
+    # Centering keeps the sum-of-squares variance free of cancellation
+    shift = close.mean()
+    centered = close - shift
+    sums = np.concatenate(([0.0], np.cumsum(centered)))
+    squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    ends = np.arange(1, n + 1)
+    starts = ends[None, :] - periods[:, None]
+    valid = starts >= 0
+    starts = np.where(valid, starts, 0)
+    window_sum = sums[ends][None, :] - sums[starts]
+    window_squares = squares[ends][None, :] - squares[starts]
+
+    mean = window_sum / periods[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (window_squares - window_sum * mean) / (periods[:, None] - 1)
+    middle[valid] = (mean + shift)[valid]
+    std[valid] = np.sqrt(np.maximum(variance, 0.0))[valid]
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def rolling_corr(base, others, window):
+    """
+    Rolling Pearson correlation of one series against several others.
+
+    All windows are computed in one pass from cumulative sums of the
+    (globally demeaned) inputs, so the cost is O(n * k) regardless of the
+    window size.
+
+    Args:
+        base: 1-D array of length n
+        others: 2-D array of shape (k, n), one row per comparison series
+        window: Number of points per window
+
+    Returns:
+        float64 array of shape (k, n - window + 1); column j covers points
+        j..j + window - 1. Windows where either series is constant are NaN.
+    """
+    x = np.asarray(base, dtype=np.float64)
+    y = np.atleast_2d(np.asarray(others, dtype=np.float64))
+    n = len(x)
+    if window < 2 or n < window:
+        return np.empty((len(y), 0), dtype=np.float64)
+
+    # Correlation is shift-invariant; demeaning keeps the running sums small
+    x = x - x.mean()
+    y = y - y.mean(axis=1, keepdims=True)
+
+    def window_sums(values):
+        csum = np.cumsum(values, axis=-1)
+        pad = np.zeros(values.shape[:-1] + (1,))
+        csum = np.concatenate([pad, csum], axis=-1)
+        return csum[..., window:] - csum[..., :-window]
+
+    sx = window_sums(x)
+    sy = window_sums(y)
+    sxx = window_sums(x * x) - sx * sx / window
+    syy = window_sums(y * y) - sy * sy / window
+    sxy = window_sums(x * y) - sx * sy / window
+
+    # Cancellation leaves tiny non-zero variances for flat windows, so detect
+    # those exactly: a window is flat when no value changes inside it
+    def flat_windows(values):
+        changes = np.cumsum(values[..., 1:] != values[..., :-1], axis=-1)
+        pad = np.zeros(values.shape[:-1] + (1,), dtype=changes.dtype)
+        changes = np.concatenate([pad, changes], axis=-1)
+        return changes[..., window - 1:] == changes[..., :len(x) - window + 1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = sxy / np.sqrt(np.maximum(sxx, 0.0) * np.maximum(syy, 0.0))
+    corr[flat_windows(y) | flat_windows(x)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
@@ -0,0 +1,223 @@
+"""
+Mergeable distribution summaries: central moments and DDSketch quantiles.
+
+Both are kept per symbol per hour in the warehouse and added together for
+any range, so distribution statistics never need the raw candles.
+
+Moments are merged with the pairwise update of Pébay (2008), which stays
+accurate for large values such as prices, unlike raw power sums. DDSketch
+(Masson et al., 2019) stores counts in logarithmic buckets, giving
+quantiles within a relative error `alpha` for values of either sign.
+"""
+
+import numpy as np
+
+DEFAULT_ALPHA = 0.01
+
+# Values closer to zero than this are counted in the zero bucket
+MIN_INDEXABLE = 1e-9
+
+METRICS = ('return', 'price')
+
+# Prices move little within a day in relative terms, so their buckets must be
+# much finer than 1% to give a useful histogram
+METRIC_ALPHA = {'return': DEFAULT_ALPHA, 'price': 0.0001}
+
+
+def metric_values(metric, open_prices, close_prices):
+    """
+    Per-candle values summarized for a metric.
+
+    'return' is the candle's (close - open) / open in percent, as used by the
+    return distribution; 'price' is the close price.
+    """
+    open_prices = np.asarray(open_prices, dtype=np.float64)
+    close_prices = np.asarray(close_prices, dtype=np.float64)
+    if metric == 'return':
+        return (close_prices - open_prices) / open_prices * 100
+    if metric == 'price':
+        return close_prices
+    raise ValueError(f"Unknown metric: {metric}")
+
+
+class Moments:
+    """Count, mean, central moment sums M2..M4, min and max."""
+
+    __slots__ = ('n', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0, min=np.inf, max=-np.inf):
+        self.n, self.mean, self.m2, self.m3, self.m4 = int(n), float(mean), float(m2), float(m3), float(m4)
+        self.min, self.max = float(min), float(max)
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return cls()
+        mean = values.mean()
+        d = values - mean
+        d2 = d * d
+        return cls(len(values), mean, d2.sum(), (d2 * d).sum(), (d2 * d2).sum(), values.min(), values.max())
+
+    def merge(self, other):
+        """Combine with another summary (returns a new object)."""
+        if other.n == 0:
+            return Moments(self.n, self.mean, self.m2, self.m3, self.m4, self.min, self.max)
+        if self.n == 0:
+            return Moments(other.n, other.mean, other.m2, other.m3, other.m4, other.min, other.max)
+
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        d_n = delta / n
+        mean = self.mean + nb * d_n
+        m2 = self.m2 + other.m2 + delta * d_n * na * nb
+        m3 = (self.m3 + other.m3
+              + d_n * d_n * delta * na * nb * (na - nb)
+              + 3 * d_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4
+              + d_n ** 3 * delta * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * d_n * d_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * d_n * (na * other.m3 - nb * self.m3))
+        return Moments(n, mean, m2, m3, m4, min(self.min, other.min), max(self.max, other.max))
+
+    @property
+    def std(self):
+        """Population standard deviation (as np.std)."""
+        return float(np.sqrt(self.m2 / self.n)) if self.n else 0.0
+
+    @property
+    def skewness(self):
+        if self.n <= 2 or self.m2 <= 0:
+            return 0.0
+        return float(np.sqrt(self.n) * self.m3 / self.m2 ** 1.5)
+
+    @property
+    def kurtosis(self):
+        """Excess kurtosis."""
+        if self.n <= 2 or self.m2 <= 0:
+            return 0.0
+        return float(self.n * self.m4 / (self.m2 * self.m2) - 3.0)
+
+
+class DDSketch:
+    """Quantile sketch with relative accuracy `alpha` and exact merges."""
+
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = np.log(self.gamma)
+        # Bucket k holds |values| in (gamma^(k-1), gamma^k]; {sign: (first key, counts)}
+        self.positive = (0, np.zeros(0, dtype=np.int64))
+        self.negative = (0, np.zeros(0, dtype=np.int64))
+        self.zero_count = 0
+
+    @property
+    def count(self):
+        return int(self.positive[1].sum() + self.negative[1].sum() + self.zero_count)
+
+    def _keys(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    @staticmethod
+    def _add_store(store, keys, counts=None):
+        if len(keys) == 0:
+            return store
+        base, existing = store
+        lo = int(keys.min()) if len(existing) == 0 else min(base, int(keys.min()))
+        hi = int(keys.max()) if len(existing) == 0 else max(base + len(existing) - 1, int(keys.max()))
+        merged = np.zeros(hi - lo + 1, dtype=np.int64)
+        merged[base - lo:base - lo + len(existing)] += existing
+        merged += np.bincount(keys - lo, weights=counts, minlength=len(merged)).astype(np.int64)
+        return lo, merged
+
+    def add(self, values):
+        """Add an array of values."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        small = np.abs(values) < MIN_INDEXABLE
+        self.zero_count += int(small.sum())
+        pos = values[(values > 0) & ~small]
+        neg = values[(values < 0) & ~small]
+        self.positive = self._add_store(self.positive, self._keys(pos))
+        self.negative = self._add_store(self.negative, self._keys(-neg))
+        return self
+
+    def merge(self, other):
+        """Add another sketch with the same alpha into this one."""
+        if other.alpha != self.alpha:
+            raise ValueError("Cannot merge sketches with different alpha")
+        for sign in ('positive', 'negative'):
+            base, counts = getattr(other, sign)
+            keys = base + np.arange(len(counts))
+            setattr(self, sign, self._add_store(getattr(self, sign), keys, counts))
+        self.zero_count += other.zero_count
+        return self
+
+    def _value(self, key):
+        """Representative value of a bucket (relative error <= alpha)."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def buckets(self):
+        """
+        All buckets in ascending value order.
+
+        Returns:
+            Tuple (values, counts) of representative values and int64 counts
+        """
+        nb, nc = self.negative
+        pb, pc = self.positive
+        values = np.concatenate([
+            -self._value(nb + np.arange(len(nc)))[::-1],
+            [0.0] if self.zero_count else [],
+            self._value(pb + np.arange(len(pc)))
+        ])
+        counts = np.concatenate([nc[::-1], [self.zero_count] if self.zero_count else [], pc]).astype(np.int64)
+        keep = counts > 0
+        return values[keep], counts[keep]
+
+    def quantiles(self, qs):
+        """
+        Approximate quantiles (rank q * (count - 1), as np.percentile's lower bound).
+
+        Args:
+            qs: Quantiles in [0, 1]
+
+        Returns:
+            List of values, or NaNs for an empty sketch
+        """
+        values, counts = self.buckets()
+        if len(values) == 0:
+            return [float('nan')] * len(qs)
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (cumulative[-1] - 1)
+        idx = np.searchsorted(cumulative, ranks, side='right')
+        return [float(v) for v in values[np.minimum(idx, len(values) - 1)]]
+
+    def to_bytes(self):
+        """Serialize as int64 header (bases, lengths, zero count) plus int64 counts."""
+        (pb, pc), (nb, nc) = self.positive, self.negative
+        header = np.array([pb, len(pc), nb, len(nc), self.zero_count], dtype='<i8')
+        return header.tobytes() + np.asarray(pc, dtype='<i8').tobytes() + np.asarray(nc, dtype='<i8').tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob, alpha=DEFAULT_ALPHA):
+        sketch = cls(alpha)
+        data = np.frombuffer(blob, dtype='<i8')
+        pb, plen, nb, nlen, zero = (int(x) for x in data[:5])
+        sketch.positive = (pb, data[5:5 + plen].astype(np.int64))
+        sketch.negative = (nb, data[5 + plen:5 + plen + nlen].astype(np.int64))
+        sketch.zero_count = zero
+        return sketch
+
+
+def histogram_from_buckets(values, counts, bins, lo, hi):
+    """
+    Rebin sketch buckets onto `bins` equal-width bins between lo and hi.
+
+    Returns:
+        Tuple (hist, bin_edges) like np.histogram
+    """
+    edges = np.linspace(lo, hi, bins + 1)
+    idx = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+    return np.bincount(idx, weights=counts, minlength=bins).astype(np.int64), edges
@@ -5,15 +5,18 @@ from datetime import datetime
 import src.config as config
 from src.modules.datalake.manager import DataLakeManager
 from src.modules.warehouse.aggregator import WarehouseAggregator
+from src.services import get_hot_store, get_history_store, get_indicator_engine, get_watermarks, get_push_hub
 import tempfile
 import logging
 
 logger = logging.getLogger(__name__)
 
 class TransformManager:
-    def __init__(self):
-        self.datalake_mgr = DataLakeManager()
-        self.warehouse_agg = WarehouseAggregator()
+    def __init__(self, datalake_mgr: DataLakeManager = None, warehouse_agg: WarehouseAggregator = None):
+        self.datalake_mgr = datalake_mgr or DataLakeManager()
+        self.warehouse_agg = warehouse_agg or WarehouseAggregator()
+        # symbol -> earliest open_time loaded since its hourly summaries were last rebuilt
+        self._stale_hours = {}
 
     def get_db_connection(self):
         return mysql.connector.connect(
@@ -44,6 +47,7 @@ class TransformManager:
             symbol = None
             data_type = None
             count = 0
+            klines = []
             
             # Download from MinIO to temporary file
             temp_file = tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False)
@@ -62,7 +66,8 @@ class TransformManager:
             
             # Process the file
             if "klines" in filepath:
-                symbol, count = self._process_klines(process_path, cursor)
+                symbol, klines = self._process_klines(process_path, cursor)
+                count = len(klines)
                 data_type = "klines"
             elif "depth" in filepath:
                 symbol, count = self._process_depth(process_path, cursor)
@@ -72,6 +77,16 @@ class TransformManager:
             cursor.close()
             conn.close()
             
+            # Publish committed candles to in-process consumers
+            if klines:
+                self._on_klines_loaded(symbol, klines)
+            elif data_type == "depth" and count > 0:
+                get_hot_store().acknowledge(symbol, get_watermarks().bump(symbol))
+                try:
+                    get_push_hub().on_depth(symbol)
+                except Exception as e:
+                    logger.warning(f"Failed to push orderbook for {symbol}: {e}")
+            
             # Mark file as processed
             if count > 0 and symbol and data_type:
                 self.datalake_mgr.mark_file_processed(filepath, symbol, data_type, count)
@@ -89,6 +104,7 @@ class TransformManager:
                     logger.warning(f"Failed to cleanup temp file: {e}")
 
     def _process_klines(self, filepath,cursor):
+        """Insert klines from a file; returns (symbol, inserted row tuples)."""
         with open(filepath, 'r') as f:
             payload = json.load(f)
         
@@ -97,7 +113,7 @@ class TransformManager:
         raw_data = payload.get('data')
 
         if not raw_data:
-            return symbol, 0
+            return symbol, []
 
         values = []
         for k in raw_data:
@@ -124,7 +140,61 @@ class TransformManager:
         """
         
         cursor.executemany(sql, values)
-        return symbol, len(values)
+        return symbol, values
+
+    def _on_klines_loaded(self, symbol, klines):
+        """
+        Feed freshly committed 1m klines to the in-memory stores and the
+        indicator state, bump the symbol's watermark, push closed bars to
+        stream subscribers, and note where volume profiles, distribution
+        sketches and precomputed indicators must be rebuilt.
+        
+        Args:
+            symbol: Trading pair symbol
+            klines: Row tuples as written to fact_klines
+        """
+        open_times = [row[2] for row in klines]
+        ohlcv = [row[3:8] for row in klines]
+        
+        try:
+            get_hot_store().append(symbol, open_times, ohlcv)
+        except Exception as e:
+            logger.warning(f"Failed to update hot store for {symbol}: {e}")
+        
+        try:
+            get_indicator_engine().update(symbol, open_times, ohlcv)
+        except Exception as e:
+            logger.warning(f"Failed to update indicator state for {symbol}: {e}")
+        
+        try:
+            get_history_store().append(symbol, open_times, ohlcv)
+        except Exception as e:
+            logger.warning(f"Failed to update history store for {symbol}: {e}")
+        
+        # Cached results of this symbol go stale; the hot store already has
+        # these candles, so it must not re-warm for this bump
+        get_hot_store().acknowledge(symbol, get_watermarks().bump(symbol, open_times))
+        
+        try:
+            get_push_hub().on_klines(symbol, open_times)
+        except Exception as e:
+            logger.warning(f"Failed to push candles for {symbol}: {e}")
+        
+        if open_times:
+            earliest = min(open_times)
+            self._stale_hours[symbol] = min(self._stale_hours.get(symbol, earliest), earliest)
+    
+    def _refresh_summaries(self):
+        """
+        Rebuild hourly volume profiles, distribution sketches and precomputed
+        indicators from the earliest candle touched per symbol.
+        """
+        stale, self._stale_hours = self._stale_hours, {}
+        for symbol, earliest in stale.items():
+            since = earliest.replace(minute=0, second=0, microsecond=0)
+            self.warehouse_agg.aggregate_volume_profiles(symbol, since=since)
+            self.warehouse_agg.aggregate_distribution_sketches(symbol, since=since)
+            self.warehouse_agg.aggregate_indicators(symbol, since=earliest)
 
     def _process_depth(self, filepath, cursor):
         with open(filepath, 'r') as f:
@@ -185,6 +255,13 @@ class TransformManager:
             print("🔄 Triggering aggregations...")
             self.warehouse_agg.aggregate_hourly()
             self.warehouse_agg.aggregate_daily()
+            self._refresh_summaries()
+            
+            # Merge candles that landed inside the stored history in one rewrite
+            try:
+                get_history_store().flush_late()
+            except Exception as e:
+                logger.warning(f"Failed to merge late candles into history store: {e}")
         
         return total_records
     
@@ -195,6 +272,13 @@ class TransformManager:
         # NEW: Detect and fill data gaps
         self._detect_and_fill_gaps()
         
+        # Gap repair only writes fact_klines; refresh the rollups that 1h/1d
+        # indicators are built from, then the summaries and indicators
+        if self._stale_hours:
+            self.warehouse_agg.aggregate_hourly()
+            self.warehouse_agg.aggregate_daily()
+        self._refresh_summaries()
+        
         # Archive old files (7+ days)
         self.datalake_mgr.archive_old_files(days_old=7)
         
@@ -204,6 +288,23 @@ class TransformManager:
         # Cleanup old warehouse data (90+ days)
         self.warehouse_agg.cleanup_old_data(days_to_keep=90)
         
+        # Gap repair and cleanup delete rows, so reload the hot store from the
+        # warehouse and let indicator state rebuild from it. Bumping first
+        # makes every other process's hot store re-warm as well, and this
+        # one warms at the new generation
+        get_watermarks().bump_all(config.SYMBOLS)
+        try:
+            get_hot_store().warm(config.SYMBOLS)
+        except Exception as e:
+            logger.warning(f"Failed to re-warm hot store: {e}")
+        get_indicator_engine().reset()
+        
+        # Rewrite the on-disk history so repaired candles replace the bad ones
+        try:
+            get_history_store().rebuild_from_warehouse(config.SYMBOLS)
+        except Exception as e:
+            logger.warning(f"Failed to rebuild history store: {e}")
+        
         # Print statistics
         dl_stats = self.datalake_mgr.get_statistics()
         wh_stats = self.warehouse_agg.get_statistics()
@@ -213,11 +314,11 @@ class TransformManager:
     
     def _detect_and_fill_gaps(self):
         """Detect and fill gaps in klines data."""
-        from src.modules.extract.manager import ExtractionManager
+        from src.services import get_extraction_manager
         from datetime import timedelta
         
         print("\n🔍 Detecting data gaps and integrity issues...")
-        extractor = ExtractionManager()
+        extractor = get_extraction_manager()
         
         for symbol in config.SYMBOLS:
             try:
@@ -4,6 +4,10 @@ import src.config as config
 from datetime import datetime, timedelta
 from src.modules.stats.calculator import StatsCalculator
 from src.modules.datalake.manager import DataLakeManager
+from src.modules.marketdata.hot_store import COLUMNS, to_epoch_minutes
+from src.modules.marketdata.resample import parse_interval, resample_ohlcv
+from src.modules.marketdata.columnar import COLUMNAR, columnar
+from src.modules.marketdata.timestamps import utc_epoch_ms
 
 class VisualizeService:
     def get_db_connection(self):
@@ -14,7 +18,7 @@ class VisualizeService:
             database=config.DB_NAME
         )
 
-    def get_kline_data(self, symbol, limit=500):
+    def get_kline_data(self, symbol, limit=500, response_format=None):
         try:
             conn = self.get_db_connection()
             query = f"""
@@ -31,16 +35,35 @@ class VisualizeService:
             if df.empty:
                 return []
 
-            data = []
-            for _, row in df.iterrows():
-                data.append({
-                    'time': int(row['open_time'].timestamp()),
-                    'open': float(row['open_price']),
-                    'high': float(row['high_price']),
-                    'low': float(row['low_price']),
-                    'close': float(row['close_price']),
-                    'volume': float(row['volume'])
-                })
+            open_times_ms = utc_epoch_ms(pd.to_datetime(df['open_time']).values, source_tz='UTC')
+            if response_format == COLUMNAR:
+                return columnar(
+                    open_times_ms,
+                    open=df['open_price'].to_numpy(dtype=float),
+                    high=df['high_price'].to_numpy(dtype=float),
+                    low=df['low_price'].to_numpy(dtype=float),
+                    close=df['close_price'].to_numpy(dtype=float),
+                    volume=df['volume'].to_numpy(dtype=float)
+                )
+
+            data = [
+                {
+                    'time': t,
+                    'open': o,
+                    'high': h,
+                    'low': l,
+                    'close': c,
+                    'volume': v
+                }
+                for t, o, h, l, c, v in zip(
+                    (open_times_ms // 1000).tolist(),
+                    df['open_price'].astype(float).tolist(),
+                    df['high_price'].astype(float).tolist(),
+                    df['low_price'].astype(float).tolist(),
+                    df['close_price'].astype(float).tolist(),
+                    df['volume'].astype(float).tolist()
+                )
+            ]
             return data
             
         except Exception as e:
@@ -48,17 +71,10 @@ class VisualizeService:
             return []
     
 
-    def get_kline_data_with_interval(self, symbol, interval='1m', limit=500):
+    def get_kline_data_with_interval(self, symbol, interval='1m', limit=500, response_format=None):
         try:
-            multiplier = 1
-            if interval.endswith('m'):
-                multiplier = int(interval.replace('m', ''))
-            elif interval.endswith('h'):
-                multiplier = int(interval.replace('h', '')) * 60
-            elif interval.endswith('d'):
-                multiplier = int(interval.replace('d', '')) * 1440
-            
-            fetch_limit = limit * multiplier
+            minutes = parse_interval(interval)
+            fetch_limit = limit * minutes
 
             conn = self.get_db_connection()
             query = f"""
@@ -75,36 +91,27 @@ class VisualizeService:
             if df.empty:
                 return []
 
-            df = df.sort_values('open_time')
-            
-            if interval != '1m':
-                df['open_time'] = pd.to_datetime(df['open_time'])
-                df.set_index('open_time', inplace=True)
-                
-                logic = {
-                    'open_price': 'first',
-                    'high_price': 'max',
-                    'low_price': 'min',
-                    'close_price': 'last',
-                    'volume': 'sum'
-                }
-                
-                pandas_interval = interval.replace('m', 'min')
-                
-                df = df.resample(pandas_interval).agg(logic).dropna()
-                df.reset_index(inplace=True)
-
-            df = df.tail(limit)
+            df = df.iloc[::-1]
+            times = to_epoch_minutes(pd.to_datetime(df['open_time']).values)
+            values = df[list(COLUMNS)].to_numpy(dtype=float).T
+            times, values = resample_ohlcv(times, values, minutes)
+            times, values = times[-limit:], values[:, -limit:]
+            
+            if response_format == COLUMNAR:
+                return columnar(
+                    times * 60_000,
+                    open=values[0], high=values[1], low=values[2], close=values[3], volume=values[4]
+                )
             
             data = []
-            for _, row in df.iterrows():
+            for i, t in enumerate(times):
                 data.append({
-                    'time': int(row['open_time'].timestamp()),
-                    'open': float(row['open_price']),
-                    'high': float(row['high_price']),
-                    'low': float(row['low_price']),
-                    'close': float(row['close_price']),
-                    'volume': float(row['volume'])
+                    'time': int(t) * 60,
+                    'open': float(values[0, i]),
+                    'high': float(values[1, i]),
+                    'low': float(values[2, i]),
+                    'close': float(values[3, i]),
+                    'volume': float(values[4, i])
                 })
             return data
             
@@ -459,7 +466,7 @@ class VisualizeService:
                     ROUND((DATA_LENGTH + INDEX_LENGTH) / 1024 / 1024, 2) as size_mb
                 FROM information_schema.TABLES
                 WHERE TABLE_SCHEMA = %s
-                AND TABLE_NAME IN ('fact_klines', 'fact_orderbook', 'hourly_klines', 'daily_klines')
+                AND TABLE_NAME IN ('fact_klines', 'fact_orderbook', 'hourly_klines', 'daily_klines', 'hourly_volume_profiles', 'hourly_distribution_sketches')
             """, (config.DB_NAME,))
             
             tables = []
@@ -1,6 +1,12 @@
 import mysql.connector
+import numpy as np
 from datetime import datetime, timedelta
 import src.config as config
+from src.modules.marketdata.hot_store import to_epoch_minutes, from_epoch_minutes
+from src.modules.warehouse import volume_profiles
+from src.modules.stats import sketch
+from src.modules.stats.incremental import DEFAULT_PARAMS, indicator_series, params_key, warmup_bars
+from src.modules.marketdata.resample import bucket_starts, parse_interval, resample_ohlcv
 
 class WarehouseAggregator:
     def __init__(self):
@@ -130,6 +136,268 @@ class WarehouseAggregator:
             print(f"Error aggregating daily data: {e}")
             return 0
     
+    @staticmethod
+    def _hourly_minutes(cursor, symbol, start, columns):
+        """
+        Yield (hour_start, values) for each hour of 1m klines from `start` on.
+        
+        `values` is a float64 array with one row per candle and one column
+        per name in `columns` (a comma-separated fact_klines column list).
+        """
+        cursor.execute(f"""
+            SELECT open_time, {columns}
+            FROM fact_klines
+            WHERE symbol = %s AND interval_code = '1m' AND open_time >= %s
+            ORDER BY open_time ASC
+        """, (symbol, start))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        
+        hours = to_epoch_minutes([row[0] for row in rows]) // 60
+        values = np.array([row[1:] for row in rows], dtype=np.float64)
+        bounds = np.flatnonzero(np.diff(hours)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(rows)]):
+            yield from_epoch_minutes(hours[lo] * 60).item(), values[lo:hi]
+    
+    def aggregate_volume_profiles(self, symbol=None, since=None):
+        """
+        Build per-hour volume-at-price histograms from minute data.
+        
+        Hours from `since` (default: the latest stored hour per symbol, which
+        may have been partial) are recomputed on the shared log-price grid
+        and upserted into hourly_volume_profiles.
+        
+        Args:
+            symbol: Only this symbol (default: all configured symbols)
+            since: Recompute hours starting at or after this datetime
+            
+        Returns:
+            Number of hourly profiles written
+        """
+        tick_bps = config.VOLUME_PROFILE_TICK_BPS
+        total = 0
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            
+            for sym in ([symbol] if symbol else config.SYMBOLS):
+                start = since
+                if start is None:
+                    cursor.execute("""
+                        SELECT MAX(hour_start) FROM hourly_volume_profiles
+                        WHERE symbol = %s AND tick_bps = %s
+                    """, (sym, tick_bps))
+                    start = cursor.fetchone()[0] or datetime(1970, 1, 1)
+                
+                records = []
+                for hour_start, values in self._hourly_minutes(cursor, sym, start, 'low_price, high_price, volume'):
+                    base, volumes = volume_profiles.build_histogram(values[:, 0], values[:, 1], values[:, 2], tick_bps)
+                    records.append((
+                        sym, hour_start, tick_bps, base, len(volumes), volume_profiles.pack(volumes)
+                    ))
+                if not records:
+                    continue
+                
+                cursor.executemany("""
+                    INSERT INTO hourly_volume_profiles
+                    (symbol, hour_start, tick_bps, base_level, level_count, volumes)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        tick_bps = VALUES(tick_bps),
+                        base_level = VALUES(base_level),
+                        level_count = VALUES(level_count),
+                        volumes = VALUES(volumes)
+                """, records)
+                conn.commit()
+                total += len(records)
+            
+            cursor.close()
+            conn.close()
+            
+            print(f"📊 Aggregated {total} hourly volume profiles")
+            return total
+            
+        except Exception as e:
+            print(f"Error aggregating volume profiles: {e}")
+            return total
+    
+    def aggregate_distribution_sketches(self, symbol=None, since=None):
+        """
+        Build per-hour moments and quantile sketches of candle returns and close prices.
+        
+        Hours from `since` (default: the latest stored hour per symbol) are
+        recomputed and upserted into hourly_distribution_sketches, one row
+        per metric ('return', 'price').
+        
+        Args:
+            symbol: Only this symbol (default: all configured symbols)
+            since: Recompute hours starting at or after this datetime
+            
+        Returns:
+            Number of hourly rows written
+        """
+        total = 0
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            
+            for sym in ([symbol] if symbol else config.SYMBOLS):
+                start = since
+                if start is None:
+                    cursor.execute("""
+                        SELECT MAX(hour_start) FROM hourly_distribution_sketches
+                        WHERE symbol = %s
+                    """, (sym,))
+                    start = cursor.fetchone()[0] or datetime(1970, 1, 1)
+                
+                records = []
+                for hour_start, values in self._hourly_minutes(cursor, sym, start, 'open_price, close_price'):
+                    for metric in sketch.METRICS:
+                        metric_values = sketch.metric_values(metric, values[:, 0], values[:, 1])
+                        m = sketch.Moments.from_values(metric_values)
+                        records.append((
+                            sym, hour_start, metric, sketch.METRIC_ALPHA[metric],
+                            m.n, m.mean, m.m2, m.m3, m.m4, m.min, m.max,
+                            sketch.DDSketch(sketch.METRIC_ALPHA[metric]).add(metric_values).to_bytes()
+                        ))
+                if not records:
+                    continue
+                
+                cursor.executemany("""
+                    INSERT INTO hourly_distribution_sketches
+                    (symbol, hour_start, metric, alpha, count, mean, m2, m3, m4, min_value, max_value, sketch)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        alpha = VALUES(alpha),
+                        count = VALUES(count),
+                        mean = VALUES(mean),
+                        m2 = VALUES(m2),
+                        m3 = VALUES(m3),
+                        m4 = VALUES(m4),
+                        min_value = VALUES(min_value),
+                        max_value = VALUES(max_value),
+                        sketch = VALUES(sketch)
+                """, records)
+                conn.commit()
+                total += len(records)
+            
+            cursor.close()
+            conn.close()
+            
+            print(f"📊 Aggregated {total} hourly distribution sketches")
+            return total
+            
+        except Exception as e:
+            print(f"Error aggregating distribution sketches: {e}")
+            return total
+    
+    @staticmethod
+    def _load_bars(cursor, symbol, minutes, start):
+        """
+        OHLCV bars of `minutes` starting at the bucket `start` (epoch minutes).
+        
+        Whole-day and whole-hour intervals are built from the daily and
+        hourly rollups, anything shorter from 1m klines.
+        
+        Returns:
+            Tuple (bar start epoch minutes, (5, n) float64 array)
+        """
+        if minutes % 1440 == 0:
+            table, time_column, interval_filter = 'daily_klines', 'date', ''
+        elif minutes % 60 == 0:
+            table, time_column, interval_filter = 'hourly_klines', 'hour_start', ''
+        else:
+            table, time_column, interval_filter = 'fact_klines', 'open_time', "AND interval_code = '1m'"
+        
+        cursor.execute(f"""
+            SELECT {time_column}, open_price, high_price, low_price, close_price, volume
+            FROM {table}
+            WHERE symbol = %s {interval_filter} AND {time_column} >= %s
+            ORDER BY {time_column} ASC
+        """, (symbol, from_epoch_minutes(start).item()))
+        rows = cursor.fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((5, 0), dtype=np.float64)
+        
+        times = to_epoch_minutes([row[0] for row in rows])
+        values = np.array([row[1:] for row in rows], dtype=np.float64).T
+        return resample_ohlcv(times, values, minutes)
+    
+    def aggregate_indicators(self, symbol=None, since=None):
+        """
+        Precompute the default RSI, MACD, Bollinger and ATR series per interval.
+        
+        Bars from the one containing `since` (default: the latest stored bar
+        per symbol and interval, which may have been partial) are recomputed
+        and upserted into fact_indicators, each indicator seeded
+        warmup_bars() bars earlier like the providers' compute().
+        
+        Args:
+            symbol: Only this symbol (default: all configured symbols)
+            since: Recompute bars from the one containing this datetime
+            
+        Returns:
+            Number of indicator rows written
+        """
+        total = 0
+        try:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            
+            for sym in ([symbol] if symbol else config.SYMBOLS):
+                for interval in config.INDICATOR_INTERVALS:
+                    minutes = parse_interval(interval)
+                    start = since
+                    if start is None:
+                        cursor.execute("""
+                            SELECT MAX(open_time) FROM fact_indicators
+                            WHERE symbol = %s AND interval_code = %s
+                        """, (sym, interval))
+                        start = cursor.fetchone()[0] or datetime(1970, 1, 1)
+                    
+                    first_bar = int(bucket_starts(to_epoch_minutes([start])[0], minutes))
+                    warmup = max(warmup_bars(kind, params) for kind, params in DEFAULT_PARAMS.items())
+                    bar_times, bar_values = self._load_bars(cursor, sym, minutes, max(first_bar - warmup * minutes, 0))
+                    
+                    records = []
+                    for kind, params in DEFAULT_PARAMS.items():
+                        series = indicator_series(kind, params, bar_times, bar_values, first_bar)
+                        if series is None:
+                            continue
+                        times, values = series
+                        # NaN (and unused value columns) are stored as NULL
+                        columns = values.astype(object)
+                        columns[np.isnan(values)] = None
+                        columns = columns.tolist() + [[None] * len(times)] * (4 - len(columns))
+                        for open_time, *row in zip(from_epoch_minutes(times).tolist(), *columns):
+                            records.append((sym, interval, kind, params_key(params), open_time, *row))
+                    if not records:
+                        continue
+                    
+                    cursor.executemany("""
+                        INSERT INTO fact_indicators
+                        (symbol, interval_code, indicator, params, open_time, value1, value2, value3, value4)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                            value1 = VALUES(value1),
+                            value2 = VALUES(value2),
+                            value3 = VALUES(value3),
+                            value4 = VALUES(value4)
+                    """, records)
+                    conn.commit()
+                    total += len(records)
+            
+            cursor.close()
+            conn.close()
+            
+            print(f"📊 Aggregated {total} indicator values")
+            return total
+            
+        except Exception as e:
+            print(f"Error aggregating indicators: {e}")
+            return total
+    
     def cleanup_old_data(self, days_to_keep=90):
         """Delete raw klines older than specified days."""
         try:
@@ -152,6 +420,14 @@ class WarehouseAggregator:
             """, (cutoff_date,))
             orderbook_deleted = cursor.rowcount
             
+            # Indicator rows of sub-hour intervals are derived from the deleted klines
+            minute_intervals = [i for i in config.INDICATOR_INTERVALS if parse_interval(i) < 60]
+            if minute_intervals:
+                cursor.execute(f"""
+                    DELETE FROM fact_indicators
+                    WHERE open_time < %s AND interval_code IN ({', '.join(['%s'] * len(minute_intervals))})
+                """, (cutoff_date, *minute_intervals))
+            
             conn.commit()
             cursor.close()
             conn.close()
@@ -0,0 +1,107 @@
+"""
+Volume-at-price histograms on a fixed log-price grid.
+
+Level k covers prices [g^k, g^(k+1)) with g = 1 + VOLUME_PROFILE_TICK_BPS / 10000,
+so every symbol and every hour share one grid and histograms can be merged
+by adding volumes at equal level numbers. An hour's histogram is stored as
+the first level number plus a packed float64 array of volumes.
+"""
+
+import numpy as np
+
+import src.config as config
+
+
+def _log_step(tick_bps=None):
+    return np.log1p((tick_bps or config.VOLUME_PROFILE_TICK_BPS) / 10000.0)
+
+
+def price_to_level(prices, tick_bps=None):
+    """Grid level containing each (positive) price."""
+    return np.floor(np.log(np.asarray(prices, dtype=np.float64)) / _log_step(tick_bps)).astype(np.int64)
+
+
+def level_to_price(levels, tick_bps=None):
+    """Lower price edge of each level."""
+    return np.exp(np.asarray(levels, dtype=np.float64) * _log_step(tick_bps))
+
+
+def build_histogram(low, high, volume, tick_bps=None):
+    """
+    Spread each candle's volume equally over the levels between its low and high.
+
+    Args:
+        low, high, volume: 1-D arrays, one entry per candle
+        tick_bps: Level width (default: config.VOLUME_PROFILE_TICK_BPS)
+
+    Returns:
+        Tuple (base_level, volumes) where volumes[i] belongs to level base_level + i
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    valid = (low > 0) & (high >= low)
+    if not valid.any():
+        return 0, np.zeros(0, dtype=np.float64)
+
+    first = price_to_level(low[valid], tick_bps)
+    last = price_to_level(high[valid], tick_bps)
+    base = int(first.min())
+    size = int(last.max()) - base + 2
+
+    # Difference array: add the share at the first level, remove it after the last
+    share = volume[valid] / (last - first + 1)
+    diff = (np.bincount(first - base, weights=share, minlength=size)
+            - np.bincount(last - base + 1, weights=share, minlength=size))
+    return base, np.maximum(np.cumsum(diff[:-1]), 0.0)
+
+
+def merge_histograms(histograms):
+    """
+    Add histograms on the shared grid.
+
+    Args:
+        histograms: Iterable of (base_level, volumes)
+
+    Returns:
+        Tuple (base_level, volumes) covering all inputs
+    """
+    histograms = [(int(b), np.asarray(v, dtype=np.float64)) for b, v in histograms if len(v)]
+    if not histograms:
+        return 0, np.zeros(0, dtype=np.float64)
+
+    base = min(b for b, _ in histograms)
+    top = max(b + len(v) for b, v in histograms)
+    merged = np.zeros(top - base, dtype=np.float64)
+    for b, v in histograms:
+        merged[b - base:b - base + len(v)] += v
+    return base, merged
+
+
+def rebin(base, volumes, bin_edges, tick_bps=None):
+    """
+    Move level volumes onto arbitrary price bins by the level's mid price.
+
+    Args:
+        base, volumes: Histogram as returned by merge_histograms
+        bin_edges: Ascending price bin edges (len(bins) + 1)
+
+    Returns:
+        float64 array of volume per bin; levels outside the edges are clamped
+        into the first or last bin
+    """
+    levels = base + np.arange(len(volumes))
+    mid = np.sqrt(level_to_price(levels, tick_bps) * level_to_price(levels + 1, tick_bps))
+    nbins = len(bin_edges) - 1
+    idx = np.clip(np.searchsorted(bin_edges, mid, side='right') - 1, 0, nbins - 1)
+    return np.bincount(idx, weights=volumes, minlength=nbins)
+
+
+def pack(volumes):
+    """Serialize volumes for the BLOB column."""
+    return np.ascontiguousarray(volumes, dtype='<f8').tobytes()
+
+
+def unpack(blob):
+    """Inverse of pack()."""
+    return np.frombuffer(blob, dtype='<f8')
@@ -0,0 +1,132 @@
+"""
+Process-wide shared service instances.
+
+Managers that talk to MinIO or Binance are expensive to build: each
+MinioClient opens its own connection pool and checks both buckets, and each
+ExtractionManager would otherwise hold its own HTTP session. These getters
+create every service lazily on first use and hand the same instance to all
+callers in the process.
+"""
+
+import threading
+
+import requests
+
+_lock = threading.RLock()
+_instances = {}
+
+
+def _get_or_create(name, factory):
+    """Return the shared instance for name, building it once with factory."""
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = factory()
+                _instances[name] = instance
+    return instance
+
+
+def get_http_session():
+    """Shared requests session (keeps Binance connections alive)."""
+    return _get_or_create('http_session', requests.Session)
+
+
+def get_minio_client():
+    """Shared MinIO client."""
+    from src.modules.datalake.minio_client import MinioClient
+    return _get_or_create('minio_client', MinioClient)
+
+
+def get_extraction_manager():
+    """Shared extraction manager using the shared MinIO client and HTTP session."""
+    from src.modules.extract.manager import ExtractionManager
+    return _get_or_create(
+        'extraction_manager',
+        lambda: ExtractionManager(minio_client=get_minio_client(), session=get_http_session())
+    )
+
+
+def get_datalake_manager():
+    """Shared data lake manager."""
+    from src.modules.datalake.manager import DataLakeManager
+    return _get_or_create(
+        'datalake_manager',
+        lambda: DataLakeManager(minio_client=get_minio_client())
+    )
+
+
+def get_warehouse_aggregator():
+    """Shared warehouse aggregator."""
+    from src.modules.warehouse.aggregator import WarehouseAggregator
+    return _get_or_create('warehouse_aggregator', WarehouseAggregator)
+
+
+def get_transform_manager():
+    """Shared transform manager."""
+    from src.modules.transform.manager import TransformManager
+    return _get_or_create(
+        'transform_manager',
+        lambda: TransformManager(
+            datalake_mgr=get_datalake_manager(),
+            warehouse_agg=get_warehouse_aggregator()
+        )
+    )
+
+
+def get_retention_manager():
+    """Shared retention manager."""
+    from src.modules.datalake.retention_manager import RetentionManager
+    return _get_or_create(
+        'retention_manager',
+        lambda: RetentionManager(minio_client=get_minio_client())
+    )
+
+
+def get_hot_store():
+    """Shared in-memory store of recent candles."""
+    from src.modules.marketdata.hot_store import HotStore
+    return _get_or_create('hot_store', HotStore)
+
+
+def get_history_store():
+    """Shared memory-mapped kline history."""
+    from src.modules.marketdata.history_store import HistoryStore
+    return _get_or_create('history_store', HistoryStore)
+
+
+def get_indicator_engine():
+    """Shared incremental indicator state."""
+    from src.modules.stats.incremental import IndicatorEngine
+    return _get_or_create('indicator_engine', IndicatorEngine)
+
+
+def get_shared_cache():
+    """Cross-process cache backend, or None when SHARED_CACHE_BACKEND is 'none'."""
+    from src.modules.analytics.shared_cache import create_backend
+    return _get_or_create('shared_cache', lambda: create_backend() or False) or None
+
+
+def get_watermarks():
+    """Shared per-symbol data watermarks."""
+    from src.modules.marketdata.watermarks import Watermarks
+    return _get_or_create('watermarks', lambda: Watermarks(backend=get_shared_cache()))
+
+
+def get_result_cache():
+    """Shared analytics result cache."""
+    from src.modules.analytics.result_cache import ResultCache
+    return _get_or_create('result_cache', ResultCache)
+
+
+def get_single_flight():
+    """Shared coalescer for identical concurrent analytics requests."""
+    from src.modules.analytics.single_flight import SingleFlight
+    return _get_or_create('single_flight', SingleFlight)
+
+
+def get_push_hub():
+    """Shared hub of Server-Sent Events subscriptions."""
+    from src.modules.analytics.push import PushHub
+    return _get_or_create('push_hub', PushHub)
@@ -1,19 +1,21 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, make_response, request, stream_with_context
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 import mysql.connector
+import functools
+import hashlib
+import json
 import sys
 import os
 
 # Add src to pythonpath
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.modules.extract.manager import ExtractionManager
-from src.modules.transform.manager import TransformManager
 from src.modules.visualize.service import VisualizeService
 from src.modules.analytics.service import AnalyticsService
-from src.modules.datalake.retention_manager import RetentionManager
 from src.scheduler_config import SchedulerConfig
+from src.modules.analytics.result_cache import normalize_params
+from src import services
 import src.config as config
 
 app = Flask(__name__)
@@ -32,11 +34,17 @@ CORS(app,
 scheduler = None
 scheduler_config = SchedulerConfig()
 
-extract_mgr = ExtractionManager()
-transform_mgr = TransformManager()
+extract_mgr = services.get_extraction_manager()
+transform_mgr = services.get_transform_manager()
 visualize_svc = VisualizeService()
 analytics_svc = AnalyticsService()
-retention_mgr = RetentionManager()
+retention_mgr = services.get_retention_manager()
+
+# Warm the in-memory hot store so chart reads don't start cold
+try:
+    services.get_hot_store().warm(config.SYMBOLS)
+except Exception as e:
+    print(f"⚠️  Hot store warm-up failed, charts will read from MySQL: {e}")
 
 def pipeline_job():
     """Background job to run extraction and transformation."""
@@ -91,6 +99,72 @@ def retention_cleanup_job():
         import traceback
         traceback.print_exc()
 
+def _request_etag(symbols):
+    """
+    ETag of the current request: path, query parameters and the watermarks
+    of the symbols it reads. None while a symbol has no recorded load, since
+    its data may then change without the watermark moving.
+    """
+    token = services.get_watermarks().token(symbols)
+    if any(generation == 0 for _, generation in token):
+        return None
+    key = [request.path, normalize_params(request.args), token]
+    return hashlib.sha1(json.dumps(key, default=str).encode()).hexdigest()[:20]
+
+def _is_failure(data):
+    """
+    True for bodies that report a failure with status 200: an `error` key,
+    or an empty result (what providers return when loading fails), also
+    nested, e.g. one provider of a batch.
+    """
+    if isinstance(data, (list, dict)) and not data:
+        return True
+    if isinstance(data, dict):
+        return 'error' in data or any(_is_failure(value) for value in data.values() if isinstance(value, (list, dict)))
+    return False
+
+def _result(data):
+    """
+    jsonify() for @conditional views: marks the response as taggable unless
+    the data is a failure, checked before serialization.
+    """
+    g.taggable = not _is_failure(data)
+    return jsonify(data)
+
+def conditional(symbols=lambda symbol, **_: [symbol]):
+    """
+    Serve If-None-Match requests with 304 before running the view.
+    
+    Only for views whose response is fully determined by the symbols' data
+    and the request; not for ones relative to the current time (NOW()).
+    Only 200 responses built with _result() from a non-failure get an ETag;
+    failed or empty ones are not revalidated until the next load.
+    
+    Args:
+        symbols: Callable taking the view arguments and returning the
+            symbols whose data the response depends on
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            etag = _request_etag(symbols(**kwargs))
+            if etag is None:
+                return view(**kwargs)
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(**kwargs))
+                if response.status_code != 200 or not g.get('taggable', False):
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def _query_symbol(**_):
+    return [request.args.get('symbol', config.SYMBOLS[0])]
+
 # TEMPORARY: Scheduler disabled to prevent segfault
 # Use /api/trigger to run pipeline manually
 print("⚠️  Auto-scheduler disabled (segfault issue)")
@@ -101,14 +175,21 @@ def config_symbols():
     if request.method == 'POST':
         new_symbols = request.json.get('symbols', [])
         if new_symbols:
+            added = [s for s in new_symbols if s not in config.SYMBOLS]
             config.SYMBOLS = new_symbols
+            if added:
+                try:
+                    services.get_hot_store().warm(added)
+                except Exception as e:
+                    print(f"⚠️  Hot store warm-up failed for {added}: {e}")
             return jsonify({"status": "success", "symbols": config.SYMBOLS})
     return jsonify({"symbols": config.SYMBOLS})
 
 @app.route('/api/data/<symbol>')
+@conditional()
 def get_data(symbol):
-    data = visualize_svc.get_kline_data(symbol)
-    return jsonify(data)
+    data = visualize_svc.get_kline_data(symbol, response_format=request.args.get('format'))
+    return _result(data)
 
 @app.route('/api/stats/<symbol>')
 def get_stats(symbol):
@@ -170,23 +251,27 @@ def trigger_maintenance():
 def maintenance_stats():
     """Get data lake and warehouse statistics."""
     try:
-        from src.modules.datalake.manager import DataLakeManager
-        from src.modules.warehouse.aggregator import WarehouseAggregator
-        
-        dl_mgr = DataLakeManager()
-        wh_agg = WarehouseAggregator()
+        dl_mgr = services.get_datalake_manager()
+        wh_agg = services.get_warehouse_aggregator()
         
         dl_stats = dl_mgr.get_statistics()
         wh_stats = wh_agg.get_statistics()
         
         return jsonify({
             "data_lake": dl_stats,
-            "warehouse": wh_stats
+            "warehouse": wh_stats,
+            "hot_store": services.get_hot_store().get_statistics(),
+            "history_store": services.get_history_store().get_statistics(),
+            "indicator_state": services.get_indicator_engine().get_statistics(),
+            "result_cache": services.get_result_cache().get_statistics(),
+            "single_flight": services.get_single_flight().get_statistics(),
+            "push": services.get_push_hub().get_statistics()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/tables/klines')
+@conditional(_query_symbol)
 def get_klines_table():
     """Get paginated k-lines data for table view."""
     try:
@@ -235,7 +320,7 @@ def get_klines_table():
         cursor.close()
         conn.close()
         
-        return jsonify({
+        return _result({
             "data": data,
             "total": total,
             "page": page,
@@ -246,6 +331,7 @@ def get_klines_table():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/tables/orderbook')
+@conditional(_query_symbol)
 def get_orderbook_table():
     """Get paginated orderbook data for table view."""
     try:
@@ -289,7 +375,7 @@ def get_orderbook_table():
         cursor.close()
         conn.close()
         
-        return jsonify({
+        return _result({
             "data": data,
             "total": total,
             "page": page,
@@ -308,18 +394,21 @@ def get_dashboard_metrics():
     return jsonify(metrics)
 
 @app.route('/api/analytics/candlestick/<symbol>')
+@conditional()
 def get_candlestick(symbol):
     """Get candlestick data for analytics page."""
     limit = request.args.get('limit', 200, type=int)
-    data = analytics_svc.get_candlestick_data(symbol, limit=limit)
-    return jsonify(data)
+    since = request.args.get('since', type=int)
+    data = analytics_svc.get_candlestick_data(symbol, limit=limit, response_format=request.args.get('format'), since=since)
+    return _result(data)
 
 @app.route('/api/analytics/orderbook/<symbol>')
+@conditional()
 def get_orderbook_snapshot(symbol):
     """Get orderbook snapshot for analytics page."""
     limit = request.args.get('limit', 20, type=int)
     data = analytics_svc.get_orderbook_snapshot(symbol, limit=limit)
-    return jsonify(data)
+    return _result(data)
 
 @app.route('/api/pipeline/ingestion-logs')
 def get_ingestion_logs():
@@ -338,8 +427,43 @@ def get_deduplication_stats():
 # ========== GENERIC ANALYTICS DATA PROVIDER ENDPOINTS ==========
 
 from src.modules.analytics.data_providers.registry import DataProviderRegistry
+from src.modules.analytics.data_providers.batch import get_batch, split_params
+from src.modules.analytics.data_providers.sweep import SWEEPS, get_sweep, parse_periods
+
+INT_PARAMS = ['limit', 'since', 'period', 'fast_period', 'slow_period', 'signal_period', 'window', 'bins']
+FLOAT_PARAMS = ['std_dev']
+
+def _provider_params(args):
+    """Query parameters with numeric values converted (also for `provider.key` names)."""
+    params = {k: v for k, v in args.items()}
+    for key, value in params.items():
+        name = key.rpartition('.')[2]
+        converter = int if name in INT_PARAMS else float if name in FLOAT_PARAMS else None
+        if converter:
+            try:
+                params[key] = converter(value)
+            except ValueError:
+                pass
+    return params
+
+def _provider_symbols(provider, symbol):
+    data_provider = DataProviderRegistry.get(provider)
+    if not data_provider:
+        return [symbol]
+    return data_provider.data_symbols(symbol, **_provider_params(request.args))
+
+def _batch_symbols(symbol):
+    names = [n.strip() for n in request.args.get('providers', '').split(',') if n.strip()]
+    per_provider = split_params(names, _provider_params(request.args))
+    symbols = [symbol]
+    for name in names:
+        data_provider = DataProviderRegistry.get(name)
+        if data_provider:
+            symbols.extend(data_provider.data_symbols(symbol, **per_provider[name]))
+    return list(dict.fromkeys(symbols))
 
 @app.route('/api/analytics/data/<provider>/<symbol>')
+@conditional(_provider_symbols)
 def get_analytics_data(provider, symbol):
     """
     Generic endpoint for analytics data using the provider system.
@@ -351,32 +475,101 @@ def get_analytics_data(provider, symbol):
         if not data_provider:
             return jsonify({"error": f"Unknown provider: {provider}"}), 404
         
-        # Get all query parameters
-        params = {k: v for k, v in request.args.items()}
+        params = _provider_params(request.args)
         
-        # Convert numeric parameters
-        for key in ['limit', 'period', 'fast_period', 'slow_period', 'signal_period', 'window', 'bins']:
-            if key in params:
-                try:
-                    params[key] = int(params[key])
-                except ValueError:
-                    pass
+        data = services.get_result_cache().get_data(provider, data_provider, symbol, params)
+        return _result(data)
+    except Exception as e:
+        print(f"Error in analytics data provider: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/analytics/batch/<symbol>')
+@conditional(_batch_symbols)
+def get_analytics_batch(symbol):
+    """
+    Several providers for one symbol, sharing one bar fetch per interval.
+    
+    Usage: GET /api/analytics/batch/BTCUSDT?providers=candlestick,volume,rsi,macd&interval=5m&limit=200&rsi.period=14
+    """
+    try:
+        names = [n.strip() for n in request.args.get('providers', '').split(',') if n.strip()]
+        if not names:
+            return jsonify({"error": "providers parameter is required"}), 400
+        unknown = [n for n in names if not DataProviderRegistry.get(n)]
+        if unknown:
+            return jsonify({"error": f"Unknown provider: {', '.join(unknown)}"}), 404
         
-        for key in ['std_dev']:
-            if key in params:
-                try:
-                    params[key] = float(params[key])
-                except ValueError:
-                    pass
+        params = _provider_params(request.args)
+        params.pop('providers', None)
         
-        data = data_provider.get_data(symbol, **params)
-        return jsonify(data)
+        key = ('batch', symbol, tuple(names), normalize_params(params))
+        return _result(services.get_single_flight().do(key, lambda: get_batch(symbol, names, params)))
     except Exception as e:
-        print(f"Error in analytics data provider: {e}")
+        print(f"Error in analytics batch: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/analytics/sweep/<indicator>/<symbol>')
+@conditional()
+def get_analytics_sweep(indicator, symbol):
+    """
+    One indicator for many periods, as a (periods x time) matrix from one bar fetch.
+    
+    Usage: GET /api/analytics/sweep/rsi/BTCUSDT?periods=5..50&interval=1h&limit=200
+    """
+    try:
+        if indicator not in SWEEPS:
+            return jsonify({"error": f"Unknown sweep indicator: {indicator}"}), 404
+        try:
+            periods = parse_periods(request.args.get('periods'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        params = _provider_params(request.args)
+        params.pop('periods', None)
+        
+        key = ('sweep', indicator, symbol, tuple(periods), normalize_params(params))
+        return _result(services.get_single_flight().do(key, lambda: get_sweep(symbol, indicator, periods, params)))
+    except Exception as e:
+        print(f"Error in analytics sweep: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/stream/<symbol>')
+def stream_symbol(symbol):
+    """
+    Server-Sent Events for one symbol: closed candles with indicator tails
+    (`candles`) and order book snapshots (`orderbook`) as they are loaded.
+    
+    Usage: new EventSource('/api/stream/BTCUSDT?interval=5m')
+    """
+    interval = request.args.get('interval', '1m')
+    try:
+        subscription = services.get_push_hub().subscribe(symbol, interval)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if subscription is None:
+        return jsonify({"error": "Too many stream subscribers"}), 503
+    
+    def events():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = subscription.get(timeout=config.PUSH_HEARTBEAT)
+                yield message if message is not None else ": keep-alive\n\n"
+        finally:
+            services.get_push_hub().unsubscribe(subscription)
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/analytics/providers')
 def list_analytics_providers():
     """List all available data providers with their metadata."""